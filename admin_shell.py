@@ -1,72 +1,245 @@
-from future import annotations from fastapi import APIRouter, HTTPException, status, Request from pydantic import BaseModel import subprocess, shlex, os, time from fastapi.responses import HTMLResponse, JSONResponse
+from __future__ import annotations
 
-router = APIRouter()
+import asyncio
+import codecs
+import json
+import os
+import shlex
+import signal
+import time
+
+from fastapi import APIRouter, HTTPException, status, Request
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+from shell_system.rate_limiter import MemoryBackend, SQLiteBackend, TokenBucketLimiter
 
-=== إعدادات ===
+router = APIRouter()
 
-ADMIN_PIN = os.getenv("ADMIN_PIN", "bassam1234")  # غيّرها من متغيرات البيئة في Render ALLOW_UNSAFE = os.getenv("ADMIN_SHELL_MODE", "safe").lower() == "unsafe" WORKDIR = os.getenv("APP_WORKDIR", ".")
+# === إعدادات ===
 
-SAFE_PREFIXES = ( "python", "python3", "pip", "pip3", "ls", "pwd", "echo", "cat", "head", "tail", "whoami", )
+ADMIN_PIN = os.getenv("ADMIN_PIN", "bassam1234")  # غيّرها من متغيرات البيئة في Render
+ALLOW_UNSAFE = os.getenv("ADMIN_SHELL_MODE", "safe").lower() == "unsafe"
+WORKDIR = os.getenv("APP_WORKDIR", ".")
+COMMAND_TIMEOUT = float(os.getenv("ADMIN_SHELL_TIMEOUT", "120"))
+MAX_CONCURRENT_COMMANDS = int(os.getenv("ADMIN_SHELL_CONCURRENCY", "2"))
+STREAM_CHUNK_BYTES = 4096
+STREAM_LINE_LIMIT = 16384  # السطر الأطول يُرسل على أجزاء
+STREAM_QUEUE_LINES = 256   # أقصى عدد أسطر معلّقة بين العملية والمتصفح
 
-_last_hit: dict[str, float] = {}
+SAFE_PREFIXES = (
+    "python", "python3", "pip", "pip3", "ls", "pwd", "echo", "cat", "head", "tail", "whoami",
+)
 
-class ShellIn(BaseModel): pin: str command: str
+# دلو رموز لكل عنوان IP؛ اضبط ADMIN_SHELL_RATE_DB لمشاركة الحدود بين عمليات uvicorn
+_RATE_DB = os.getenv("ADMIN_SHELL_RATE_DB")
+_limiter = TokenBucketLimiter(
+    rate=float(os.getenv("ADMIN_SHELL_RATE", "1")),
+    burst=float(os.getenv("ADMIN_SHELL_BURST", "1")),
+    backend=SQLiteBackend(_RATE_DB) if _RATE_DB else MemoryBackend(),
+)
 
-@router.get("/shell", response_class=HTMLResponse) async def shell_page(_: Request): return HTMLResponse(content=_SHELL_HTML, status_code=200)
+# يحد عدد الأوامر المتزامنة؛ الطلبات الزائدة تنتظر دورها دون حجز حلقة الأحداث
+_command_slots = asyncio.Semaphore(MAX_CONCURRENT_COMMANDS)
 
-@router.post("/shell/run") async def shell_run(req: Request, body: ShellIn): if body.pin != ADMIN_PIN: raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid PIN")
 
-ip = req.client.host if req.client else "unknown"
-now = time.time()
-last = _last_hit.get(ip, 0)
-if now - last < 1.0:
-    raise HTTPException(status_code=429, detail="Too many requests; slow down")
-_last_hit[ip] = now
+class ShellIn(BaseModel):
+    pin: str
+    command: str
 
-cmd = body.command.strip()
-if not cmd:
-    raise HTTPException(status_code=400, detail="Empty command")
 
-if not ALLOW_UNSAFE and not cmd.startswith(SAFE_PREFIXES):
-    raise HTTPException(status_code=400, detail="Command not allowed in safe mode. Allowed prefixes: " + ", ".join(SAFE_PREFIXES))
+@router.get("/shell", response_class=HTMLResponse)
+async def shell_page(_: Request):
+    return HTMLResponse(content=_SHELL_HTML, status_code=200)
 
-use_shell = False
-args: list[str]
-try:
-    args = shlex.split(cmd)
-except Exception:
-    if not ALLOW_UNSAFE:
-        raise HTTPException(status_code=400, detail="Unable to parse command safely")
-    use_shell = True
-    args = [cmd]
 
-try:
-    start = time.time()
-    completed = subprocess.run(
-        args if not use_shell else cmd,
+async def _spawn(cmd: str, args: list[str], use_shell: bool) -> asyncio.subprocess.Process:
+    """تشغيل الأمر كعملية فرعية غير حاجبة في جلسة مستقلة"""
+    options = dict(
         cwd=WORKDIR,
-        capture_output=True,
-        text=True,
-        shell=use_shell,
-        timeout=120,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=True,
     )
-    dur = time.time() - start
+    if use_shell:
+        return await asyncio.create_subprocess_shell(cmd, **options)
+    return await asyncio.create_subprocess_exec(*args, **options)
+
+
+async def _terminate(proc: asyncio.subprocess.Process) -> None:
+    """إنهاء العملية وكل أبنائها (مثل pip) ثم انتظار خروجها"""
+    if proc.returncode is None:
+        try:
+            if hasattr(os, "killpg"):
+                os.killpg(proc.pid, signal.SIGKILL)
+            else:
+                proc.kill()
+        except ProcessLookupError:
+            pass
+    await proc.wait()
+
+
+def _parse_command(body: ShellIn) -> tuple[str, list[str], bool]:
+    """التحقق من الأمر وتحليله إلى وسائط"""
+    cmd = body.command.strip()
+    if not cmd:
+        raise HTTPException(status_code=400, detail="Empty command")
+
+    if not ALLOW_UNSAFE and not cmd.startswith(SAFE_PREFIXES):
+        raise HTTPException(status_code=400, detail="Command not allowed in safe mode. Allowed prefixes: " + ", ".join(SAFE_PREFIXES))
+
+    use_shell = False
+    args: list[str]
+    try:
+        args = shlex.split(cmd)
+    except Exception:
+        if not ALLOW_UNSAFE:
+            raise HTTPException(status_code=400, detail="Unable to parse command safely")
+        use_shell = True
+        args = [cmd]
+
+    return cmd, args, use_shell
+
+
+async def _check_access(req: Request, body: ShellIn) -> None:
+    """التحقق من الـ PIN ومعدل الطلبات"""
+    if body.pin != ADMIN_PIN:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid PIN")
+
+    ip = req.client.host if req.client else "unknown"
+    if isinstance(_limiter.backend, SQLiteBackend):
+        # استعلامات SQLite حاجبة (وقد تنتظر قفل عملية أخرى): تُنفذ في خيط لا في حلقة الأحداث
+        allowed, retry_after = await asyncio.to_thread(_limiter.hit, ip)
+    else:
+        allowed, retry_after = _limiter.hit(ip)
+    if not allowed:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests; slow down",
+            headers={"Retry-After": str(max(1, round(retry_after)))},
+        )
+
+
+@router.post("/shell/run")
+async def shell_run(req: Request, body: ShellIn):
+    await _check_access(req, body)
+    cmd, args, use_shell = _parse_command(body)
+
+    async with _command_slots:
+        start = time.time()
+        try:
+            proc = await _spawn(cmd, args, use_shell)
+        except FileNotFoundError:
+            raise HTTPException(status_code=400, detail=f"Command not found: {args[0]}")
+
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=COMMAND_TIMEOUT)
+        except asyncio.TimeoutError:
+            await _terminate(proc)
+            raise HTTPException(status_code=408, detail=f"Command timed out after {COMMAND_TIMEOUT:g}s")
+        except asyncio.CancelledError:
+            # انقطع الاتصال أو أُوقف الخادم: لا نترك عمليات يتيمة
+            await _terminate(proc)
+            raise
+        dur = time.time() - start
+
     return JSONResponse(
         {
-            "ok": completed.returncode == 0,
-            "exit_code": completed.returncode,
+            "ok": proc.returncode == 0,
+            "exit_code": proc.returncode,
             "duration_sec": round(dur, 3),
-            "stdout": completed.stdout[-20000:],
-            "stderr": completed.stderr[-20000:],
+            "stdout": stdout.decode("utf-8", errors="replace")[-20000:],
+            "stderr": stderr.decode("utf-8", errors="replace")[-20000:],
             "workdir": os.path.abspath(WORKDIR),
             "mode": "unsafe" if ALLOW_UNSAFE else "safe",
         }
     )
-except subprocess.TimeoutExpired:
-    raise HTTPException(status_code=408, detail="Command timed out after 120s")
 
-_SHELL_HTML = r""" <!doctype html>
 
+def _sse(event: str, data) -> str:
+    """تنسيق حدث Server-Sent Events؛ البيانات بصيغة JSON كي لا تكسر الأسطر الحدث"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _pump_lines(stream: asyncio.StreamReader, name: str, queue: asyncio.Queue) -> None:
+    """قراءة مخرجات العملية على دفعات وتمريرها سطراً سطراً عبر طابور محدود"""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    while True:
+        chunk = await stream.read(STREAM_CHUNK_BYTES)
+        if not chunk:
+            break
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            # امتلاء الطابور يوقف القراءة، فيمتلئ الأنبوب وتتباطأ العملية نفسها
+            await queue.put((name, line))
+        while len(pending) > STREAM_LINE_LIMIT:
+            await queue.put((name, pending[:STREAM_LINE_LIMIT]))
+            pending = pending[STREAM_LINE_LIMIT:]
+
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        await queue.put((name, pending))
+    await queue.put((name, None))
+
+
+async def _stream_command(cmd: str, args: list[str], use_shell: bool):
+    """تنفيذ الأمر وبث مخرجاته كأحداث SSE فور إنتاجها"""
+    async with _command_slots:
+        loop = asyncio.get_running_loop()
+        start = time.time()
+        deadline = loop.time() + COMMAND_TIMEOUT
+
+        try:
+            proc = await _spawn(cmd, args, use_shell)
+        except FileNotFoundError:
+            yield _sse("error", {"detail": f"Command not found: {args[0]}"})
+            return
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_LINES)
+        pumps = [
+            asyncio.create_task(_pump_lines(proc.stdout, "stdout", queue)),
+            asyncio.create_task(_pump_lines(proc.stderr, "stderr", queue)),
+        ]
+        try:
+            open_streams = len(pumps)
+            while open_streams:
+                name, line = await asyncio.wait_for(queue.get(), deadline - loop.time())
+                if line is None:
+                    open_streams -= 1
+                else:
+                    yield _sse(name, line)
+
+            await asyncio.wait_for(proc.wait(), max(deadline - loop.time(), 0))
+            yield _sse("exit", {
+                "ok": proc.returncode == 0,
+                "exit_code": proc.returncode,
+                "duration_sec": round(time.time() - start, 3),
+                "workdir": os.path.abspath(WORKDIR),
+                "mode": "unsafe" if ALLOW_UNSAFE else "safe",
+            })
+        except asyncio.TimeoutError:
+            yield _sse("error", {"detail": f"Command timed out after {COMMAND_TIMEOUT:g}s"})
+        finally:
+            # يشمل انقطاع المتصفح: إغلاق المولّد يُنهي العملية ويحرر مكانها
+            for pump in pumps:
+                pump.cancel()
+            await _terminate(proc)
+
+
+@router.post("/shell/stream")
+async def shell_stream(req: Request, body: ShellIn):
+    await _check_access(req, body)
+    cmd, args, use_shell = _parse_command(body)
+    return StreamingResponse(
+        _stream_command(cmd, args, use_shell),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+_SHELL_HTML = r"""<!doctype html>
 <html lang="ar" dir="rtl">
 <head>
   <meta charset="utf-8"/>
@@ -108,7 +281,38 @@ _SHELL_HTML = r""" <!doctype html>
   <script>
     const $ = (id)=>document.getElementById(id);
     const pinEl = $("pin"), cmdEl=$("cmd"), outEl=$("out"), runBtn=$("run"), modeEl=$("mode");
-    pinEl.value = localStorage.getItem("dev_pin") || "";async function run(){
+    pinEl.value = localStorage.getItem("dev_pin") || "";
+
+const MAX_OUTPUT_CHARS = 200000;  // نافذة عرض محدودة في المتصفح أيضًا
+
+function append(text){
+  outEl.value += text;
+  if(outEl.value.length > MAX_OUTPUT_CHARS){
+    outEl.value = outEl.value.slice(-MAX_OUTPUT_CHARS);
+  }
+  outEl.scrollTop = outEl.scrollHeight;
+}
+
+function handleEvent(raw){
+  let event = "message", data = "";
+  for(const line of raw.split("\n")){
+    if(line.startsWith("event: ")) event = line.slice(7);
+    else if(line.startsWith("data: ")) data += line.slice(6);
+  }
+  const payload = JSON.parse(data);
+  if(event === "stdout"){
+    append(payload + "\n");
+  } else if(event === "stderr"){
+    append("[stderr] " + payload + "\n");
+  } else if(event === "exit"){
+    modeEl.textContent = `mode: ${payload.mode}`;
+    append(`\n— exit=${payload.exit_code}, duration=${payload.duration_sec}s`);
+  } else if(event === "error"){
+    append(`❌ ${payload.detail}\n`);
+  }
+}
+
+async function run(){
   const pin = pinEl.value.trim();
   const command = cmdEl.value.trim();
   if(!pin || !command){ alert("أدخل PIN والأمر"); return; }
@@ -116,23 +320,33 @@ _SHELL_HTML = r""" <!doctype html>
   outEl.value = "⏳ Running: " + command + "\n\n";
   runBtn.disabled = true;
   try{
-    const res = await fetch("/admin/shell/run",{
+    const res = await fetch("/admin/shell/stream",{
       method:"POST",
       headers:{"Content-Type":"application/json"},
       body: JSON.stringify({pin, command})
     });
-    const data = await res.json();
     if(!res.ok){
-      outEl.value += `❌ Error (${res.status}): ${data.detail || JSON.stringify(data)}\n`;
-    } else {
-      modeEl.textContent = `mode: ${data.mode}`;
-      outEl.value += (data.stdout || "") + (data.stderr? `\n[stderr]\n${data.stderr}`:"") + `\n\n— exit=${data.exit_code}, duration=${data.duration_sec}s`;
+      const data = await res.json();
+      append(`❌ Error (${res.status}): ${data.detail || JSON.stringify(data)}\n`);
+      return;
+    }
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    while(true){
+      const {value, done} = await reader.read();
+      if(done) break;
+      buffer += decoder.decode(value, {stream:true});
+      let idx;
+      while((idx = buffer.indexOf("\n\n")) >= 0){
+        handleEvent(buffer.slice(0, idx));
+        buffer = buffer.slice(idx + 2);
+      }
     }
   }catch(err){
-    outEl.value += `❌ ${err}`;
+    append(`❌ ${err}`);
   } finally {
     runBtn.disabled = false;
-    outEl.scrollTop = outEl.scrollHeight;
   }
 }
 runBtn.addEventListener("click", run);
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+قياس التطبيع والتقسيم العربي على مجموعة نصوص اصطناعية (افتراضياً 100MB):
+جداول str.translate مقارنة بسلسلة التعابير النمطية المكافئة لها في القواعد،
+ومقارنة بالمعالجة السابقة (حروف صغيرة وحذف الترقيم فقط، دون تطبيع عربي)،
+ثم أثر التخزين المؤقت لنتائج tokenize على رسائل متكررة
+التشغيل: python -m benchmarks.bench_arabic [MB]
+"""
+
+import random
+import re
+import sys
+import time
+
+from chat_system.arabic import normalize_text, tokenize
+
+WORDS = ("مرحبا السلام عليكم البرمجة الشبكات الذكاء الاصطناعي مكتبة بايثون خادم قاعدة بيانات "
+         "مستشفى إلى على مدرسة جامعة أسئلة إجابة بروتوكول python server data").split()
+DIACRITICS = "ًٌٍَُِّْ"
+PUNCTUATION = ["،", ".", "!", "؟", ":", "(", ")", "-", "«", "»"]
+DIGITS = "٠١٢٣٤٥٦٧٨٩"
+BLOCK_BYTES = 1024 * 1024
+
+# سلسلة التعابير النمطية بنفس قواعد جداول translate
+_DIACRITICS_RE = re.compile('[ً-ٰٟـ]')
+_ALEF_RE = re.compile('[آأإٱ]')
+_DIGITS_RE = re.compile('[٠-٩۰-۹]')
+_PUNCTUATION_RE = re.compile(r'[^\w\s]|_')
+_OLD_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+
+
+def regex_tokens(text):
+    text = _DIACRITICS_RE.sub('', text.lower())
+    text = _ALEF_RE.sub('ا', text).replace('ى', 'ي').replace('ة', 'ه')
+    text = _DIGITS_RE.sub(lambda m: str((ord(m.group()) - 0x0660) % 0x90), text)
+    return _PUNCTUATION_RE.sub(' ', text).split()
+
+
+def translate_tokens(text):
+    return normalize_text(text).split()
+
+
+def old_tokens(text):
+    """preprocess_text السابقة: بلا تطبيع عربي"""
+    return _OLD_PUNCTUATION_RE.sub('', text.lower()).split()
+
+
+def decorate(word, rng):
+    if rng.random() < 0.3:
+        word = "".join(ch + rng.choice(DIACRITICS) if rng.random() < 0.3 else ch for ch in word)
+    if rng.random() < 0.05:
+        word = word[:1] + "ـــ" + word[1:]
+    if rng.random() < 0.1:
+        word += rng.choice(PUNCTUATION)
+    if rng.random() < 0.03:
+        word = "".join(rng.choices(DIGITS, k=4))
+    return word
+
+
+def corpus_block(rng):
+    """أسطر بطول رسالة محادثة حتى يبلغ الحجم BLOCK_BYTES تقريباً"""
+    lines, size = [], 0
+    while size < BLOCK_BYTES:
+        line = " ".join(decorate(rng.choice(WORDS), rng) for _ in range(rng.randint(5, 25)))
+        lines.append(line)
+        size += len(line.encode('utf-8')) + 1
+    return lines
+
+
+def main():
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    approaches = {"translate": translate_tokens, "regex": regex_tokens, "old": old_tokens}
+    seconds = dict.fromkeys(approaches, 0.0)
+    tokens = dict.fromkeys(approaches, 0)
+    chars = 0
+
+    rng = random.Random(21)
+    for _ in range(megabytes):
+        lines = corpus_block(rng)
+        chars += sum(map(len, lines))
+        for name, function in approaches.items():
+            start = time.perf_counter()
+            count = 0
+            for line in lines:
+                count += len(function(line))
+            seconds[name] += time.perf_counter() - start
+            tokens[name] += count
+        if translate_tokens(lines[0]) != regex_tokens(lines[0]):
+            raise AssertionError("نتيجتا translate والتعابير النمطية مختلفتان")
+
+    print(f"📊 {megabytes}MB ({chars:,} محرف، {tokens['translate']:,} كلمة)")
+    for name, label in (("translate", "جداول translate"), ("regex", "تعابير نمطية مكافئة"),
+                        ("old", "السابق (بلا تطبيع عربي)")):
+        print(f"  {label:<24}: {seconds[name]:6.2f}s  {megabytes / seconds[name]:6.1f} MB/s  "
+              f"{seconds[name] / chars * 1e9:5.1f} ns/محرف")
+    print(f"  التسريع مقابل التعابير النمطية: x{seconds['regex'] / seconds['translate']:.2f}")
+
+    # رسائل محادثة متكررة (توزيع Zipf): tokenize يخدم المتكرر من ذاكرته
+    rng = random.Random(22)
+    pool = corpus_block(rng)[:5000]
+    weights = [1 / (rank + 1) for rank in range(len(pool))]
+    messages = rng.choices(pool, weights=weights, k=200000)
+    tokenize.cache_clear()
+    for name, function in (("بلا تخزين", translate_tokens), ("tokenize المخزَّن", tokenize)):
+        start = time.perf_counter()
+        for message in messages:
+            function(message)
+        elapsed = time.perf_counter() - start
+        print(f"  {len(messages):,} رسالة متكررة، {name}: {len(messages) / elapsed:10,.0f} رسالة/ث")
+    info = tokenize.cache_info()
+    print(f"  نسبة الإصابة: {info.hits / (info.hits + info.misses):.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+قياس ردود الدفعات في SimpleAIModel: generate_responses (تطبيع واسترجاع مجمَّع) مقارنة
+باستدعاء generate_response لكل رسالة، على مخزن معرفة اصطناعي ورسائل غير مكررة
+(الذاكرة المؤقتة تُفرَّغ قبل كل تشغيل فلا يستفيد أحدهما من الآخر)
+التشغيل: python -m benchmarks.bench_chat_batch [عدد المقاطع] [عدد الرسائل] [حجم الدفعة]
+"""
+
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("KNOWLEDGE_DB", ":memory:")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates"))
+
+from ai_model import SimpleAIModel  # noqa: E402
+from chat_system.arabic import stem, stem_tokens, tokenize  # noqa: E402
+
+PREFIXES = ['', 'ال', 'وال', 'بال', 'لل', 'و']
+SUFFIXES = ['', 'ة', 'ات', 'ين', 'ون', 'ها', 'ي']
+FILLER = "أريد أن أتعلم عن هل يمكن في اليوم من فضلك لدي سؤال حول".split()
+
+
+def synthetic_documents(chunks, roots, rng):
+    weights = [1 / (rank + 1) for rank in range(len(roots))]
+    return [
+        (f"doc_{i}", " ".join(rng.choice(PREFIXES) + root + rng.choice(SUFFIXES)
+                              for root in rng.choices(roots, weights=weights, k=60)), "")
+        for i in range(chunks)
+    ]
+
+
+def cold(model):
+    """ذاكرة مؤقتة باردة للردود والتقسيم والتجذيع"""
+    model.cache.clear()
+    for cached in (tokenize, stem_tokens, stem):
+        cached.cache_clear()
+
+
+def main():
+    chunks = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    batch_size = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+
+    rng = random.Random(11)
+    letters = "بتثجحخدذرزسشصضطظعغفقكلمن"
+    roots = list({"".join(rng.choices(letters, k=rng.randint(3, 5))) for _ in range(5000)})
+    model = SimpleAIModel()
+    model.store.add_documents("bench", synthetic_documents(chunks, roots, rng))
+    model.store.optimize()
+    model.sync_vectors()
+    model.sync_tfidf()
+
+    messages = [
+        f"{i} " + " ".join(rng.choices(FILLER, k=rng.randint(2, 8))
+                           + [rng.choice(PREFIXES) + rng.choice(roots[:2000]) for _ in range(rng.randint(1, 3))])
+        for i in range(count)
+    ]
+    print(f"📊 {chunks:,} مقطع، {count:,} رسالة فريدة، دفعات من {batch_size}")
+
+    cold(model)
+    start = time.perf_counter()
+    single = [model.generate_response(message) for message in messages]
+    single_seconds = time.perf_counter() - start
+    print(f"  رسالة لكل استدعاء : {count / single_seconds:8,.0f} رسالة/ث")
+
+    cold(model)
+    stages = {}
+    start = time.perf_counter()
+    batched = []
+    for offset in range(0, count, batch_size):
+        batched.extend(model.generate_responses(messages[offset:offset + batch_size]))
+        for stage, seconds in model.last_batch_timings.items():
+            stages[stage] = stages.get(stage, 0.0) + seconds
+    batch_seconds = time.perf_counter() - start
+    print(f"  generate_responses : {count / batch_seconds:8,.0f} رسالة/ث (x{single_seconds / batch_seconds:.1f})")
+    print("  أزمنة مراحل الدفعات: " + "، ".join(
+        f"{stage} {seconds:.2f}s" for stage, seconds in stages.items() if stage != "total"))
+
+    errors = sum(1 for result in batched if result["status"] != "success")
+    same = sum(1 for result, response in zip(batched, single) if result.get("response") == response)
+    print(f"  تطابق الردود مع المسار الفردي: {same:,}/{count:,}، أخطاء {errors}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+قياس زمن أول بايت (TTFB) لـ /api/chat مقارنة بـ /api/chat/stream تحت حمل متزامن
+على خادم uvicorn محلي حقيقي (ASGITransport يجمع الجسم كاملاً فلا يصلح لقياس البث)
+السيناريو الأول: تطبيق FastAPI الفعلي بردوده الجاهزة
+السيناريو الثاني: توليد مقطعاً مقطعاً بتأخير ثابت لكل مقطع (محاكاة نموذج لغوي)
+التشغيل: python -m benchmarks.bench_chat_stream [عدد العملاء المتزامنين] [عدد الطلبات]
+"""
+
+import asyncio
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+os.environ.setdefault("KNOWLEDGE_DB", ":memory:")
+
+from chat_system.streaming import sse_chat_stream
+from templates import fastapi_app
+
+MESSAGES = ["مرحبا", "أريد تعلم البرمجة", "كيف أبني خادم api", "رسالة عادية بلا نية محددة"]
+SIMULATED_FRAGMENTS = 40
+SIMULATED_DELAY = 0.005
+
+
+def build_simulated_app() -> FastAPI:
+    """نفس المسارين، لكن الرد يتولد مقطعاً مقطعاً بتأخير ثابت"""
+    app = FastAPI()
+
+    async def generate():
+        for i in range(SIMULATED_FRAGMENTS):
+            await asyncio.sleep(SIMULATED_DELAY)
+            yield f"كلمة{i} "
+
+    @app.post("/api/chat")
+    async def chat(body: fastapi_app.ChatRequest):
+        return {"status": "success", "response": "".join([f async for f in generate()])}
+
+    @app.post("/api/chat/stream")
+    async def chat_stream(body: fastapi_app.ChatRequest, request: Request):
+        return StreamingResponse(
+            sse_chat_stream(generate(), lambda text: {"status": "success"}, request.is_disconnected),
+            media_type="text/event-stream",
+        )
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(app: FastAPI):
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+async def load(base_url: str, path: str, clients: int, requests: int):
+    """(أزمنة أول بايت، الأزمنة الكلية) بالثواني"""
+    ttfb, total = [], []
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(MESSAGES[i % len(MESSAGES)])
+
+    async def client_loop(client: httpx.AsyncClient):
+        while not queue.empty():
+            message = queue.get_nowait()
+            start = time.perf_counter()
+            async with client.stream("POST", path, json={"message": message}) as response:
+                first = None
+                async for _ in response.aiter_raw():
+                    if first is None:
+                        first = time.perf_counter()
+            end = time.perf_counter()
+            ttfb.append(first - start)
+            total.append(end - start)
+
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=None) as client:
+        await asyncio.gather(*(client_loop(client) for _ in range(clients)))
+    return ttfb, total
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] * 1000
+
+
+def run_scenario(name: str, app: FastAPI, clients: int, requests: int):
+    server, thread, base_url = start_server(app)
+    try:
+        print(f"📊 {name} ({clients} عميل متزامن، {requests} طلب)")
+        for path in ("/api/chat", "/api/chat/stream"):
+            asyncio.run(load(base_url, path, clients, min(requests, 50)))  # إحماء
+            ttfb, total = asyncio.run(load(base_url, path, clients, requests))
+            print(f"  {path:<18} TTFB p50={statistics.median(ttfb) * 1000:7.2f}ms "
+                  f"p95={percentile(ttfb, 0.95):7.2f}ms | كلي p50={statistics.median(total) * 1000:7.2f}ms")
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 800
+    run_scenario("تطبيق FastAPI (ردود جاهزة)", fastapi_app.app, clients, requests)
+    run_scenario(f"توليد محاكى ({SIMULATED_FRAGMENTS} مقطع × {SIMULATED_DELAY * 1000:.0f}ms)",
+                 build_simulated_app(), clients, requests // 4)
+
+
+if __name__ == "__main__":
+    main()
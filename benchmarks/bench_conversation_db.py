@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+قياس سجل المحادثات الدائم على SQLite (ملف بـ WAL):
+- الإدراجات/ثانية بمعاملة لكل رسالة مقارنة بالدفعات من الكاتب الخلفي لـ ConversationLog
+- زمن قراءة آخر N محادثات لمستخدم عبر الفهرس (user_id, id DESC)
+التشغيل: python -m benchmarks.bench_conversation_db [عدد الرسائل] [مجلد مؤقت]
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from chat_system.conversation_db import ConversationLog, conversations_table, create_conversation_engine, metadata
+
+USERS = 1000
+
+
+def messages(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    for i in range(count):
+        yield rng.randrange(USERS), f"سؤال رقم {i} عن البرمجة والشبكات", "رد تجريبي " * rng.randint(2, 20)
+
+
+def per_message_commits(url: str, count: int) -> float:
+    """النمط الساذج: إدراج ومعاملة لكل رسالة"""
+    engine = create_conversation_engine(url)
+    metadata.create_all(engine)
+    start = time.perf_counter()
+    for i, (user_id, user, ai) in enumerate(messages(count)):
+        with engine.begin() as conn:
+            conn.execute(insert(conversations_table).values(
+                id=i + 1, user_id=user_id, user_message=user, ai_response=ai,
+                timestamp=datetime.now().isoformat()))
+    seconds = time.perf_counter() - start
+    engine.dispose()
+    return seconds
+
+
+async def batched(log: ConversationLog, count: int):
+    """(الثواني حتى كتابة الكل، أزمنة add) مع الكاتب الخلفي يعمل"""
+    log.start()
+    add_times = []
+    start = time.perf_counter()
+    for i, (user_id, user, ai) in enumerate(messages(count)):
+        t = time.perf_counter()
+        log.add(user_id, user, ai)
+        add_times.append(time.perf_counter() - t)
+        if i % 100 == 0:
+            # إفساح المجال للكاتب كما يحدث بين الطلبات في الخادم
+            await asyncio.sleep(0)
+    await log.stop()
+    return time.perf_counter() - start, add_times
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    directory = sys.argv[2] if len(sys.argv) > 2 else tempfile.mkdtemp()
+    print(f"📊 {count:,} رسالة، {USERS} مستخدم")
+
+    naive_count = min(count, 5000)
+    url = f"sqlite:///{os.path.join(directory, 'per_message.db')}"
+    seconds = per_message_commits(url, naive_count)
+    print(f"  معاملة لكل رسالة : {naive_count / seconds:10,.0f} إدراج/ث ({naive_count:,} رسالة)")
+
+    url = f"sqlite:///{os.path.join(directory, 'batched.db')}"
+    log = ConversationLog(url, batch_size=500, flush_interval=0.05)
+    seconds, add_times = asyncio.run(batched(log, count))
+    add_times.sort()
+    print(f"  دفعات (كاتب خلفي): {count / seconds:10,.0f} إدراج/ث، {log.flushes} معاملة، "
+          f"add p50={statistics.median(add_times) * 1e6:.1f}µs p99={add_times[int(0.99 * len(add_times))] * 1e6:.1f}µs")
+
+    rng = random.Random(2)
+    reads = []
+    for _ in range(500):
+        start = time.perf_counter()
+        log.recent(20, user_id=rng.randrange(USERS))
+        reads.append(time.perf_counter() - start)
+    reads.sort()
+    print(f"  آخر 20 لمستخدم   : p50={statistics.median(reads) * 1000:.3f}ms p95={reads[int(0.95 * len(reads))] * 1000:.3f}ms")
+    log.close()
+
+
+if __name__ == "__main__":
+    main()
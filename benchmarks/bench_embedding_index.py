@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+قياس فهرس المتجهات: إضافة بسعة متضاعفة إلى ملف .npy مربوط بالذاكرة،
+ثم البحث عن أفضل k بالمسح الخطي في بايثون مقابل جداء المصفوفات + argpartition
+التشغيل: python -m benchmarks.bench_embedding_index [عدد المتجهات] [مجلد الاختبار]
+"""
+
+import heapq
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from chat_system.embedding_index import EmbeddingIndex, HashingEmbedder
+
+DIM = 256
+BATCH = 10000
+QUERIES = 64
+K = 10
+
+
+def python_search(vectors, query, k):
+    """مسح خطي متجهاً متجهاً كما يُكتب دون NumPy متجه"""
+    return heapq.nlargest(k, range(len(vectors)), key=lambda i: float(np.dot(vectors[i], query)))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    base_dir = sys.argv[2] if len(sys.argv) > 2 else None
+    rng = np.random.default_rng(3)
+
+    with tempfile.TemporaryDirectory(dir=base_dir) as tmp:
+        index = EmbeddingIndex(DIM, os.path.join(tmp, "vectors.npy"))
+        start = time.perf_counter()
+        for offset in range(0, count, BATCH):
+            size = min(BATCH, count - offset)
+            index.add(range(offset + 1, offset + size + 1), rng.standard_normal((size, DIM), dtype=np.float32))
+        add_time = time.perf_counter() - start
+
+        queries = rng.standard_normal((QUERIES, DIM), dtype=np.float32)
+        index.search(queries[:1], K)
+
+        start = time.perf_counter()
+        for query in queries[:8]:
+            index.search(query, K)
+        single = (time.perf_counter() - start) / 8
+
+        start = time.perf_counter()
+        ids, _ = index.search(queries, K)
+        batched = (time.perf_counter() - start) / QUERIES
+
+        sample = min(count, 20000)
+        vectors = index._vectors[:sample]
+        start = time.perf_counter()
+        python_search(vectors, queries[0], K)
+        loop = (time.perf_counter() - start) * count / sample
+
+        exact = np.argsort(-(queries[0] @ index._vectors[:count].T))[:K] + 1
+        assert set(exact) == set(ids[0])
+
+        embedder = HashingEmbedder(DIM)
+        texts = ["مقطع تجريبي عن الشبكات والبرمجة وتعلم الآلة رقم %d " % i * 10 for i in range(2000)]
+        start = time.perf_counter()
+        embedder.embed(texts)
+        embed_rate = len(texts) / (time.perf_counter() - start)
+
+        print(f"📊 {count:,} متجه × {DIM} (float32، {index.capacity * DIM * 4 / 1e6:.0f}MB مع السعة الاحتياطية)")
+        print(f"  الإضافة: {count / add_time:,.0f} متجه/s")
+        print(f"  المسح الخطي في بايثون (تقدير): {loop * 1000:,.0f}ms/استعلام")
+        print(f"  جداء + argpartition، استعلام واحد: {single * 1000:.1f}ms")
+        print(f"  جداء + argpartition، دفعة {QUERIES}: {batched * 1000:.2f}ms/استعلام")
+        print(f"  المضمِّن المحلي: {embed_rate:,.0f} نص/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+قياس مُقيِّم SimpleAIModel متعدد العمليات: يكتب ملف JSONL معلَّماً (سطراً سطراً) ثم يقيّمه
+بعدد عمليات متزايد حتى عدد الأنوية، مع الإنتاجية والتسريع وذاكرة العملية الرئيسية القصوى
+(تبقى ثابتة مهما كبر الملف لأنه لا يُحمَّل ولا تمر أسطره بها)
+التشغيل: python -m benchmarks.bench_evaluate [عدد الأسطر] [أقصى عدد عمليات]
+"""
+
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+
+os.environ.setdefault("KNOWLEDGE_DB", ":memory:")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates"))
+
+from evaluate_model import evaluate  # noqa: E402
+
+# (صيغ الرسالة، التصنيف المتوقع)
+LABELED = [
+    (["ما هو بروتوكول dns", "كيف يعمل DNS", "اشرح لي أسماء النطاقات"], "الشبكات/dns"),
+    (["ما هو http", "بروتوكول HTTP للويب"], "الشبكات/http"),
+    (["ما هو TCP/IP", "أساس الاتصالات عبر الإنترنت"], "الشبكات"),
+    (["أريد تعلم python", "لغة بايثون للبيانات"], "البرمجة/python"),
+    (["javascript للويب", "تطوير التطبيقات التفاعلية"], "البرمجة"),
+    (["ما هو التعلم العميق", "الشبكات العصبية"], "الذكاء الاصطناعي/dl"),
+    (["اكتب لي سكريبت", "عندي كود لا يعمل"], "programming"),
+    (["إعداد خادم جديد"], "networking"),
+    (["كيف حالك اليوم", "أخبرني نكتة"], "default"),
+]
+FILLER = "من فضلك لو سمحت سؤال سريع الآن".split()
+
+
+def write_dataset(path, lines, seed=5):
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(lines):
+            phrasings, expected = rng.choice(LABELED)
+            message = f"{rng.choice(phrasings)} {rng.choice(FILLER)} {i}"
+            f.write(json.dumps({"message": message, "expected": expected}, ensure_ascii=False) + "\n")
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "eval.jsonl")
+        write_dataset(path, lines)
+        size = os.path.getsize(path)
+        print(f"📊 {lines:,} سطر ({size / 1e6:.1f}MB)، {os.cpu_count()} نواة")
+
+        baseline = None
+        workers = 1
+        while workers <= max_workers:
+            report = evaluate(path, workers, shard_bytes=max(64 * 1024, size // (workers * 8)))
+            rate = report["messages_per_second"]
+            baseline = baseline or rate
+            latency = report["latency_ms"]
+            print(f"  {workers:>3} عملية: {rate:8,.0f} رسالة/ث (x{rate / baseline:.2f})، "
+                  f"دقة {report['accuracy']:.1%}، p50={latency['p50']:.2f}ms p99={latency['p99']:.2f}ms")
+            workers *= 2
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"  ذاكرة العملية الرئيسية القصوى: {peak:.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+قياس البحث في مخزن المعرفة (FTS5 + BM25) على مجموعة اصطناعية من مليون مقطع
+المفردات بتوزيع Zipf تقريبي كي تحوي الاستعلامات كلمات شائعة ونادرة
+التشغيل: python -m benchmarks.bench_fts [عدد المقاطع] [مجلد الاختبار]
+"""
+
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from chat_system.knowledge_store import KnowledgeStore
+
+VOCABULARY_SIZE = 50000
+WORDS_PER_CHUNK = 40
+BATCH = 50000
+QUERIES = 2000
+PREFIXES = ("بيان", "شبكة", "نموذج", "خادم", "مكتبة", "لغة", "data", "model", "server")
+
+
+def vocabulary():
+    return [f"{PREFIXES[i % len(PREFIXES)]}{i}" for i in range(VOCABULARY_SIZE)]
+
+
+def zipf_sampler(words, rng):
+    cumulative = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(words))))
+    return lambda k: rng.choices(words, cum_weights=cumulative, k=k)
+
+
+def build_corpus(store, chunk_count, seed=5):
+    rng = random.Random(seed)
+    sample = zipf_sampler(vocabulary(), rng)
+    for start in range(0, chunk_count, BATCH):
+        count = min(BATCH, chunk_count - start)
+        store.add_documents("synthetic", (
+            (f"doc_{start + i}", " ".join(sample(WORDS_PER_CHUNK)), "")
+            for i in range(count)
+        ))
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    chunk_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    base_dir = sys.argv[2] if len(sys.argv) > 2 else None
+    with tempfile.TemporaryDirectory(dir=base_dir) as tmp:
+        store = KnowledgeStore(os.path.join(tmp, "knowledge.db"))
+        start = time.perf_counter()
+        build_corpus(store, chunk_count)
+        store.optimize()
+        build_time = time.perf_counter() - start
+
+        # استعلامات من كلمتين إلى أربع: كلمات نادرة عشوائية، وكلمات مأخوذة من مقاطع حقيقية
+        # (تخلط الشائع بالنادر كما في أسئلة المستخدمين)
+        rng = random.Random(6)
+        words = vocabulary()
+        rare = [" ".join(rng.choices(words[1000:], k=rng.randint(2, 4))) for _ in range(QUERIES)]
+        from_chunks = []
+        for _ in range(QUERIES):
+            content = store.search(rng.choice(rare), 1) or [{"content": rng.choice(words)}]
+            chunk_words = content[0]["content"].split()
+            from_chunks.append(" ".join(rng.sample(chunk_words, min(len(chunk_words), rng.randint(2, 4)))))
+
+        print(f"📊 {chunk_count:,} مقطع، البناء: {build_time:.1f}s "
+              f"({chunk_count / build_time:,.0f} مقطع/s)، الملف: {os.path.getsize(store.path) / 1e6:.0f}MB")
+        for name, queries in (("كلمات نادرة", rare), ("كلمات من مقاطع المخزن", from_chunks)):
+            for query in queries:
+                store.search(query, 5)
+            latencies = []
+            for query in queries:
+                t = time.perf_counter()
+                store.search(query, 5)
+                latencies.append((time.perf_counter() - t) * 1000)
+            print(f"  {name}: متوسط {statistics.mean(latencies):.3f}ms، "
+                  f"p50 {percentile(latencies, 0.5):.3f}ms، p99 {percentile(latencies, 0.99):.3f}ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
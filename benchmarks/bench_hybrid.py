@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+قياس الاسترجاع الهجين في SimpleAIModel على مخزن اصطناعي:
+زمن كل مرحلة (نصي، متجهي، دمج) والزمن الكلي، والتوازي مقارنة بمجموع المرحلتين
+التشغيل: python -m benchmarks.bench_hybrid [عدد الملفات في الأرشيف]
+"""
+
+import io
+import random
+import sys
+import zipfile
+
+from templates.ai_model import SimpleAIModel
+
+WORDS = ("بروتوكول شبكة خادم ذكاء اصطناعي تعلم نموذج بيانات برمجة لغة مكتبة واجهة قاعدة "
+         "python server network model data learning request response cache index").split()
+QUERIES = 300
+
+
+def build_archive(files, seed=8):
+    rng = random.Random(seed)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for i in range(files):
+            text = " ".join(rng.choice(WORDS) + str(rng.randrange(500)) for _ in range(2000))
+            archive.writestr(f"doc_{i}.txt", text)
+    buffer.seek(0)
+    return buffer
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    model = SimpleAIModel()
+    result = model.learn_from_zip(build_archive(files))
+    print(f"📊 {result['chunks'] + 9:,} مقطع، {QUERIES} استعلام")
+
+    rng = random.Random(9)
+    for _ in range(QUERIES):
+        model.generate_response(" ".join(rng.choice(WORDS) + str(rng.randrange(500)) for _ in range(3)))
+
+    summary = model.latency.summary()
+    for stage in ("preprocess", "lexical", "vector", "fusion", "retrieval", "intent", "total"):
+        if stage in summary:
+            stats = summary[stage]
+            print(f"  {stage:<10} متوسط {stats['mean_ms']:.3f}ms، p50 {stats['p50_ms']:.3f}ms، p95 {stats['p95_ms']:.3f}ms")
+    sequential = summary["lexical"]["mean_ms"] + summary["vector"]["mean_ms"]
+    print(f"  مجموع المرحلتين لو نُفذتا تباعاً: {sequential:.3f}ms مقابل {summary['retrieval']['mean_ms']:.3f}ms بالتوازي")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+قياس تغذية مخزن المعرفة من أرشيف ZIP اصطناعي (1GB افتراضياً):
+الإنتاجية بـ MB/s ومقطع/s، وذروة الذاكرة قبل التغذية وبعدها
+التشغيل: python -m benchmarks.bench_ingest [الحجم بالميغابايت] [مجلد الاختبار]
+"""
+
+import os
+import random
+import resource
+import sys
+import tempfile
+import zipfile
+
+from chat_system.knowledge_store import KnowledgeStore
+
+FILE_MB = 8
+WORDS = ("بروتوكول شبكة خادم ذكاء اصطناعي تعلم نموذج بيانات برمجة لغة python "
+         "server network model data learning request response cache index").split()
+
+
+def build_archive(path, total_mb, seed=11):
+    """أرشيف من ملفات نصية بحجم FILE_MB لكل منها؛ كتلة عشوائية واحدة تتكرر مع ترقيم مختلف"""
+    rng = random.Random(seed)
+    block = " ".join(rng.choice(WORDS) for _ in range(20000)) + "\n"
+    block_bytes = len(block.encode('utf-8'))
+    repeats = max(1, FILE_MB * 1024 * 1024 // block_bytes)
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+        for i in range(max(1, total_mb // FILE_MB)):
+            with archive.open(f"docs/part_{i:04d}.txt", 'w') as member:
+                for j in range(repeats):
+                    member.write(f"# قسم {i}-{j}\n".encode('utf-8'))
+                    member.write(block.encode('utf-8'))
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    total_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    base_dir = sys.argv[2] if len(sys.argv) > 2 else None
+    with tempfile.TemporaryDirectory(dir=base_dir) as tmp:
+        archive_path = os.path.join(tmp, "knowledge.zip")
+        build_archive(archive_path, total_mb)
+        rss_before = peak_rss_mb()
+
+        store = KnowledgeStore(os.path.join(tmp, "knowledge.db"))
+        result = store.ingest_zip(archive_path)
+        store.close()
+
+        mb = result["bytes"] / (1024 * 1024)
+        print(f"📊 أرشيف {os.path.getsize(archive_path) / 1e6:.0f}MB مضغوط، {mb:.0f}MB نص في {result['files']} ملف")
+        print(f"  الزمن: {result['seconds']:.1f}s")
+        print(f"  الإنتاجية: {mb / result['seconds']:.1f} MB/s، {result['chunks'] / result['seconds']:,.0f} مقطع/s "
+              f"({result['chunks']:,} مقطع)")
+        print(f"  ذروة الذاكرة: {rss_before:.0f}MB قبل التغذية، {peak_rss_mb():.0f}MB بعدها")
+
+
+if __name__ == "__main__":
+    main()
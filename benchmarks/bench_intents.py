@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+قياس أداء مطابقة النوايا: سلسلة any() القديمة مقابل المحرك المجمّع
+التشغيل: python -m benchmarks.bench_intents
+"""
+
+import random
+import time
+
+from chat_system.intents import IntentEngine
+from main import CHAT_INTENTS, BassamChatAI
+
+FILLER = ["هل", "يمكن", "أن", "تساعدني", "في", "مشروع", "جديد", "اليوم", "من", "فضلك",
+          "hello", "please", "need", "help", "with", "my", "project"]
+
+
+def chained_process_chat_input(user_input):
+    """نسخة من سلسلة الشروط السابقة للمقارنة"""
+    input_lower = user_input.lower()
+
+    if any(word in input_lower for word in ['مرحبا', 'اهلا', 'السلام']):
+        return "greeting"
+    elif any(word in input_lower for word in ['برمجة', 'كود', 'سكريبت']):
+        return "programming"
+    elif any(word in input_lower for word in ['شبكة', 'خادم', 'سيرفر']):
+        return "networking"
+    elif any(word in input_lower for word in ['شكرا', 'ممتاز', 'رائع']):
+        return "thanks"
+    elif 'اسمك' in input_lower:
+        return "name"
+    else:
+        return None
+
+
+def chained_match(intents, user_input):
+    """سلسلة any() عامة على جدول نوايا (المعادل المباشر للأسلوب القديم)"""
+    input_lower = user_input.lower()
+    for name, keywords, _ in intents:
+        if any(word in input_lower for word in keywords):
+            return name
+    return None
+
+
+def build_intents(intent_count, keywords_per_intent=10, seed=5):
+    """توليد جدول نوايا اصطناعي كبير"""
+    rng = random.Random(seed)
+    letters = "ابتثجحخدذرزسشصضطظعغفقكلمنهوي"
+    return [
+        (f"intent_{i}", ["".join(rng.choices(letters, k=rng.randint(4, 8))) for _ in range(keywords_per_intent)], "")
+        for i in range(intent_count)
+    ]
+
+
+def build_messages(count, intents=CHAT_INTENTS, seed=3):
+    rng = random.Random(seed)
+    keywords = [kw for _, kws, _ in intents for kw in kws]
+    messages = []
+    for _ in range(count):
+        words = rng.choices(FILLER, k=rng.randint(5, 40))
+        if rng.random() < 0.6:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(keywords))
+        messages.append(" ".join(words))
+    return messages
+
+
+def rate(func, messages):
+    start = time.perf_counter()
+    for message in messages:
+        func(message)
+    return len(messages) / (time.perf_counter() - start)
+
+
+def main():
+    engine = IntentEngine(CHAT_INTENTS)
+    messages = build_messages(100_000)
+
+    for message in messages[:2000]:
+        intent = engine.match(message)
+        assert (intent[0] if intent else None) == chained_process_chat_input(message)
+
+    before = rate(chained_process_chat_input, messages)
+    after = rate(engine.match, messages)
+    full = rate(BassamChatAI().process_chat_input, messages)
+
+    print(f"📊 {len(messages):,} رسالة")
+    print(f"  سلسلة any(): {before:,.0f} رسالة/ث")
+    print(f"  المحرك المجمّع: {after:,.0f} رسالة/ث (x{after / before:.1f})")
+    print(f"  process_chat_input كاملة: {full:,.0f} رسالة/ث")
+
+    for intent_count in (20, 100):
+        intents = build_intents(intent_count)
+        engine = IntentEngine(intents)
+        messages = build_messages(20_000, intents)
+
+        before = rate(lambda m: chained_match(intents, m), messages)
+        after = rate(engine.match, messages)
+        print(f"📊 {intent_count} نية × 10 كلمات")
+        print(f"  سلسلة any(): {before:,.0f} رسالة/ث")
+        print(f"  المحرك المجمّع: {after:,.0f} رسالة/ث (x{after / before:.1f})")
+
+
+if __name__ == "__main__":
+    main()
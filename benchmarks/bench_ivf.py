@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+قياس فهرس IVF مقابل البحث الدقيق على متجهات اصطناعية متجمعة:
+زمن البناء، الذاكرة لكل متجه، recall@k، وزمن الاستعلام لعدة قيم n_probe
+التشغيل: python -m benchmarks.bench_ivf [عدد المتجهات]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from chat_system.embedding_index import EmbeddingIndex
+from chat_system.ivf_index import IVFIndex, recall_at_k
+
+DIM = 256
+K = 10
+QUERIES = 200
+N_LISTS = 512
+
+
+def clustered_vectors(count, rng, clusters=2000):
+    """متجهات حول مراكز عشوائية (كمقاطع نصية تتشارك مواضيعها)"""
+    centers = rng.standard_normal((clusters, DIM), dtype=np.float32)
+    labels = rng.integers(0, clusters, count)
+    return centers[labels] + 0.6 * rng.standard_normal((count, DIM), dtype=np.float32)
+
+
+def timed_search(index, queries, **kwargs):
+    start = time.perf_counter()
+    ids, _ = index.search(queries, K, **kwargs)
+    return ids, (time.perf_counter() - start) / len(queries)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    rng = np.random.default_rng(4)
+    vectors = clustered_vectors(count, rng)
+    queries = vectors[rng.choice(count, QUERIES, replace=False)] + 0.3 * rng.standard_normal((QUERIES, DIM), dtype=np.float32)
+    ids = np.arange(1, count + 1)
+
+    exact = EmbeddingIndex(DIM)
+    exact.add(ids, vectors)
+    exact_ids, exact_time = timed_search(exact, queries)
+    print(f"📊 {count:,} متجه × {DIM}، {QUERIES} استعلام، k={K}")
+    print(f"  البحث الدقيق: {exact_time * 1000:.2f}ms/استعلام، {DIM * 4 + 8} بايت/متجه")
+
+    for quantizer in (None, 'sq8', 'pq'):
+        index = IVFIndex(DIM, n_lists=N_LISTS, quantizer=quantizer, pq_subvectors=32, train_size=count)
+        start = time.perf_counter()
+        index.add(ids, vectors)
+        build_time = time.perf_counter() - start
+        name = quantizer or 'float32'
+        print(f"  IVF-{name}: البناء {build_time:.1f}s، {index.bytes_per_vector():.1f} بايت/متجه")
+        for n_probe in (4, 16, 64):
+            approx_ids, approx_time = timed_search(index, queries, n_probe=n_probe)
+            print(f"    n_probe={n_probe}: recall@{K} {recall_at_k(approx_ids, exact_ids):.3f}، "
+                  f"{approx_time * 1000:.2f}ms/استعلام")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+قياس طبقة المزودين على الخادم التجريبي المحلي:
+- الجلسة المشتركة (keep-alive) مقارنة بجلسة جديدة لكل طلب: الطلبات/ثانية وعدد الاتصالات المفتوحة
+- حد التزامن لكل مزود
+- إعادة المحاولة مع نسبة أخطاء عابرة
+التشغيل: python -m benchmarks.bench_llm_providers [عدد الطلبات] [زمن رد الخادم بالثواني]
+"""
+
+import asyncio
+import sys
+import time
+
+from chat_system.llm_mock_server import MockLLMServer
+from chat_system.llm_providers import ClientPool, ProviderError, create_provider
+
+PROVIDER_PATHS = {"openai": "/v1", "ollama": "", "gemini": ""}
+CONCURRENCY = 64
+
+
+def make_provider(name, base_url, pool, **settings):
+    return create_provider(name, pool=pool, model="mock", base_url=base_url + PROVIDER_PATHS[name],
+                           api_key="test", **settings)
+
+
+async def drive(provider, requests: int):
+    """(الثواني، عدد الفاشلة)"""
+    async def one(i):
+        try:
+            await provider.complete([{"role": "user", "content": f"سؤال رقم {i}"}])
+            return 0
+        except ProviderError:
+            return 1
+
+    start = time.perf_counter()
+    failed = sum(await asyncio.gather(*(one(i) for i in range(requests))))
+    return time.perf_counter() - start, failed
+
+
+async def fresh_session_per_request(base_url, requests: int):
+    """النمط الساذج: جلسة (واتصال) جديدة لكل طلب"""
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def one(i):
+        async with semaphore:
+            pool = ClientPool()
+            provider = make_provider("openai", base_url, pool)
+            try:
+                await provider.complete([{"role": "user", "content": f"سؤال رقم {i}"}])
+            finally:
+                await pool.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return time.perf_counter() - start
+
+
+async def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.01
+
+    server = MockLLMServer(latency=latency)
+    base_url = await server.start()
+    print(f"📊 {requests} طلب، زمن رد الخادم {latency * 1000:.0f}ms، تزامن {CONCURRENCY}")
+
+    seconds = await fresh_session_per_request(base_url, requests)
+    print(f"  جلسة لكل طلب      : {requests / seconds:8.0f} طلب/ث، اتصالات مفتوحة: {server.connections}")
+
+    for name in PROVIDER_PATHS:
+        server.reset()
+        pool = ClientPool()
+        provider = make_provider(name, base_url, pool, concurrency=CONCURRENCY)
+        seconds, _ = await drive(provider, requests)
+        print(f"  جلسة مشتركة {name:<6}: {requests / seconds:8.0f} طلب/ث، اتصالات مفتوحة: {server.connections}")
+        await pool.close()
+
+    print("  حد التزامن (openai، جلسة مشتركة):")
+    for concurrency in (1, 8, 32, 128):
+        server.reset()
+        pool = ClientPool()
+        provider = make_provider("openai", base_url, pool, concurrency=concurrency)
+        count = min(requests, 100 * concurrency)
+        seconds, _ = await drive(provider, count)
+        print(f"    {concurrency:>4}: {count / seconds:8.0f} طلب/ث، اتصالات: {server.connections}")
+        await pool.close()
+
+    print("  إعادة المحاولة مع أخطاء 503 عابرة:")
+    for failure_rate in (0.05, 0.2):
+        server.reset()
+        server.failure_rate = failure_rate
+        pool = ClientPool()
+        provider = make_provider("openai", base_url, pool, concurrency=CONCURRENCY, retries=3, backoff=0.01)
+        seconds, failed = await drive(provider, requests)
+        print(f"    {failure_rate:.0%}: {requests / seconds:8.0f} طلب/ث، إعادات: {provider.retried}، "
+              f"فشل نهائي: {failed}/{requests}")
+        await pool.close()
+
+    await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
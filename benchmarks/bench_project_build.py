@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+قياس البناء التزايدي لمشروع من 2000 ملف:
+بناء أول كامل، ثم إعادة بناء بلا تغيير، ثم إعادة بناء بعد تعديل ملف واحد
+التشغيل: python -m benchmarks.bench_project_build [مجلد الاختبار]
+"""
+
+import sys
+import tempfile
+
+from shell_system.project_build import build_project
+
+FILE_COUNT = 2000
+
+
+def build_manifest(changed=None):
+    files = [
+        {"path": f"pkg_{i % 20}/module_{i}.py",
+         "content": "# {project} - وحدة رقم " + str(i) + "\n" + "x = 1\n" * 100}
+        for i in range(FILE_COUNT)
+    ]
+    if changed is not None:
+        files[changed]["content"] += "y = 2\n"
+    return {"name": "bench", "variables": {"project": "bench"}, "files": files}
+
+
+def report(name, result):
+    print(f"  {name}: {result['seconds'] * 1000:.1f}ms — "
+          f"{len(result['created'])} جديد، {len(result['updated'])} محدَّث، {len(result['skipped'])} دون تغيير")
+
+
+def main():
+    base_dir = sys.argv[1] if len(sys.argv) > 1 else None
+    with tempfile.TemporaryDirectory(dir=base_dir) as tmp:
+        print(f"📊 مشروع من {FILE_COUNT:,} ملف")
+        report("البناء الأول", build_project(build_manifest(), tmp))
+        noop = min((build_project(build_manifest(), tmp) for _ in range(5)), key=lambda r: r["seconds"])
+        assert not noop["created"] and not noop["updated"]
+        report("إعادة البناء بلا تغيير", noop)
+        report("تعديل ملف واحد", build_project(build_manifest(changed=7), tmp))
+
+
+if __name__ == "__main__":
+    main()
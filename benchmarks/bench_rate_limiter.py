@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+قياس كلفة محدد المعدل لكل طلب مع 100 ألف عنوان IP مختلف
+التشغيل: python -m benchmarks.bench_rate_limiter
+"""
+
+import os
+import random
+import tempfile
+import time
+
+from shell_system.rate_limiter import MemoryBackend, SQLiteBackend, TokenBucketLimiter
+
+DISTINCT_IPS = 100_000
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def random_ips(count, seed=1):
+    rng = random.Random(seed)
+    return [f"{rng.randrange(1, 255)}.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}"
+            for _ in range(count)]
+
+
+def run(name, backend, hits):
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(rate=1.0, burst=5.0, backend=backend, sweep_interval=60.0, clock=clock)
+    ips = random_ips(DISTINCT_IPS)
+    keys = [ips[i % DISTINCT_IPS] for i in range(hits)]
+
+    start = time.perf_counter()
+    for key in keys:
+        clock.now += 0.0001
+        limiter.hit(key)
+    elapsed = time.perf_counter() - start
+
+    keys_before = len(backend)
+    clock.now += limiter.idle_after + 1
+    sweep_start = time.perf_counter()
+    evicted = limiter.sweep()
+    sweep_time = time.perf_counter() - sweep_start
+
+    print(f"📊 {name}")
+    print(f"  {hits:,} طلب: {elapsed / hits * 1e6:.2f} µs/طلب")
+    print(f"  مفاتيح قبل الحذف: {keys_before:,}، محذوفة: {evicted:,} في {sweep_time * 1000:.1f}ms، متبقية: {len(backend):,}")
+
+
+def main():
+    run("MemoryBackend", MemoryBackend(), 300_000)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        run("SQLiteBackend", SQLiteBackend(os.path.join(tmp, "rate.db")), DISTINCT_IPS)
+
+
+if __name__ == "__main__":
+    main()
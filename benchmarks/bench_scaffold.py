@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+قياس إنشاء مشروع من 5000 ملف:
+الكتابة المتتالية السابقة مقابل محرك الهياكل (مجلدات فريدة + كتابة متوازية)
+التشغيل: python -m benchmarks.bench_scaffold [مجلد الاختبار]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from shell_system.scaffold import scaffold
+
+FILE_COUNT = 5000
+REPEAT = 3
+
+
+def build_spec():
+    # 50 حزمة × 10 وحدات = 500 مجلد يتشاركها 5000 ملف
+    directories = [f"pkg_{i}" for i in range(50)]
+    files = [
+        {"name": f"pkg_{i % 50}/module_{(i // 50) % 10}/file_{i}.py",
+         "content": f"# ملف رقم {i}\n" + "x = 1\n" * 200}
+        for i in range(FILE_COUNT)
+    ]
+    return {"directories": directories, "files": files}
+
+
+def sequential_create(project_path, structure):
+    """نسخة من FileBuilder.create_project_structure السابقة"""
+    os.makedirs(project_path, exist_ok=True)
+    for directory in structure["directories"]:
+        os.makedirs(os.path.join(project_path, directory), exist_ok=True)
+    for file_info in structure["files"]:
+        file_path = os.path.join(project_path, file_info["name"])
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(file_info.get("content", ""))
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    structure = build_spec()
+    files = [(f["name"], f["content"]) for f in structure["files"]]
+
+    base_dir = sys.argv[1] if len(sys.argv) > 1 else None
+    with tempfile.TemporaryDirectory(dir=base_dir) as tmp:
+        runs = [
+            ("الطريقة السابقة (متتالية)", lambda path: sequential_create(path, structure)),
+            ("المحرك، خيط واحد", lambda path: scaffold(path, files, structure["directories"], max_workers=1)),
+            ("المحرك، مجموعة خيوط", lambda path: scaffold(path, files, structure["directories"])),
+            ("المحرك، خيوط + كتابة ذرّية", lambda path: scaffold(path, files, structure["directories"], atomic=True)),
+        ]
+
+        # جولة تسخين لنظام الملفات، ثم أفضل زمن من عدة جولات لكل طريقة
+        sequential_create(os.path.join(tmp, "warmup"), structure)
+        shutil.rmtree(os.path.join(tmp, "warmup"))
+
+        print(f"📊 مشروع من {FILE_COUNT:,} ملف")
+        for name, run in runs:
+            path = os.path.join(tmp, "project")
+            best = None
+            for _ in range(REPEAT):
+                result, elapsed = timed(lambda: run(path))
+                shutil.rmtree(path)
+                best = elapsed if best is None else min(best, elapsed)
+            print(f"  {name}: {best * 1000:.0f}ms")
+            if result:
+                slowest = max(result["files"], key=lambda item: item["seconds"])
+                print(f"    المجلدات: {result['directories_seconds'] * 1000:.1f}ms، "
+                      f"أبطأ ملف: {slowest['seconds'] * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+قياس دمج الطلبات المتطابقة: موجة من طلبات /api/chat بنفس السؤال تصل معاً،
+والرسائل التي لا تطابق نية تذهب لمزود تجريبي محلي بزمن رد ثابت
+يقارن عدد استدعاءات المزود وزمن الطلبات مع الدمج وبدونه
+التشغيل: python -m benchmarks.bench_single_flight [حجم الموجة] [زمن رد المزود بالثواني]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+os.environ.setdefault("KNOWLEDGE_DB", ":memory:")
+
+from chat_system.llm_mock_server import MockLLMServer
+from chat_system.llm_providers import ClientPool, create_provider
+from templates import fastapi_app
+
+QUESTIONS = ["ما هي عاصمة فرنسا؟", "ما هي عاصمة فرنسا", "كيف أتعلم بايثون؟", "اشرح لي بروتوكول TCP"]
+
+
+async def wave(client: httpx.AsyncClient, size: int):
+    """موجة متزامنة؛ كل سؤال يتكرر size / len(QUESTIONS) مرة بصيغ متطابقة بعد التطبيع"""
+    async def one(message):
+        start = time.perf_counter()
+        response = await client.post("/api/chat", json={"message": message})
+        response.raise_for_status()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one(QUESTIONS[i % len(QUESTIONS)]) for i in range(size)))
+    return time.perf_counter() - start, latencies
+
+
+async def run(coalesce: bool, size: int, latency: float):
+    server = MockLLMServer(latency=latency)
+    base_url = await server.start()
+    pool = ClientPool()
+    fastapi_app.llm = create_provider("openai", pool=pool, model="mock", base_url=base_url + "/v1")
+    fastapi_app.response_cache.clear()
+    flight = fastapi_app.reply_flight = fastapi_app.AsyncSingleFlight()
+    original = fastapi_app.generate_reply
+    if not coalesce:
+        # المسار نفسه دون طبقة الدمج
+        fastapi_app.generate_reply = fastapi_app._generate_reply
+
+    try:
+        transport = httpx.ASGITransport(app=fastapi_app.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+            seconds, latencies = await wave(client, size)
+    finally:
+        fastapi_app.generate_reply = original
+        await pool.close()
+        await server.stop()
+
+    latencies.sort()
+    name = "مع الدمج" if coalesce else "بدون دمج"
+    print(f"  {name}: {seconds * 1000:7.1f}ms للموجة، p50={statistics.median(latencies) * 1000:6.1f}ms "
+          f"max={latencies[-1] * 1000:6.1f}ms، استدعاءات المزود: {server.requests}، "
+          f"طلبات مدموجة: {flight.coalesced}")
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    print(f"📊 موجة من {size} طلب ({len(QUESTIONS)} صيغ، 3 أسئلة مختلفة)، زمن المزود {latency * 1000:.0f}ms، "
+          f"حد تزامن المزود 8")
+    asyncio.run(run(False, size, latency))
+    asyncio.run(run(True, size, latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+قياس أثر التجذيع الخفيف على:
+- النوايا: نسبة الرسائل المصرَّفة (البرمجة، برمجيات، والشبكات...) التي تُطابق نيتها، وحجم النمط وزمن المطابقة،
+  مقارنة بتوسيع قوائم الكلمات بكل الصيغ دون تجذيع
+- فهرس المعرفة: عدد الكلمات المختلفة في FTS5 وحجم القاعدة وزمن البحث، ونسبة المقاطع المطابقة
+  لكل صيغ الكلمة
+التشغيل: python -m benchmarks.bench_stemming [عدد المقاطع]
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from chat_system.arabic import stem, stem_tokens, tokenize
+from chat_system.intents import IntentEngine
+from chat_system.knowledge_store import KnowledgeStore, query_terms
+from main import CHAT_INTENTS
+
+PREFIXES = ['', 'ال', 'وال', 'بال', 'لل', 'و']
+SUFFIXES = ['', 'ة', 'ات', 'ين', 'ون', 'ها', 'ي']
+FILLER = "أريد أن أتعلم عن هل يمكن في اليوم من فضلك لدي سؤال حول".split()
+
+# (الرسالة، النية المتوقعة) بصيغ غير موجودة حرفياً في قوائم الكلمات؛
+# جموع التكسير (أكواد، خوادم) خارج قدرة المجذِّع الخفيف
+INFLECTED = [
+    ("أحب البرمجيات الحديثة", "programming"), ("ساعدني في برمجياتي", "programming"),
+    ("عندي أكواد كثيرة", "programming"), ("اكتب لي سكريبتات", "programming"),
+    ("مشكلة في الخوادم", "networking"), ("والشبكات اللاسلكية", "networking"),
+    ("إعداد السيرفرات", "networking"), ("بالشبكة المحلية", "networking"),
+    ("مرحباً بك", "greeting"), ("السلام عليكم", "greeting"), ("أهلاً وسهلاً", "greeting"),
+    ("شكراً جزيلاً", "thanks"), ("عمل ممتازة", "thanks"), ("ما اسمك؟", "name"),
+]
+
+
+def expanded_intents():
+    """الحل السابق: كل صيغة في القائمة"""
+    return [
+        (name, [p + k + s for k in keywords for p in PREFIXES for s in SUFFIXES], response)
+        for name, keywords, response in CHAT_INTENTS
+    ]
+
+
+def measure_intents(label, engine, messages):
+    hits = sum(1 for text, expected in INFLECTED if (engine.match(text) or ("",))[0] == expected)
+    # ذاكرة مؤقتة باردة لكل تشغيل كي لا يستفيد اللاحق من سابقه
+    for cached in (tokenize, stem_tokens, stem):
+        cached.cache_clear()
+    start = time.perf_counter()
+    for message in messages:
+        engine.match(message)
+    per_message = (time.perf_counter() - start) / len(messages)
+    print(f"  {label:<30}: مطابقة {hits}/{len(INFLECTED)}، "
+          f"{len(engine.priorities):>4} مفتاح، نمط {len(engine.pattern.pattern):>5} محرف، {per_message * 1e6:6.2f}µs/رسالة")
+
+
+def synthetic_corpus(chunks, seed=4):
+    """مقاطع من جذور اصطناعية بسوابق ولواحق عشوائية، مع المقاطع الحاوية لكل جذر بأي صيغة"""
+    rng = random.Random(seed)
+    letters = "بتثجحخدذرزسشصضطظعغفقكلمن"
+    roots = list({"".join(rng.choices(letters, k=rng.randint(3, 5))) for _ in range(3000)})
+    weights = [1 / (rank + 1) for rank in range(len(roots))]
+    cumulative = []
+    total = 0.0
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    containing = {}
+    documents = []
+    for i in range(chunks):
+        picked = rng.choices(roots, cum_weights=cumulative, k=60)
+        words = [rng.choice(PREFIXES) + root + rng.choice(SUFFIXES) for root in picked]
+        for root in picked:
+            containing.setdefault(root, set()).add(i)
+        documents.append((f"doc_{i}", " ".join(words), ""))
+    return roots, containing, documents
+
+
+def measure_store(label, path, stemming, roots, containing, documents, rng):
+    start = time.perf_counter()
+    store = KnowledgeStore(path, stemming=stemming)
+    store.add_documents("bench", documents)
+    store.optimize()
+    build = time.perf_counter() - start
+    with store._lock:
+        vocabulary = store._conn.execute("SELECT COUNT(*) FROM chunks_vocab").fetchone()[0]
+        pages = store._conn.execute("SELECT SUM(pgsize) FROM dbstat WHERE name LIKE 'chunks_fts%'").fetchone()[0]
+
+    queries = [rng.choice(PREFIXES) + rng.choice(roots[:500]) + rng.choice(SUFFIXES) for _ in range(500)]
+    latencies, coverage = [], []
+    for query in queries:
+        start = time.perf_counter()
+        store.search(query, 5)
+        latencies.append(time.perf_counter() - start)
+    for root in roots[:500]:
+        query = rng.choice(PREFIXES[1:]) + root + rng.choice(SUFFIXES[1:])
+        with store._lock:
+            matched = store._frequencies(query_terms(query, stemming))
+        coverage.append(max(matched.values(), default=0) / len(containing[root]))
+    latencies.sort()
+    print(f"  {label:<12}: بناء {build:5.2f}s، {vocabulary:>7,} كلمة في الفهرس، FTS {pages / 1e6:6.1f}MB، "
+          f"بحث p50={statistics.median(latencies) * 1000:.3f}ms p95={latencies[int(0.95 * len(latencies))] * 1000:.3f}ms، "
+          f"تغطية الصيغ {statistics.mean(coverage):.0%}")
+    store.close()
+
+
+def main():
+    chunks = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    rng = random.Random(3)
+    keywords = [kw for _, kws, _ in CHAT_INTENTS for kw in kws]
+    messages = [
+        " ".join(rng.choices(FILLER, k=rng.randint(3, 12)) + [rng.choice(PREFIXES) + rng.choice(keywords)])
+        for _ in range(20000)
+    ]
+    print(f"📊 النوايا ({len(messages):,} رسالة فريدة)")
+    measure_intents("بلا تجذيع", IntentEngine(CHAT_INTENTS, stemming=False), messages)
+    measure_intents("بلا تجذيع + كل الصيغ في القوائم", IntentEngine(expanded_intents(), stemming=False), messages)
+    measure_intents("مع التجذيع", IntentEngine(CHAT_INTENTS, stemming=True), messages)
+
+    roots, containing, documents = synthetic_corpus(chunks)
+    print(f"📊 فهرس المعرفة ({chunks:,} مقطع × 60 كلمة، {len(roots):,} جذر × {len(PREFIXES) * len(SUFFIXES)} صيغة)")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, stemming in (("بلا تجذيع", False), ("مع التجذيع", True)):
+            measure_store(label, os.path.join(tmp, f"{stemming}.db"), stemming, roots, containing, documents,
+                          random.Random(5))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+قياس تعويض قالب بحجم 1MB يحوي 200 متغير:
+str.replace لكل متغير مقابل محرك القوالب المحلَّل مسبقاً
+التشغيل: python -m benchmarks.bench_template_engine
+"""
+
+import random
+import time
+
+from shell_system.template_engine import compile_template
+
+VARIABLE_COUNT = 200
+TEMPLATE_BYTES = 1_000_000
+
+
+def build_template(seed=9):
+    rng = random.Random(seed)
+    filler = "def handler(request):\n    return {'status': 'ok', 'data': [1, 2, 3]}\n"
+    pieces = []
+    size = 0
+    while size < TEMPLATE_BYTES:
+        pieces.append(filler)
+        pieces.append(f"# {{var_{rng.randrange(VARIABLE_COUNT)}}}\n")
+        size += len(filler) + 12
+    return "".join(pieces)
+
+
+def replace_render(content, **kwargs):
+    """نسخة من التعويض السابق: نسخة كاملة من النص لكل متغير"""
+    for key, value in kwargs.items():
+        content = content.replace(f"{{{key}}}", str(value))
+    return content
+
+
+def best_of(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    template = build_template()
+    variables = {f"var_{i}": f"value_{i}" for i in range(VARIABLE_COUNT)}
+
+    start = time.perf_counter()
+    compiled = compile_template(template)
+    compile_time = time.perf_counter() - start
+
+    expected = replace_render(template, **variables)
+    rendered, missing = compiled.render(variables)
+    assert rendered == expected and not missing
+
+    old = best_of(lambda: replace_render(template, **variables))
+    new = best_of(lambda: compiled.render(variables))
+
+    print(f"📊 قالب {len(template) / 1e6:.1f}MB، {len(compiled.slots):,} خانة، {VARIABLE_COUNT} متغير")
+    print(f"  str.replace لكل متغير: {old * 1000:.1f}ms")
+    print(f"  التحليل (مرة واحدة): {compile_time * 1000:.1f}ms")
+    print(f"  التعويض من القالب المحلَّل: {new * 1000:.1f}ms (x{old / new:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+قياس زمن البدء والذاكرة لمولد السكربتات مع 1000 قالب على القرص:
+التحميل المسبق لكل القوالب مقابل السجل الكسول
+التشغيل: python -m benchmarks.bench_template_registry
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+
+from shell_system.script_generator import ScriptGenerator
+from shell_system.template_registry import _read_template
+
+TEMPLATE_COUNT = 1000
+TEMPLATE_BYTES = 20_000
+
+
+def eager_load_templates(templates_dir):
+    """نسخة من load_templates السابقة (تقرأ كل القوالب عند الإنشاء)"""
+    templates = {}
+    if os.path.exists(templates_dir):
+        for filename in os.listdir(templates_dir):
+            if filename.endswith('.py'):
+                with open(os.path.join(templates_dir, filename), 'r', encoding='utf-8') as f:
+                    templates[filename] = f.read()
+    return templates
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    with tempfile.TemporaryDirectory() as templates_dir:
+        line = "print('مرحباً من القالب {name}')\n"
+        body = line * (TEMPLATE_BYTES // len(line.encode('utf-8')))
+        for i in range(TEMPLATE_COUNT):
+            with open(os.path.join(templates_dir, f"template_{i}.py"), 'w', encoding='utf-8') as f:
+                f.write(body)
+
+        _, eager_time, eager_peak = measure(lambda: eager_load_templates(templates_dir))
+        generator, lazy_time, lazy_peak = measure(lambda: ScriptGenerator(templates_dir))
+        _, second_time, _ = measure(lambda: ScriptGenerator(templates_dir))
+
+        print(f"📊 {TEMPLATE_COUNT} قالب × {TEMPLATE_BYTES // 1000}KB")
+        print(f"  تحميل مسبق: {eager_time * 1000:.1f}ms، ذاكرة {eager_peak / 1e6:.1f}MB")
+        print(f"  سجل كسول: {lazy_time * 1000:.1f}ms، ذاكرة {lazy_peak / 1e6:.2f}MB")
+        print(f"  نسخة ثانية (سجل مشترك): {second_time * 1000:.3f}ms")
+
+        name = "template_1.py"
+        _, first_get, _ = measure(lambda: generator.templates[name])
+        _, cached_get, _ = measure(lambda: generator.templates[name])
+        print(f"  أول قراءة لقالب: {first_get * 1e6:.0f}µs، من الذاكرة المؤقتة: {cached_get * 1e6:.0f}µs")
+
+        time.sleep(0.01)
+        with open(os.path.join(templates_dir, name), 'a', encoding='utf-8') as f:
+            f.write("# تعديل\n")
+        reloaded = generator.templates[name].endswith("# تعديل\n")
+        print(f"  إعادة التحميل بعد التعديل: {'✅' if reloaded else '❌'}")
+        print(f"  {_read_template.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+قياس مطابقة TF-IDF مسبقة الحساب على مجموعة مقاطع اصطناعية:
+- زمن الملاءمة مقارنة بتحميل الفهرس المحفوظ عند التشغيل
+- زمن الاستعلام الواحد، وإنتاجية الدفعة (جداء متفرق واحد) مقارنة باستعلام لكل رسالة
+- للمقارنة: بحث FTS5 في مخزن المعرفة، وعدّ الكلمات المشتركة مع كل مقطع في حلقة Python
+التشغيل: python -m benchmarks.bench_tfidf [عدد المقاطع] [عدد الاستعلامات]
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from chat_system.arabic import stem_text, stem_tokens
+from chat_system.knowledge_store import KnowledgeStore
+from chat_system.tfidf_matcher import TfidfMatcher
+
+PREFIXES = ['', 'ال', 'وال', 'بال', 'لل', 'و']
+SUFFIXES = ['', 'ة', 'ات', 'ين', 'ون', 'ها', 'ي']
+
+
+def synthetic_corpus(chunks, seed=7):
+    """مقاطع من 60 كلمة بتوزيع Zipf على جذور اصطناعية بسوابق ولواحق"""
+    rng = random.Random(seed)
+    letters = "بتثجحخدذرزسشصضطظعغفقكلمن"
+    roots = list({"".join(rng.choices(letters, k=rng.randint(3, 5))) for _ in range(5000)})
+    weights = [1 / (rank + 1) for rank in range(len(roots))]
+    documents = [
+        (f"doc_{i}", " ".join(rng.choice(PREFIXES) + root + rng.choice(SUFFIXES)
+                              for root in rng.choices(roots, weights=weights, k=60)), "")
+        for i in range(chunks)
+    ]
+    return roots, documents
+
+
+def percentiles(latencies):
+    latencies = sorted(latencies)
+    return (f"p50={statistics.median(latencies) * 1000:.3f}ms "
+            f"p95={latencies[int(0.95 * len(latencies))] * 1000:.3f}ms")
+
+
+def main():
+    chunks = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+
+    roots, documents = synthetic_corpus(chunks)
+    store = KnowledgeStore(':memory:')
+    store.add_documents("bench", documents)
+    store.optimize()
+    rows = [row for batch in store.iter_chunks() for row in batch]
+
+    rng = random.Random(8)
+    queries = [
+        " ".join(rng.choice(PREFIXES) + rng.choice(roots[:2000]) + rng.choice(SUFFIXES)
+                 for _ in range(rng.randint(2, 6)))
+        for _ in range(count)
+    ]
+    print(f"📊 {chunks:,} مقطع × 60 كلمة، {count:,} استعلام")
+
+    start = time.perf_counter()
+    matcher = TfidfMatcher.fit(rows)
+    fit_seconds = time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tfidf.npz")
+        matcher.save(path)
+        size = os.path.getsize(path) + os.path.getsize(path + '.json')
+        start = time.perf_counter()
+        matcher = TfidfMatcher.load(path)
+        load_seconds = time.perf_counter() - start
+    print(f"  التشغيل: ملاءمة {fit_seconds:6.2f}s، تحميل المحفوظ {load_seconds * 1000:7.1f}ms "
+          f"({size / 1e6:.1f}MB، {len(matcher.terms):,} كلمة)")
+
+    latencies = []
+    for query in queries:
+        stem_tokens.cache_clear()
+        t = time.perf_counter()
+        matcher.search(query, 5)
+        latencies.append(time.perf_counter() - t)
+    single = sum(latencies)
+    print(f"  TF-IDF استعلام لكل رسالة : {count / single:9,.0f} استعلام/ث  {percentiles(latencies)}")
+
+    stem_tokens.cache_clear()
+    start = time.perf_counter()
+    batched = matcher.search_batch(queries, 5)
+    batch_seconds = time.perf_counter() - start
+    print(f"  TF-IDF دفعة واحدة        : {count / batch_seconds:9,.0f} استعلام/ث  (x{single / batch_seconds:.1f})")
+    assert [r[:1] for r in batched[:50]] == [matcher.search(q, 5)[:1] for q in queries[:50]]
+
+    latencies = []
+    for query in queries:
+        stem_tokens.cache_clear()
+        t = time.perf_counter()
+        store.search(query, 5)
+        latencies.append(time.perf_counter() - t)
+    print(f"  FTS5 (BM25)              : {count / sum(latencies):9,.0f} استعلام/ث  {percentiles(latencies)}")
+
+    # عدّ الكلمات المشتركة مع كل مقطع في حلقة Python (على عينة صغيرة لبطئه)
+    token_sets = [set(stem_text(content).split()) for _, content in rows]
+    sample = queries[:min(count, 50)]
+    start = time.perf_counter()
+    for query in sample:
+        terms = set(stem_tokens(query))
+        max(range(len(token_sets)), key=lambda i: len(terms & token_sets[i]))
+    loop_seconds = time.perf_counter() - start
+    print(f"  حلقة Python (عدّ الكلمات) : {len(sample) / loop_seconds:9,.0f} استعلام/ث")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
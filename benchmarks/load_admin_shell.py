@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+اختبار حمل لـ Shell المطوّر: هل تبقى حلقة الأحداث حرة أثناء تنفيذ أوامر طويلة؟
+يقارن التنفيذ غير الحاجب الحالي بنسخة subprocess.run الحاجبة السابقة
+التشغيل: python -m benchmarks.load_admin_shell
+"""
+
+import asyncio
+import statistics
+import subprocess
+import time
+
+import httpx
+from fastapi import FastAPI
+
+import admin_shell
+
+LONG_COMMAND = "python -c \"import time; time.sleep(2)\""
+LONG_COMMANDS = 4
+
+
+def build_app(blocking: bool) -> FastAPI:
+    app = FastAPI()
+
+    if blocking:
+        @app.post("/admin/shell/run")
+        async def blocking_run(body: admin_shell.ShellIn):
+            completed = subprocess.run(body.command, shell=True, capture_output=True, text=True, timeout=120)
+            return {"exit_code": completed.returncode}
+    else:
+        app.include_router(admin_shell.router, prefix="/admin")
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    return app
+
+
+async def run_scenario(blocking: bool):
+    app = build_app(blocking)
+    admin_shell._limiter.backend = admin_shell.MemoryBackend()
+
+    async def long_command(i: int):
+        # عنوان مختلف لكل عميل كي لا يتدخل محدد المعدل
+        transport = httpx.ASGITransport(app=app, client=(f"10.0.0.{i + 1}", 1234))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+            res = await client.post("/admin/shell/run", json={"pin": admin_shell.ADMIN_PIN, "command": LONG_COMMAND})
+            return res.status_code
+
+    async def probe_health(stop: asyncio.Event):
+        # يُقاس الزمن من لحظة نية الإرسال، فيظهر أي حجز لحلقة الأحداث
+        latencies = []
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            while not stop.is_set():
+                due = time.perf_counter() + 0.01
+                await asyncio.sleep(0.01)
+                await client.get("/health")
+                latencies.append(time.perf_counter() - due)
+        return latencies
+
+    stop = asyncio.Event()
+    prober = asyncio.create_task(probe_health(stop))
+    await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    statuses = await asyncio.gather(*(long_command(i) for i in range(LONG_COMMANDS)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    latencies = await prober
+
+    name = "subprocess.run (حاجب)" if blocking else "asyncio (غير حاجب)"
+    latencies.sort()
+    print(f"📊 {name}")
+    print(f"  {LONG_COMMANDS} أوامر × 2s: {elapsed:.2f}s، الحالات: {statuses}")
+    print(f"  طلبات /health المخدومة: {len(latencies)}")
+    print(f"  زمن /health: p50={statistics.median(latencies) * 1000:.1f}ms "
+          f"max={latencies[-1] * 1000:.1f}ms")
+
+
+def main():
+    asyncio.run(run_scenario(blocking=True))
+    asyncio.run(run_scenario(blocking=False))
+
+
+if __name__ == "__main__":
+    main()
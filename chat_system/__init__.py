@@ -0,0 +1,3 @@
+"""
+نظام المحادثة - المكونات المشتركة بين واجهات المحادثة ونموذج الذكاء الاصطناعي
+"""
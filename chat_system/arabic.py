@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+تطبيع النص العربي وتقسيمه للبحث ومطابقة النوايا
+جداول str.translate مبنية مرة واحدة عند التحميل (بلا تعابير نمطية في المسار السريع):
+إزالة التشكيل والتطويل، توحيد أشكال الألف، ى -> ي، ة -> ه، الأرقام العربية الهندية -> 0-9
+الجداول قوائم مفهرسة برقم المحرف لا قواميس: translate يبحث عن كل محرف غير ASCII في الجدول،
+والفهرسة في قائمة أسرع بنحو الضعف من البحث في قاموس
+ومجذِّع خفيف (سوابق ولواحق) بذاكرة مؤقتة محدودة لمطابقة الصيغ المختلفة للكلمة
+"""
+
+import unicodedata
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# يتغير عند تغيير قواعد التطبيع؛ الفهارس المبنية بإصدار آخر تُعاد فهرستها
+NORMALIZATION_VERSION = 2
+
+TOKEN_CACHE_SIZE = 65536
+
+TATWEEL = 'ـ'
+
+
+def _letter_table() -> Dict[int, Optional[str]]:
+    table: Dict[int, Optional[str]] = {}
+    # التشكيل وعلامات القرآن فوق الحروف وتحتها، والألف الخنجرية، والتطويل
+    for cp in list(range(0x064B, 0x0660)) + [0x0670, ord(TATWEEL)]:
+        table[cp] = None
+    for alef in 'آأإٱ':
+        table[ord(alef)] = 'ا'
+    table[0x0649] = 'ي'   # ى -> ي
+    table[0x0629] = 'ه'   # ة -> ه
+    for digit in range(10):
+        table[0x0660 + digit] = str(digit)   # ٠-٩
+        table[0x06F0 + digit] = str(digit)   # ۰-۹ (الفارسية)
+    return table
+
+
+def _text_table(letters: Dict[int, Optional[str]]) -> Dict[int, Optional[str]]:
+    """جدول الحروف مع الترقيم والرموز -> مسافة (كفواصل محلل unicode61) وحذف العلامات المركّبة وغير المرئية"""
+    table = dict(letters)
+    code_points = list(range(0x10000)) + list(range(0x1F000, 0x1FB00))   # المستوى الأساسي والرموز التعبيرية
+    for cp in code_points:
+        if cp in table:
+            continue
+        category = unicodedata.category(chr(cp))
+        if category[0] in 'PS':
+            table[cp] = ' '
+        elif category[0] == 'M' or category == 'Cf':
+            table[cp] = None
+    return table
+
+
+def _as_list(table: Dict[int, Optional[str]]) -> List[Optional[int]]:
+    """قائمة بطول أكبر محرف في الجدول؛ ما بعدها يبقى كما هو (خطأ الفهرسة يعني «بلا تغيير»)"""
+    mapping: List[Optional[int]] = list(range(max(table) + 1))
+    for cp, value in table.items():
+        mapping[cp] = None if value is None else ord(value)
+    return mapping
+
+
+_LETTERS = _as_list(_letter_table())
+_TEXT = _as_list(_text_table(_letter_table()))
+
+
+def normalize_arabic(text: str) -> str:
+    """توحيد الحروف للفهرسة والاستعلام (يبقي الترقيم): حروف صغيرة، بلا تشكيل ولا تطويل، ألف موحدة..."""
+    return text.lower().translate(_LETTERS)
+
+
+def normalize_text(text: str) -> str:
+    """التطبيع الكامل: الحروف كما في normalize_arabic والترقيم والرموز مسافات (دون دمج المسافات)"""
+    return text.lower().translate(_TEXT)
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def tokenize(text: str) -> Tuple[str, ...]:
+    """كلمات النص المطبَّعة؛ النتيجة مخزنة مؤقتاً فالرسائل المتكررة لا تُعالج مرتين"""
+    return tuple(text.lower().translate(_TEXT).split())
+
+
+# ---------- التجذيع الخفيف ----------
+
+# أداة التعريف مع حروف الجر والعطف الملتصقة، ثم اللواحق (بعد التطبيع: ة -> ه، ى -> ي)
+_ARTICLES = ('وال', 'بال', 'كال', 'فال', 'لل', 'ال')
+_SUFFIXES = ('ها', 'ان', 'ات', 'ون', 'ين', 'يه', 'ه', 'ي')
+# لا يُقص ما يترك أقل من ثلاثة حروف (أغلب الجذور ثلاثية)
+MIN_STEM = 3
+STEM_CACHE_SIZE = 100000
+
+
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem(token: str) -> str:
+    """
+    جذع خفيف لكلمة مطبَّعة على طريقة Light10: واو العطف، ثم أداة التعريف، ثم اللواحق
+    (البرمجة / برمجيات / برمجة -> برمج، والشبكات -> شبك)؛ الكلمات غير العربية تبقى كما هي
+    """
+    if not token or not 'ء' <= token[0] <= 'ي':
+        return token
+    if token[0] == 'و' and len(token) > MIN_STEM:
+        token = token[1:]
+    for article in _ARTICLES:
+        if token.startswith(article) and len(token) - len(article) >= MIN_STEM:
+            token = token[len(article):]
+            break
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM:
+            token = token[:-len(suffix)]
+    return token
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def stem_tokens(text: str) -> Tuple[str, ...]:
+    """جذوع كلمات النص (مخزنة مؤقتاً مثل tokenize)"""
+    return tuple(map(stem, tokenize(text)))
+
+
+def stem_text(text: str) -> str:
+    """نص الفهرسة المجذَّع للنصوص الطويلة (دون تخزين النص كاملاً في الذاكرة المؤقتة)"""
+    return " ".join(map(stem, normalize_text(text).split()))
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+سجل المحادثات الدائم (SQLAlchemy)
+الإضافة تضع السجل في ذاكرة مؤقتة وتعود فوراً، ومهمة خلفية تكتب المتراكم في معاملة واحدة
+(كل flush_interval ثانية أو عند بلوغ batch_size)؛ القراءة تكتب المعلَّق أولاً ثم ترتب بالوقت
+عبر الفهرس (user_id, timestamp DESC)
+المعرفات تُحجز من قاعدة البيانات كتلاً (id_block لكل كتلة) فتبقى فريدة بين عدة عمليات uvicorn،
+لكنها لا تتبع ترتيب الوصول بين العمليات فلا يُرتب بها؛
+الكتلة التالية يحجزها الكاتب الخلفي مسبقاً فلا تكتب الإضافة في قاعدة البيانات من حلقة الأحداث
+"""
+
+import asyncio
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import (Column, Index, Integer, MetaData, String, Table, Text, create_engine, event,
+                        insert, select, update)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import StaticPool
+
+from .conversation_store import ConversationRecord
+
+metadata = MetaData()
+
+conversations_table = Table(
+    "conversations", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=False),
+    Column("user_id", Integer, nullable=False),
+    Column("user_message", Text, nullable=False),
+    Column("ai_response", Text, nullable=False),
+    Column("timestamp", String(32), nullable=False),
+)
+# الترتيب الزمني بالوقت ثم المعرف لحسم التعادل داخل العملية الواحدة
+conversations_by_time = Index("ix_conversations_user_id_timestamp", conversations_table.c.user_id,
+                              conversations_table.c.timestamp.desc(), conversations_table.c.id.desc())
+conversations_timestamp = Index("ix_conversations_timestamp", conversations_table.c.timestamp.desc(),
+                                conversations_table.c.id.desc())
+
+# آخر معرف محجوز (صف واحد)
+id_blocks_table = Table(
+    "conversation_id_blocks", metadata,
+    Column("name", String(32), primary_key=True),
+    Column("next_id", Integer, nullable=False),
+)
+
+
+def create_conversation_engine(url: str):
+    """محرك SQLAlchemy؛ SQLite يعمل بـ WAL، وقاعدة الذاكرة تُشارك اتصالاً واحداً بين الخيوط"""
+    if url.startswith("sqlite"):
+        in_memory = url in ("sqlite://", "sqlite:///:memory:")
+        engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False, "timeout": 30},
+            poolclass=StaticPool if in_memory else None,
+        )
+
+        @event.listens_for(engine, "connect")
+        def _sqlite_pragmas(connection, _):
+            cursor = connection.cursor()
+            if not in_memory:
+                cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.close()
+
+        return engine
+    return create_engine(url, pool_pre_ping=True)
+
+
+class ConversationLog:
+    """
+    url: رابط قاعدة البيانات، batch_size: حجم الدفعة الذي يوقظ الكاتب مبكراً،
+    flush_interval: أقصى مدة يبقى فيها سجل في الذاكرة قبل كتابته،
+    id_block: عدد المعرفات المحجوزة في كل مرة
+    """
+
+    def __init__(self, url: str = "sqlite:///conversations.db", batch_size: int = 500,
+                 flush_interval: float = 0.5, id_block: int = 1000):
+        self.engine = create_conversation_engine(url)
+        metadata.create_all(self.engine)
+        # create_all لا يضيف الفهارس الجديدة إلى جداول موجودة
+        for index in conversations_table.indexes:
+            index.create(self.engine, checkfirst=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.id_block = id_block
+        self.written = 0
+        self.flushes = 0
+        self.dropped = 0
+        self._pending: List[Dict] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._next_id = 0
+        self._last_id = -1
+        # الكتلة التالية المحجوزة مسبقاً (أول المعرفات، آخرها)
+        self._spare: Optional[Tuple[int, int]] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._reserve_spare()
+
+    def _reserve_block(self) -> Tuple[int, int]:
+        """حجز كتلة معرفات جديدة في معاملة قصيرة"""
+        with self.engine.begin() as conn:
+            updated = conn.execute(
+                update(id_blocks_table)
+                .where(id_blocks_table.c.name == "conversations")
+                .values(next_id=id_blocks_table.c.next_id + self.id_block)
+            )
+            if not updated.rowcount:
+                conn.execute(insert(id_blocks_table).values(name="conversations", next_id=1 + self.id_block))
+            end = conn.execute(
+                select(id_blocks_table.c.next_id).where(id_blocks_table.c.name == "conversations")
+            ).scalar_one()
+        return end - self.id_block, end - 1
+
+    def _reserve_spare(self):
+        """حجز الكتلة التالية قبل الحاجة إليها (من الكاتب الخلفي خارج حلقة الأحداث)"""
+        if self._spare is not None:
+            return
+        block = self._reserve_block()
+        with self._lock:
+            if self._spare is None:
+                self._spare = block
+
+    def add(self, user_id: int, user: str, ai: str) -> ConversationRecord:
+        """تسجيل رسالة ورد؛ الكتابة الفعلية في الدفعة التالية"""
+        refill = False
+        with self._lock:
+            if self._next_id > self._last_id:
+                if self._spare is None:
+                    # لم يلحق الكاتب الخلفي بحجز كتلة (أو لا يعمل): حجز متزامن
+                    self._spare = self._reserve_block()
+                (self._next_id, self._last_id), self._spare = self._spare, None
+                refill = True
+            # عرض ثابت للوقت (بالميكروثانية) ليُرتب نصياً
+            timestamp = datetime.now().isoformat(timespec="microseconds")
+            record = ConversationRecord(self._next_id, user_id, user, ai, timestamp)
+            self._next_id += 1
+            self._pending.append({
+                "id": record.id, "user_id": user_id, "user_message": user,
+                "ai_response": ai, "timestamp": record.timestamp,
+            })
+            full = len(self._pending) >= self.batch_size
+        if (full or refill) and self._wakeup is not None:
+            self._wakeup.set()
+        return record
+
+    def flush(self) -> int:
+        """كتابة كل المعلَّق في معاملة واحدة؛ يُرجع عدد السجلات"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(insert(conversations_table), batch)
+                written = len(batch)
+            except IntegrityError:
+                # صف معيب لا ينجح أبداً فلا تُعاد الدفعة كلها (وإلا توقف الحفظ للجميع):
+                # تُكتب صفاً صفاً ويُسقط المعيب
+                written = self._insert_rows(batch)
+            except Exception:
+                # إعادة الدفعة إلى أول الطابور كي لا تضيع عند خطأ عابر
+                with self._lock:
+                    self._pending[:0] = batch
+                raise
+            self.written += written
+            self.flushes += 1
+            return written
+
+    def _insert_rows(self, batch: List[Dict]) -> int:
+        """كتابة كل صف في معاملته؛ الصفوف المخالفة للقيود تُسقط وتُسجَّل، والباقي يُعاد عند خطأ عابر"""
+        written = 0
+        for i, row in enumerate(batch):
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(insert(conversations_table), row)
+                written += 1
+            except IntegrityError as e:
+                self.dropped += 1
+                print(f"⚠️ أُسقطت محادثة مخالفة لقيود الجدول (id={row['id']}): {e.orig}")
+            except Exception:
+                with self._lock:
+                    self._pending[:0] = batch[i:]
+                self.written += written
+                raise
+        return written
+
+    def recent(self, limit: int = 10, user_id: Optional[int] = None) -> List[ConversationRecord]:
+        """آخر limit سجلات (لمستخدم معين أو للجميع) بالوقت عبر الفهرس، الأحدث أولاً"""
+        self.flush()
+        table = conversations_table
+        query = select(table).order_by(table.c.timestamp.desc(), table.c.id.desc()).limit(limit)
+        if user_id is not None:
+            query = query.where(table.c.user_id == user_id)
+        with self.engine.connect() as conn:
+            return [
+                ConversationRecord(row.id, row.user_id, row.user_message, row.ai_response, row.timestamp)
+                for row in conn.execute(query)
+            ]
+
+    # ---------- الكاتب الخلفي ----------
+
+    async def _run(self):
+        while True:
+            if self._spare is None:
+                try:
+                    await asyncio.to_thread(self._reserve_spare)
+                except Exception as e:
+                    print(f"⚠️ تعذر حجز معرفات المحادثات: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                print(f"⚠️ تعذرت كتابة المحادثات: {e}")
+
+    def start(self):
+        """تشغيل الكاتب الخلفي في حلقة الأحداث الحالية"""
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """إيقاف الكاتب وكتابة ما تبقى"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+        await asyncio.to_thread(self.flush)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            pending = len(self._pending)
+        return {"pending": pending, "written": self.written, "flushes": self.flushes, "dropped": self.dropped}
+
+    def close(self):
+        self.flush()
+        self.engine.dispose()
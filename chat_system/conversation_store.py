@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+مخزن المحادثات المحدود
+حلقة ثابتة الحجم لكل مستخدم: إضافة وإزاحة وقراءة آخر N بكلفة ثابتة لكل عنصر
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Hashable, Iterator, List, Optional
+
+
+class ConversationRecord:
+    __slots__ = ('id', 'user_id', 'user', 'ai', 'timestamp')
+
+    def __init__(self, record_id: int, user_id: Hashable, user: str, ai: str, timestamp: str):
+        self.id = record_id
+        self.user_id = user_id
+        self.user = user
+        self.ai = ai
+        self.timestamp = timestamp
+
+    def to_dict(self) -> Dict[str, Any]:
+        """تحويل السجل إلى قاموس قابل للتسلسل"""
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'user': self.user,
+            'ai': self.ai,
+            'timestamp': self.timestamp
+        }
+
+
+class RingBuffer:
+    __slots__ = ('capacity', '_items', '_start', '_size')
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._items: List[Any] = [None] * capacity
+        self._start = 0
+        self._size = 0
+
+    def append(self, item: Any) -> Any:
+        """إضافة عنصر وإرجاع العنصر المُزاح (أو None)"""
+        if self._size < self.capacity:
+            self._items[(self._start + self._size) % self.capacity] = item
+            self._size += 1
+            return None
+
+        evicted = self._items[self._start]
+        self._items[self._start] = item
+        self._start = (self._start + 1) % self.capacity
+        return evicted
+
+    def last(self, n: Optional[int] = None) -> List[Any]:
+        """آخر n عناصر بالترتيب الزمني"""
+        n = self._size if n is None else max(0, min(n, self._size))
+        first = self._start + self._size - n
+        return [self._items[(first + i) % self.capacity] for i in range(n)]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.last())
+
+
+class ConversationStore:
+    def __init__(self, capacity: int = 100, max_users: int = 10000, recent_capacity: Optional[int] = None):
+        """
+        capacity: أقصى عدد رسائل محفوظة لكل مستخدم
+        max_users: أقصى عدد مستخدمين؛ يُحذف الأقدم نشاطاً عند التجاوز
+        recent_capacity: حجم سجل آخر المحادثات لكل المستخدمين
+        """
+        self.capacity = capacity
+        self.max_users = max_users
+        self.total = 0
+        self._buffers: "OrderedDict[Hashable, RingBuffer]" = OrderedDict()
+        self._recent = RingBuffer(recent_capacity or capacity)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def add(self, user_id: Hashable, user: str, ai: str) -> ConversationRecord:
+        """حفظ رسالة ورد في سجل المستخدم"""
+        with self._lock:
+            self.total += 1
+            record = ConversationRecord(self.total, user_id, user, ai, datetime.now().isoformat())
+
+            buffer = self._buffers.get(user_id)
+            if buffer is None:
+                buffer = self._buffers[user_id] = RingBuffer(self.capacity)
+                if len(self._buffers) > self.max_users:
+                    _, dropped = self._buffers.popitem(last=False)
+                    self._size -= len(dropped)
+            else:
+                self._buffers.move_to_end(user_id)
+
+            if buffer.append(record) is None:
+                self._size += 1
+            self._recent.append(record)
+            return record
+
+    def last(self, user_id: Hashable, n: Optional[int] = None) -> List[ConversationRecord]:
+        """آخر n رسائل لمستخدم معين"""
+        buffer = self._buffers.get(user_id)
+        return buffer.last(n) if buffer else []
+
+    def recent(self, n: Optional[int] = None) -> List[ConversationRecord]:
+        """آخر n رسائل لكل المستخدمين"""
+        return self._recent.last(n)
+
+    def __len__(self) -> int:
+        return self._size
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+فهرس المتجهات لوضع الإجابة RAG
+المتجهات float32 مطبَّعة في مصفوفة واحدة متصلة (ملف .npy مربوط بالذاكرة أو مصفوفة في الذاكرة)،
+والبحث بجداء مصفوفات واحد لكل دفعة استعلامات ثم argpartition لأفضل k،
+والإضافة بسعة تتضاعف عند الامتلاء
+"""
+
+import json
+import os
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from .arabic import normalize_arabic
+
+
+class HashingEmbedder:
+    """متجهات محلية حتمية من n-gram الحروف المجزأة؛ لا تحتاج تدريباً ولا اتصالاً"""
+
+    def __init__(self, dim: int = 256, ngram_range: Tuple[int, int] = (2, 4)):
+        self.dim = dim
+        self._vectorizer = HashingVectorizer(
+            analyzer='char_wb', ngram_range=ngram_range, n_features=dim,
+            preprocessor=normalize_arabic, norm='l2', alternate_sign=True, dtype=np.float32,
+        )
+
+    def embed(self, texts: Iterable[str]) -> np.ndarray:
+        """مصفوفة (عدد النصوص، dim) بصفوف طولها 1"""
+        return self._vectorizer.transform(list(texts)).toarray()
+
+
+class EmbeddingIndex:
+    """
+    متجهات المقاطع ومعرفاتها
+    path: ملف .npy للمتجهات (يُحفظ بجانبه ملف المعرفات وملف العدد)؛ None للذاكرة فقط
+    """
+
+    def __init__(self, dim: int, path: Optional[str] = None, initial_capacity: int = 1024):
+        self.dim = dim
+        self.path = path
+        self.count = 0
+        if path and os.path.exists(path):
+            with open(self._meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta["dim"] != dim:
+                raise ValueError(f"أبعاد الفهرس {meta['dim']} لا تطابق {dim}")
+            self.count = meta["count"]
+            self._vectors = np.lib.format.open_memmap(path, mode='r+')
+            self._ids = np.lib.format.open_memmap(self._ids_path, mode='r+')
+        else:
+            self._vectors, self._ids = self._allocate(initial_capacity)
+
+    @property
+    def _ids_path(self) -> str:
+        return self.path[:-len('.npy')] + '.ids.npy' if self.path.endswith('.npy') else self.path + '.ids.npy'
+
+    @property
+    def _meta_path(self) -> str:
+        return self.path + '.json'
+
+    @property
+    def capacity(self) -> int:
+        return self._vectors.shape[0]
+
+    def _allocate(self, capacity: int, suffix: str = '') -> Tuple[np.ndarray, np.ndarray]:
+        if not self.path:
+            return np.zeros((capacity, self.dim), dtype=np.float32), np.zeros(capacity, dtype=np.int64)
+        vectors = np.lib.format.open_memmap(self.path + suffix, mode='w+', dtype=np.float32,
+                                            shape=(capacity, self.dim))
+        ids = np.lib.format.open_memmap(self._ids_path + suffix, mode='w+', dtype=np.int64, shape=(capacity,))
+        return vectors, ids
+
+    def _grow(self, needed: int):
+        """مضاعفة السعة: نسخة واحدة لكل مضاعفة فتبقى كلفة الإضافة ثابتة في المتوسط"""
+        capacity = max(self.capacity * 2, needed)
+        if not self.path:
+            vectors, ids = self._allocate(capacity)
+            vectors[:self.count] = self._vectors[:self.count]
+            ids[:self.count] = self._ids[:self.count]
+            self._vectors, self._ids = vectors, ids
+            return
+
+        vectors, ids = self._allocate(capacity, suffix='.tmp')
+        vectors[:self.count] = self._vectors[:self.count]
+        ids[:self.count] = self._ids[:self.count]
+        vectors.flush()
+        ids.flush()
+        del vectors, ids
+        self._vectors = self._ids = None
+        os.replace(self.path + '.tmp', self.path)
+        os.replace(self._ids_path + '.tmp', self._ids_path)
+        self._vectors = np.lib.format.open_memmap(self.path, mode='r+')
+        self._ids = np.lib.format.open_memmap(self._ids_path, mode='r+')
+
+    def add(self, ids: Iterable[int], vectors: np.ndarray):
+        """إضافة متجهات (تُطبَّع لطول 1 كي يصبح الجداء الداخلي تشابه جيب التمام)"""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        ids = np.asarray(list(ids), dtype=np.int64)
+        if len(ids) != len(vectors):
+            raise ValueError("عدد المعرفات لا يطابق عدد المتجهات")
+        if not len(ids):
+            return
+
+        end = self.count + len(ids)
+        if end > self.capacity:
+            self._grow(end)
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=self._vectors[self.count:end], where=norms > 0)
+        self._vectors[self.count:end][norms[:, 0] == 0] = 0
+        self._ids[self.count:end] = ids
+        self.count = end
+
+        if self.path:
+            self._vectors.flush()
+            self._ids.flush()
+            self._write_meta()
+
+    def _write_meta(self):
+        temp_path = self._meta_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"dim": self.dim, "count": self.count}, f)
+        os.replace(temp_path, self._meta_path)
+
+    def reset(self):
+        """إفراغ الفهرس (تبقى السعة المحجوزة)"""
+        self.count = 0
+        if self.path:
+            self._write_meta()
+
+    def last_id(self) -> int:
+        return int(self._ids[self.count - 1]) if self.count else 0
+
+    def search(self, queries: np.ndarray, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        أفضل k متجه لكل استعلام بتشابه جيب التمام
+        يُرجع (المعرفات، الدرجات) بشكل (عدد الاستعلامات، k) مرتبة تنازلياً
+        """
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.dim)
+        k = min(k, self.count)
+        if not k:
+            empty = np.empty((len(queries), 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = np.divide(queries, norms, out=np.zeros_like(queries), where=norms > 0)
+
+        scores = queries @ self._vectors[:self.count].T
+        if k < self.count:
+            top = np.argpartition(scores, -k, axis=1)[:, -k:]
+        else:
+            top = np.broadcast_to(np.arange(self.count), scores.shape)
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        return self._ids[:self.count][top], np.take_along_axis(top_scores, order, axis=1)
+
+    def __len__(self) -> int:
+        return self.count
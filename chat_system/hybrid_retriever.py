@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+استرجاع هجين: بحث نصي (BM25) وبحث متجهي بالتوازي ثم دمج الترتيبين بـ Reciprocal Rank Fusion
+الدرجة = Σ 1 / (rrf_k + الرتبة) عبر المصادر، فلا تحتاج درجات المصادر المختلفة إلى معايرة
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+Source = Callable[[str, int], List[Dict]]
+# دالة (النصوص، k) -> مقاطع مرتبة لكل نص، للمصادر القادرة على معالجة دفعة بعملية واحدة
+BatchSource = Callable[[Sequence[str], int], List[List[Dict]]]
+
+
+def reciprocal_rank_fusion(rankings: Dict[str, List[Dict]], rrf_k: int = 60, limit: int = 5) -> List[Dict]:
+    """
+    دمج قوائم مرتبة من المقاطع (قواميس فيها id و content)
+    المقطع المكرر بين المصادر (نفس المعرف أو نفس المحتوى) يُدمج وتُجمع درجاته
+    التعادل يُحسم بترتيب المصادر ثم بالرتبة
+    """
+    fused: Dict[int, Dict] = {}
+    by_content: Dict[str, int] = {}
+    for source_order, (source, results) in enumerate(rankings.items()):
+        for rank, result in enumerate(results, 1):
+            key = by_content.setdefault(result["content"].strip(), result["id"])
+            entry = fused.get(key)
+            if entry is None:
+                entry = fused[key] = {**result, "score": 0.0, "sources": {}, "_first": (source_order, rank)}
+            if source not in entry["sources"]:
+                entry["sources"][source] = rank
+                entry["score"] += 1.0 / (rrf_k + rank)
+
+    ranked = sorted(fused.values(), key=lambda entry: (-entry["score"], entry["_first"]))[:limit]
+    for entry in ranked:
+        del entry["_first"]
+    return ranked
+
+
+class HybridRetriever:
+    """
+    sources: {الاسم: دالة (النص، k) -> مقاطع مرتبة}
+    batch_sources: نسخ الدفعات لبعض المصادر (الباقي يُستدعى لكل نص على حدة في retrieve_batch)
+    تُنفذ المصادر بالتوازي في خيوط (SQLite وNumPy يحرران GIL أثناء العمل)
+    """
+
+    def __init__(self, sources: Dict[str, Source], rrf_k: int = 60, depth: int = 10,
+                 batch_sources: Optional[Dict[str, BatchSource]] = None):
+        self.sources = sources
+        self.batch_sources = batch_sources or {}
+        self.rrf_k = rrf_k
+        self.depth = depth
+        self._executor = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="retriever")
+
+    def _timed(self, source: Source, text: str, k: int) -> Tuple[List[Dict], float]:
+        start = time.perf_counter()
+        results = source(text, k)
+        return results, time.perf_counter() - start
+
+    def retrieve(self, text: str, k: int = 5) -> Tuple[List[Dict], Dict[str, float]]:
+        """أفضل k مقطع مدمج، مع زمن كل مرحلة بالثواني"""
+        start = time.perf_counter()
+        depth = max(k, self.depth)
+        futures = {
+            name: self._executor.submit(self._timed, source, text, depth)
+            for name, source in self.sources.items()
+        }
+
+        rankings, timings = {}, {}
+        for name, future in futures.items():
+            rankings[name], timings[name] = future.result()
+
+        fusion_start = time.perf_counter()
+        results = reciprocal_rank_fusion(rankings, self.rrf_k, k)
+        timings["fusion"] = time.perf_counter() - fusion_start
+        timings["retrieval"] = time.perf_counter() - start
+        return results, timings
+
+    def _timed_batch(self, name: str, texts: Sequence[str], k: int) -> Tuple[List[List[Dict]], float]:
+        start = time.perf_counter()
+        if name in self.batch_sources:
+            results = self.batch_sources[name](texts, k)
+        else:
+            source = self.sources[name]
+            results = [source(text, k) for text in texts]
+        return results, time.perf_counter() - start
+
+    def retrieve_batch(self, texts: Sequence[str], k: int = 5) -> Tuple[List[List[Dict]], Dict[str, float]]:
+        """أفضل k مقطع مدمج لكل نص بترتيب المدخلات: كل مصدر يعالج الدفعة كاملة في خيطه"""
+        start = time.perf_counter()
+        depth = max(k, self.depth)
+        futures = {
+            name: self._executor.submit(self._timed_batch, name, texts, depth)
+            for name in self.sources
+        }
+
+        rankings, timings = {}, {}
+        for name, future in futures.items():
+            rankings[name], timings[name] = future.result()
+
+        fusion_start = time.perf_counter()
+        results = [
+            reciprocal_rank_fusion({name: rankings[name][i] for name in rankings}, self.rrf_k, k)
+            for i in range(len(texts))
+        ]
+        timings["fusion"] = time.perf_counter() - fusion_start
+        timings["retrieval"] = time.perf_counter() - start
+        return results, timings
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+محرك النوايا المشترك
+يجمع الكلمات المفتاحية لكل النوايا في تعبير نمطي واحد (شجرة بادئات)
+فتُمسح الرسالة مرة واحدة فقط مهما كان عدد الكلمات
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .arabic import stem_tokens, tokenize
+
+Response = Union[str, Callable[[str], str]]
+Intent = Tuple[str, Sequence[str], Response]
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+def _trie_pattern(words: Sequence[str]) -> str:
+    """تحويل قائمة كلمات إلى تعبير نمطي على شكل شجرة بادئات (الأطول أولاً)"""
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            body = '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+class IntentEngine:
+    def __init__(self, intents: Sequence[Intent], whole_words: bool = False, stemming: bool = True):
+        """
+        intents: جدول من (الاسم، الكلمات المفتاحية، الرد) بترتيب الأولوية
+        whole_words: مطابقة كلمات كاملة بدلاً من أي جزء من النص
+        stemming: مطابقة الجذوع (برمجة تطابق البرمجة وبرمجيات) فلا تلزم كتابة كل صيغة
+        """
+        self.intents: List[Intent] = list(intents)
+        self.whole_words = whole_words
+        self._terms = stem_tokens if stemming else tokenize
+
+        # الكلمات المفتاحية والنص يُطبَّعان بالطريقة نفسها (مرحباً = مرحبا، الآن = الان)
+        direct: Dict[str, int] = {}
+        for priority, (_, keywords, _) in enumerate(self.intents):
+            for keyword in keywords:
+                keyword = " ".join(self._terms(keyword))
+                if keyword:
+                    direct.setdefault(keyword, priority)
+
+        # عند كل موضع يلتقط التعبير أطول كلمة فقط، لذا تُنسب إليها أيضاً
+        # أولوية أي كلمة مفتاحية أخرى هي بادئة لها
+        self.priorities: Dict[str, int] = {}
+        for keyword, priority in direct.items():
+            for prefix, prefix_priority in direct.items():
+                if prefix_priority < priority and self._prefix_matches(prefix, keyword):
+                    priority = prefix_priority
+            self.priorities[keyword] = priority
+
+        # لا نستخدم lookahead أو \b في بداية النمط كي يبقى مسح البادئة السريع
+        # في محرك re فعّالاً؛ حد الكلمة في البداية يُفحص يدوياً في match
+        self.pattern = None
+        if direct:
+            body = '(' + _trie_pattern(list(direct)) + ')'
+            if whole_words:
+                body += r'\b'
+            self.pattern = re.compile(body)
+
+    def _prefix_matches(self, prefix: str, keyword: str) -> bool:
+        """هل تُطابق البادئة في كل موضع تُطابق فيه الكلمة الأطول؟"""
+        if len(prefix) >= len(keyword) or not keyword.startswith(prefix):
+            return False
+        if not self.whole_words:
+            return True
+        return _is_word_char(prefix[-1]) != _is_word_char(keyword[len(prefix)])
+
+    def match(self, text: str) -> Optional[Intent]:
+        """إيجاد النية الأعلى أولوية في النص بمسح واحد"""
+        if self.pattern is None:
+            return None
+
+        text = " ".join(self._terms(text))
+        best = None
+        position = 0
+        while True:
+            found = self.pattern.search(text, position)
+            if found is None:
+                break
+            start = found.start()
+            # البحث يُستأنف بعد حرف واحد كي لا تُفوَّت الكلمات المتداخلة
+            position = start + 1
+            if self.whole_words and start and _is_word_char(text[start - 1]):
+                continue
+
+            priority = self.priorities[found.group(1)]
+            if best is None or priority < best:
+                best = priority
+                if best == 0:
+                    break
+
+        return None if best is None else self.intents[best]
+
+    def respond(self, text: str, default: Response) -> str:
+        """الرد المناسب للنص أو الرد الافتراضي"""
+        return self.resolve(text, default)[0]
+
+    def resolve(self, text: str, default: Response) -> Tuple[str, bool]:
+        """(الرد، هل هو نص ثابت) — الردود المولّدة بدالة تعتمد على النص أو الوقت فلا تُخزَّن مؤقتاً"""
+        return self.classify(text, default)[1:]
+
+    def classify(self, text: str, default: Response) -> Tuple[Optional[str], str, bool]:
+        """(اسم النية أو None للرد الافتراضي، الرد، هل هو نص ثابت)"""
+        intent = self.match(text)
+        response = intent[2] if intent else default
+        if callable(response):
+            return intent and intent[0], response(text), False
+        return intent and intent[0], response, True
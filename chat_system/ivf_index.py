@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+فهرس تقريبي للجار الأقرب (IVF) للمجموعات الكبيرة
+المتجهات تُوزَّع على قوائم حسب أقرب مركز k-means، والبحث يفحص أقرب n_probe قائمة فقط؛
+البواقي (المتجه ناقص مركزه) تُخزن كاملة float32 أو مكمَّمة 8 بت (sq8) أو بتكميم الجداء (pq)
+قبل التدريب يبحث الفهرس بالمسح الكامل، ويتدرّب تلقائياً عند بلوغ train_size متجه
+"""
+
+import math
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+
+QUANTIZERS = (None, 'sq8', 'pq')
+
+
+class _InvertedList:
+    """معرفات ورموز قائمة واحدة بسعة تتضاعف عند الامتلاء"""
+
+    __slots__ = ('ids', 'codes', 'count')
+
+    def __init__(self, width: int, dtype):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.codes = np.empty((0, width), dtype=dtype)
+        self.count = 0
+
+    def append(self, ids: np.ndarray, codes: np.ndarray):
+        end = self.count + len(ids)
+        if end > len(self.ids):
+            capacity = max(end, 2 * len(self.ids), 16)
+            grown_ids = np.empty(capacity, dtype=self.ids.dtype)
+            grown_codes = np.empty((capacity, self.codes.shape[1]), dtype=self.codes.dtype)
+            grown_ids[:self.count] = self.ids[:self.count]
+            grown_codes[:self.count] = self.codes[:self.count]
+            self.ids, self.codes = grown_ids, grown_codes
+        self.ids[self.count:end] = ids
+        self.codes[self.count:end] = codes
+        self.count = end
+
+    def nbytes(self) -> int:
+        return self.count * (self.ids.itemsize + self.codes.shape[1] * self.codes.itemsize)
+
+
+class IVFIndex:
+    """
+    نفس واجهة EmbeddingIndex (add / search / reset / last_id / len) فيحل محله في الاسترجاع
+    n_lists: عدد القوائم (افتراضياً 4·√n عند التدريب)، n_probe: القوائم المفحوصة لكل استعلام
+    """
+
+    def __init__(self, dim: int, n_lists: Optional[int] = None, n_probe: int = 8,
+                 quantizer: Optional[str] = None, pq_subvectors: int = 16,
+                 train_size: int = 20000, seed: int = 0):
+        if quantizer not in QUANTIZERS:
+            raise ValueError(f"نوع التكميم غير معروف: {quantizer}")
+        if quantizer == 'pq' and dim % pq_subvectors:
+            raise ValueError("يجب أن تقبل الأبعاد القسمة على عدد المتجهات الجزئية")
+        self.dim = dim
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.quantizer = quantizer
+        self.pq_subvectors = pq_subvectors
+        self.train_size = train_size
+        self.seed = seed
+        self._requested_lists = n_lists
+        self.reset()
+
+    def reset(self):
+        """إفراغ الفهرس وإلغاء تدريبه (يُعاد التدريب على المتجهات التالية)"""
+        self.n_lists = self._requested_lists
+        self.count = 0
+        self.centroids: Optional[np.ndarray] = None
+        self.lists = []
+        self._last_id = 0
+        # متجهات ما قبل التدريب (بحث كامل عليها)
+        self._pending_ids = []
+        self._pending = []
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    # ---------- التدريب ----------
+
+    def train(self, vectors: np.ndarray):
+        """تدريب المراكز (والمكمِّم) على عينة ثم توزيع المتجهات المعلقة على القوائم"""
+        vectors = _normalize(vectors, self.dim)
+        rng = np.random.default_rng(self.seed)
+        n_lists = self.n_lists or max(1, min(65536, int(4 * math.sqrt(len(vectors)))))
+        n_lists = min(n_lists, len(vectors))
+        sample = vectors[rng.choice(len(vectors), min(len(vectors), 64 * n_lists), replace=False)]
+
+        kmeans = MiniBatchKMeans(n_clusters=n_lists, batch_size=4096, n_init=1, random_state=self.seed)
+        self.centroids = kmeans.fit(sample).cluster_centers_.astype(np.float32)
+        self.n_lists = n_lists
+
+        residuals = sample - self.centroids[self._assign(sample)]
+        if self.quantizer == 'sq8':
+            self._low = residuals.min(axis=0)
+            self._scale = np.maximum(residuals.max(axis=0) - self._low, 1e-12) / 255.0
+        elif self.quantizer == 'pq':
+            sub = self.dim // self.pq_subvectors
+            self._codebooks = np.stack([
+                MiniBatchKMeans(n_clusters=min(256, len(residuals)), batch_size=4096, n_init=1,
+                                random_state=self.seed).fit(residuals[:, m * sub:(m + 1) * sub]).cluster_centers_
+                for m in range(self.pq_subvectors)
+            ]).astype(np.float32)
+
+        width, dtype = {
+            None: (self.dim, np.float32),
+            'sq8': (self.dim, np.uint8),
+            'pq': (self.pq_subvectors, np.uint8),
+        }[self.quantizer]
+        self.lists = [_InvertedList(width, dtype) for _ in range(n_lists)]
+
+        pending_ids, pending = self._pending_ids, self._pending
+        self._pending_ids, self._pending = [], []
+        self.count = 0
+        for ids, batch in zip(pending_ids, pending):
+            self._add_trained(ids, batch)
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        """أقرب مركز لكل متجه (أكبر جداء داخلي للمتجهات المطبَّعة)"""
+        return np.argmax(vectors @ self.centroids.T, axis=1)
+
+    def _encode(self, residuals: np.ndarray) -> np.ndarray:
+        if self.quantizer == 'sq8':
+            return np.clip(np.rint((residuals - self._low) / self._scale), 0, 255).astype(np.uint8)
+        if self.quantizer == 'pq':
+            sub = self.dim // self.pq_subvectors
+            codes = np.empty((len(residuals), self.pq_subvectors), dtype=np.uint8)
+            for m, codebook in enumerate(self._codebooks):
+                part = residuals[:, m * sub:(m + 1) * sub]
+                # أقرب رمز بالمسافة الإقليدية: |c|² - 2·x·c
+                distances = (codebook ** 2).sum(axis=1) - 2 * part @ codebook.T
+                codes[:, m] = np.argmin(distances, axis=1)
+            return codes
+        return residuals
+
+    # ---------- الإضافة ----------
+
+    def add(self, ids: Iterable[int], vectors: np.ndarray):
+        vectors = _normalize(vectors, self.dim)
+        ids = np.asarray(list(ids), dtype=np.int64)
+        if len(ids) != len(vectors):
+            raise ValueError("عدد المعرفات لا يطابق عدد المتجهات")
+        if not len(ids):
+            return
+        self._last_id = int(ids[-1])
+
+        if self.trained:
+            self._add_trained(ids, vectors)
+            return
+
+        self._pending_ids.append(ids)
+        self._pending.append(vectors)
+        self.count += len(ids)
+        if self.count >= self.train_size:
+            self.train(np.concatenate(self._pending))
+
+    def _add_trained(self, ids: np.ndarray, vectors: np.ndarray):
+        assignment = self._assign(vectors)
+        codes = self._encode(vectors - self.centroids[assignment])
+        order = np.argsort(assignment, kind='stable')
+        lists, starts = np.unique(assignment[order], return_index=True)
+        for list_id, start, end in zip(lists, starts, list(starts[1:]) + [len(order)]):
+            rows = order[start:end]
+            self.lists[list_id].append(ids[rows], codes[rows])
+        self.count += len(ids)
+
+    # ---------- البحث ----------
+
+    def search(self, queries: np.ndarray, k: int = 5, n_probe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """أفضل k لكل استعلام من أقرب n_probe قائمة؛ (المعرفات، الدرجات) مرتبة تنازلياً"""
+        queries = _normalize(queries, self.dim)
+        if not self.trained:
+            return self._search_pending(queries, k)
+
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        coarse = queries @ self.centroids.T
+        probes = np.argpartition(coarse, -n_probe, axis=1)[:, -n_probe:]
+
+        all_ids = np.zeros((len(queries), k), dtype=np.int64)
+        all_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for row, (query, probe) in enumerate(zip(queries, probes)):
+            ids, scores = [], []
+            tables = self._lookup_tables(query)
+            for list_id in probe:
+                inverted = self.lists[list_id]
+                if not inverted.count:
+                    continue
+                ids.append(inverted.ids[:inverted.count])
+                scores.append(coarse[row, list_id] + self._residual_scores(query, tables, inverted))
+            if not ids:
+                continue
+            ids, scores = np.concatenate(ids), np.concatenate(scores)
+            top = _top_k(scores, k)
+            all_ids[row, :len(top)] = ids[top]
+            all_scores[row, :len(top)] = scores[top]
+
+        found = int(np.isfinite(all_scores).sum(axis=1).max(initial=0))
+        return all_ids[:, :found], all_scores[:, :found]
+
+    def _lookup_tables(self, query: np.ndarray):
+        """ما يُحسب مرة لكل استعلام: جدول PQ أو ثوابت sq8"""
+        if self.quantizer == 'pq':
+            sub = self.dim // self.pq_subvectors
+            return np.einsum('mks,ms->mk', self._codebooks, query.reshape(self.pq_subvectors, sub))
+        if self.quantizer == 'sq8':
+            return float(query @ self._low), query * self._scale
+        return None
+
+    def _residual_scores(self, query: np.ndarray, tables, inverted: _InvertedList) -> np.ndarray:
+        """الجداء الداخلي للاستعلام مع بواقي القائمة (المفكوكة تقريبياً)"""
+        codes = inverted.codes[:inverted.count]
+        if self.quantizer == 'pq':
+            return tables[np.arange(self.pq_subvectors), codes].sum(axis=1)
+        if self.quantizer == 'sq8':
+            offset, scaled = tables
+            return codes @ scaled + offset
+        return codes @ query
+
+    def _search_pending(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        if not self._pending:
+            empty = np.empty((len(queries), 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+        ids = np.concatenate(self._pending_ids)
+        scores = queries @ np.concatenate(self._pending).T
+        top = np.stack([_top_k(row, k) for row in scores])
+        return ids[top], np.take_along_axis(scores, top, axis=1)
+
+    # ---------- الإحصاءات ----------
+
+    def memory_bytes(self) -> int:
+        """ذاكرة القوائم والمراكز وجداول التكميم"""
+        total = sum(inverted.nbytes() for inverted in self.lists)
+        total += sum(ids.nbytes + vectors.nbytes for ids, vectors in zip(self._pending_ids, self._pending))
+        if self.trained:
+            total += self.centroids.nbytes
+            if self.quantizer == 'pq':
+                total += self._codebooks.nbytes
+        return total
+
+    def bytes_per_vector(self) -> float:
+        return self.memory_bytes() / self.count if self.count else 0.0
+
+    def last_id(self) -> int:
+        return self._last_id
+
+    def __len__(self) -> int:
+        return self.count
+
+
+def _normalize(vectors: np.ndarray, dim: int) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, dim)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """مواضع أكبر k درجة مرتبة تنازلياً"""
+    k = min(k, len(scores))
+    top = np.argpartition(scores, -k)[-k:] if k < len(scores) else np.arange(len(scores))
+    return top[np.argsort(-scores[top])]
+
+
+def recall_at_k(approximate_ids: np.ndarray, exact_ids: np.ndarray) -> float:
+    """نسبة نتائج البحث الدقيق التي أعادها البحث التقريبي"""
+    hits = sum(len(set(a.tolist()) & set(e.tolist())) for a, e in zip(approximate_ids, exact_ids))
+    return hits / exact_ids.size if exact_ids.size else 1.0
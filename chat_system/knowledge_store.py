@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+مخزن المعرفة وتغذيته من ملفات ZIP
+تُقرأ ملفات الأرشيف كتيارات دون فك على القرص، ويُفك ترميزها تدريجياً،
+ثم تُقسم إلى مقاطع متداخلة عبر سلسلة مولّدات وتُدرج في SQLite بمعاملات كبيرة،
+فيبقى استهلاك الذاكرة ثابتاً مهما كبر الأرشيف
+البحث عبر فهرس FTS5 بترتيب BM25 على نص مطبَّع ومجذَّع (تشكيل، ألف/همزة، تاء مربوطة، سوابق ولواحق)
+"""
+
+import codecs
+import heapq
+import os
+import sqlite3
+import threading
+import time
+import zipfile
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .arabic import NORMALIZATION_VERSION, normalize_arabic, stem_text, stem_tokens, tokenize
+
+# امتدادات الملفات النصية المقبولة في الأرشيف
+TEXT_EXTENSIONS = frozenset((
+    '.txt', '.md', '.json', '.py', '.js', '.html', '.css', '.yml', '.yaml', '.xml', '.csv',
+))
+
+READ_BLOCK_BYTES = 64 * 1024
+
+# أقصى عدد مقاطع تُرتَّب بـ BM25 لكل استعلام
+MAX_CANDIDATES = 500
+
+# عدد المعرفات المحجوزة في كل مرة للمستندات (وللمقاطع في add_documents)
+ID_BLOCK = 1000
+
+
+def iter_decoded(stream: BinaryIO, encoding: str = 'utf-8-sig',
+                 block_size: int = READ_BLOCK_BYTES) -> Iterator[str]:
+    """فك ترميز تيار بايتات على دفعات؛ المحارف المقطوعة بين دفعتين تُستكمل في التالية"""
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            break
+        text = decoder.decode(block)
+        if text:
+            yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+def _break_point(buffer: str, start: int, size: int) -> int:
+    """نهاية المقطع: آخر فراغ في النصف الثاني من النافذة إن وُجد، وإلا حدها"""
+    limit = start + size
+    space = max(buffer.rfind(' ', start + size // 2, limit), buffer.rfind('\n', start + size // 2, limit))
+    return space + 1 if space >= 0 else limit
+
+
+def iter_chunks(pieces: Iterable[str], size: int = 1000, overlap: int = 200) -> Iterator[str]:
+    """
+    تقسيم نص متدفق إلى مقاطع بطول size تقريباً يتداخل كل منها مع سابقه بـ overlap محرف
+    لا يُحتفظ إلا بالجزء غير المستهلك من النص
+    """
+    if not 0 <= overlap < size:
+        raise ValueError("يجب أن يكون التداخل أصغر من طول المقطع")
+
+    buffer = ""
+    start = 0        # بداية المقطع التالي داخل buffer
+    emitted_end = 0  # نهاية آخر مقطع صدر داخل buffer
+    for piece in pieces:
+        # ضغط المخزن مرة لكل دفعة بدل نسخه عند كل مقطع
+        buffer = buffer[start:] + piece
+        emitted_end = max(0, emitted_end - start)
+        start = 0
+        while len(buffer) - start >= size:
+            end = _break_point(buffer, start, size)
+            chunk = buffer[start:end]
+            if chunk.strip():
+                yield chunk
+            emitted_end = end
+            start = max(end - overlap, start + 1)
+
+    if emitted_end < len(buffer):
+        chunk = buffer[start:]
+        if chunk.strip():
+            yield chunk
+
+
+def iter_text_members(archive: zipfile.ZipFile,
+                      extensions: frozenset = TEXT_EXTENSIONS) -> Iterator[zipfile.ZipInfo]:
+    """ملفات الأرشيف النصية (تُتجاهل المجلدات والامتدادات الأخرى)"""
+    for info in archive.infolist():
+        if info.is_dir():
+            continue
+        if os.path.splitext(info.filename)[1].lower() in extensions:
+            yield info
+
+
+def query_terms(text: str, stemming: bool = False) -> List[str]:
+    """كلمات الاستعلام المطبَّعة (أو جذوعها) دون تكرار وبترتيب ظهورها (الترقيم فاصل كما في محلل unicode61)"""
+    return list(dict.fromkeys(stem_tokens(text) if stemming else tokenize(text)))
+
+
+class _CountingReader:
+    """غلاف لتيار يحصي البايتات المقروءة منه"""
+
+    __slots__ = ('stream', 'bytes_read')
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+class KnowledgeStore:
+    """مقاطع المعرفة في SQLite: جدول للمستندات وجدول للمقاطع وفهرس FTS5 للبحث"""
+
+    def __init__(self, path: str = ':memory:', stemming: bool = True):
+        """stemming: فهرسة الجذوع والبحث بها (البرمجة وبرمجيات وبرمجة كلمة واحدة في الفهرس)"""
+        self.path = path
+        self.stemming = stemming
+        self._index_text = stem_text if stemming else normalize_arabic
+        self._conn = sqlite3.connect(path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        if path != ':memory:':
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA cache_size=-65536")
+        self._conn.create_function("index_text", 1, self._index_text, deterministic=True)
+        has_fts = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'chunks_fts'"
+        ).fetchone() is not None
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            " id INTEGER PRIMARY KEY, archive TEXT NOT NULL, name TEXT NOT NULL,"
+            " bytes INTEGER NOT NULL, chunks INTEGER NOT NULL, added REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            " id INTEGER PRIMARY KEY, document_id INTEGER NOT NULL, seq INTEGER NOT NULL,"
+            " content TEXT NOT NULL, keywords TEXT);"
+            "CREATE INDEX IF NOT EXISTS chunks_document ON chunks(document_id, seq);"
+            # فهرس بلا محتوى: النص الأصلي في chunks والفهرس يحمل النص المطبَّع فقط
+            "CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5("
+            " body, content='', tokenize='unicode61 remove_diacritics 2');"
+            "CREATE VIRTUAL TABLE IF NOT EXISTS chunks_vocab USING fts5vocab(chunks_fts, 'row');"
+            # أول معرف غير محجوز لكل جدول (المعرفات تُحجز كتلاً فتبقى فريدة بين العمليات)
+            "CREATE TABLE IF NOT EXISTS id_blocks (name TEXT PRIMARY KEY, next_id INTEGER NOT NULL);"
+        )
+        if 'keywords' not in {row[1] for row in self._conn.execute("PRAGMA table_info(chunks)")}:
+            self._conn.execute("ALTER TABLE chunks ADD COLUMN keywords TEXT")
+        indexed_version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        # إصدار الفهرس يجمع إصدار قواعد التطبيع وتفعيل التجذيع
+        index_version = NORMALIZATION_VERSION * 2 + int(stemming)
+        if not has_fts or indexed_version != index_version:
+            # قاعدة أُنشئت قبل الفهرس أو بقواعد تطبيع أخرى: إعادة فهرسة المقاطع الموجودة
+            self._conn.execute("BEGIN")
+            self._conn.execute("INSERT INTO chunks_fts (chunks_fts) VALUES ('delete-all')")
+            self._conn.execute(
+                "INSERT INTO chunks_fts (rowid, body)"
+                " SELECT id, index_text(COALESCE(keywords || ' ', '') || content) FROM chunks"
+            )
+            self._conn.execute(f"PRAGMA user_version = {index_version}")
+            self._conn.execute("COMMIT")
+        self._lock = threading.Lock()
+        self._ingest_lock = threading.Lock()
+        # عدد المقاطع لكل كلمة؛ يُفرَّغ عند كل كتابة
+        self._document_frequency: Dict[str, int] = {}
+        self._writes = 0
+
+    def _write_batch(self, documents: List[Tuple], chunks: List[Tuple]):
+        """
+        إدراج دفعة كاملة في معاملة واحدة
+        chunks: (المعرف، المستند، الترتيب، المحتوى، كلمات إضافية للفهرسة أو None)
+        """
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN")
+            try:
+                if documents:
+                    conn.executemany(
+                        "INSERT INTO documents (id, archive, name, bytes, chunks, added) VALUES (?, ?, ?, ?, ?, ?)",
+                        documents,
+                    )
+                if chunks:
+                    conn.executemany(
+                        "INSERT INTO chunks (id, document_id, seq, content, keywords) VALUES (?, ?, ?, ?, ?)",
+                        chunks,
+                    )
+                    conn.executemany(
+                        "INSERT INTO chunks_fts (rowid, body) VALUES (?, ?)",
+                        ((chunk[0], self._index_text(f"{chunk[4]} {chunk[3]}" if chunk[4] else chunk[3]))
+                         for chunk in chunks),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            finally:
+                self._document_frequency.clear()
+                self._writes += 1
+
+    def _reserve_ids(self, table: str, count: int) -> int:
+        """
+        حجز count معرفاً متتالياً لجدول وإرجاع أولها، في معاملة BEGIN IMMEDIATE تأخذ قفل الكتابة
+        فلا تحصل عمليتان (عدة عمليات uvicorn على نفس القاعدة) على نفس المعرفات
+        """
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                reserved = conn.execute("SELECT next_id FROM id_blocks WHERE name = ?", (table,)).fetchone()
+                # MAX(id) أيضاً: صفوف كُتبت قبل جدول الحجز
+                start = max(reserved[0] if reserved else 1,
+                            conn.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}").fetchone()[0])
+                conn.execute("INSERT OR REPLACE INTO id_blocks (name, next_id) VALUES (?, ?)",
+                             (table, start + count))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return start
+
+    def _ids(self, table: str, block: int) -> Iterator[int]:
+        """معرفات فريدة للجدول، تُحجز كتلة جديدة عند نفاد السابقة"""
+        while True:
+            start = self._reserve_ids(table, block)
+            yield from range(start, start + block)
+
+    def ingest_zip(self, source: Union[str, BinaryIO], archive_name: Optional[str] = None,
+                   chunk_size: int = 1000, overlap: int = 200, batch_size: int = 20000) -> Dict:
+        """
+        تغذية المخزن من أرشيف ZIP (مسار أو ملف مفتوح قابل للتنقل)
+        تُكتب المقاطع على دفعات من batch_size مقطع لكل معاملة
+        """
+        start = time.perf_counter()
+        if archive_name is None:
+            archive_name = source if isinstance(source, str) else getattr(source, 'name', None)
+        archive_name = os.path.basename(str(archive_name or 'upload.zip'))
+        stats = {"files": 0, "skipped": [], "bytes": 0, "chunks": 0}
+
+        with self._ingest_lock, zipfile.ZipFile(source) as archive:
+            document_ids = self._ids("documents", ID_BLOCK)
+            chunk_ids = self._ids("chunks", batch_size)
+            documents: List[Tuple] = []
+            chunks: List[Tuple] = []
+
+            for info in iter_text_members(archive):
+                try:
+                    member = archive.open(info)
+                except (RuntimeError, NotImplementedError, zipfile.BadZipFile) as e:
+                    # ملفات مشفرة أو بضغط غير مدعوم
+                    stats["skipped"].append({"name": info.filename, "error": str(e)})
+                    continue
+
+                document_id = next(document_ids)
+                count = 0
+                with member:
+                    reader = _CountingReader(member)
+                    for count, chunk in enumerate(iter_chunks(iter_decoded(reader), chunk_size, overlap), 1):
+                        chunks.append((next(chunk_ids), document_id, count - 1, chunk, None))
+                        if len(chunks) >= batch_size:
+                            self._write_batch(documents, chunks)
+                            documents, chunks = [], []
+
+                documents.append((document_id, archive_name, info.filename,
+                                  reader.bytes_read, count, time.time()))
+                stats["files"] += 1
+                stats["bytes"] += reader.bytes_read
+                stats["chunks"] += count
+
+            self._write_batch(documents, chunks)
+            if stats["chunks"] >= batch_size:
+                self.optimize()
+
+        stats["seconds"] = time.perf_counter() - start
+        return {"status": "success", **stats}
+
+    def add_documents(self, archive: str, entries: Iterable[Tuple[str, str, str]]) -> int:
+        """
+        إضافة مستندات قصيرة كمقطع واحد لكل منها
+        entries: (الاسم، المحتوى، كلمات إضافية تُفهرس دون أن تظهر في المحتوى)
+        """
+        with self._ingest_lock:
+            document_ids = self._ids("documents", ID_BLOCK)
+            chunk_ids = self._ids("chunks", ID_BLOCK)
+            documents, chunks = [], []
+            now = time.time()
+            for name, content, keywords in entries:
+                document_id = next(document_ids)
+                documents.append((document_id, archive, name, len(content.encode('utf-8')), 1, now))
+                chunks.append((next(chunk_ids), document_id, 0, content, keywords or None))
+            self._write_batch(documents, chunks)
+        return len(documents)
+
+    @property
+    def version(self) -> Tuple[int, int]:
+        """إصدار المحتوى: يتغير مع كل كتابة من هذا الاتصال أو من اتصال آخر على نفس الملف"""
+        with self._lock:
+            return self._writes, self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def optimize(self):
+        """دمج أجزاء فهرس FTS5 في جزء واحد؛ يُسرّع البحث بعد الإدراجات الكبيرة"""
+        with self._lock:
+            self._conn.execute("INSERT INTO chunks_fts (chunks_fts) VALUES ('optimize')")
+
+    def has_archive(self, archive: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM documents WHERE archive = ? LIMIT 1", (archive,)
+            ).fetchone() is not None
+
+    def _frequencies(self, terms: List[str]) -> Dict[str, int]:
+        """عدد المقاطع التي تحوي كل كلمة (من fts5vocab مع تخزين مؤقت)"""
+        cache = self._document_frequency
+        missing = [term for term in terms if term not in cache]
+        if missing:
+            if len(cache) > 100000:
+                cache.clear()
+            for term in missing:
+                cache[term] = 0
+            placeholders = ",".join("?" * len(missing))
+            for term, count in self._conn.execute(
+                f"SELECT term, doc FROM chunks_vocab WHERE term IN ({placeholders})", missing
+            ):
+                cache[term] = count
+        return {term: cache[term] for term in terms}
+
+    def _ranked(self, query: str, k: int, candidates: int, max_candidates: int) -> List[Tuple[int, float]]:
+        """(المعرف، رتبة BM25) لأفضل k مقطع؛ عند كثرة المطابقات يُرتَّب أول max_candidates منها فقط"""
+        if candidates <= max_candidates:
+            return self._conn.execute(
+                "SELECT rowid, rank FROM chunks_fts WHERE chunks_fts MATCH ? ORDER BY rank LIMIT ?",
+                (query, k),
+            ).fetchall()
+        return heapq.nsmallest(k, self._conn.execute(
+            "SELECT rowid, bm25(chunks_fts) FROM chunks_fts WHERE chunks_fts MATCH ? LIMIT ?",
+            (query, max_candidates),
+        ), key=lambda row: row[1])
+
+    def search(self, text: str, k: int = 5, max_candidates: int = MAX_CANDIDATES) -> List[Dict]:
+        """
+        أفضل k مقطع للنص بترتيب BM25
+        تُستبعد الكلمات الشائعة (وزن IDF شبه معدوم) متى تجاوز مجموع مطابقاتها max_candidates؛
+        تُطلب المقاطع الحاوية لكل الكلمات أولاً ثم تُستكمل النتائج بما يحوي بعضها
+        """
+        return self._with_chunks([self._search_ranked(text, k, max_candidates)])[0]
+
+    def search_batch(self, texts: Iterable[str], k: int = 5,
+                     max_candidates: int = MAX_CANDIDATES) -> List[List[Dict]]:
+        """
+        نتائج search لكل نص بترتيب المدخلات؛ FTS5 لا يطابق عدة استعلامات معاً فيُرتَّب كل نص وحده،
+        ثم تُجلب صفوف مقاطع الدفعة كلها باستعلام واحد
+        """
+        return self._with_chunks([self._search_ranked(text, k, max_candidates) for text in texts])
+
+    def _search_ranked(self, text: str, k: int, max_candidates: int) -> List[Tuple[int, float]]:
+        terms = query_terms(text, self.stemming)
+        if not terms:
+            return []
+
+        with self._lock:
+            frequencies = self._frequencies(terms)
+            terms = sorted((term for term in terms if frequencies[term]), key=frequencies.get)
+            if not terms:
+                return []
+
+            selected, candidates = [], 0
+            for term in terms:
+                if selected and candidates + frequencies[term] > max_candidates:
+                    break
+                selected.append(term)
+                candidates += frequencies[term]
+            quoted = [f'"{term}"' for term in selected]
+
+            # المقاطع التي تحوي كل الكلمات أولاً: التقاطع لا يتجاوز مطابقات الكلمة الأندر
+            ranked = self._ranked(" AND ".join(quoted), k, frequencies[selected[0]], max_candidates)
+            if len(ranked) < k and len(selected) > 1:
+                # استكمال النتائج من المقاطع التي تحوي بعض الكلمات
+                extra = self._ranked(" OR ".join(quoted), k + len(ranked), candidates, max_candidates)
+                seen = {chunk_id for chunk_id, _ in ranked}
+                ranked += [row for row in extra if row[0] not in seen][:k - len(ranked)]
+        return ranked
+
+    def _with_chunks(self, rankings: List[List[Tuple[int, float]]]) -> List[List[Dict]]:
+        chunks = self.get_chunks({chunk_id for ranked in rankings for chunk_id, _ in ranked})
+        # رتبة BM25 في FTS5 سالبة (الأصغر أفضل)، فتُعكس لتصبح درجة
+        return [
+            [{**chunks[chunk_id], "score": -rank} for chunk_id, rank in ranked if chunk_id in chunks]
+            for ranked in rankings
+        ]
+
+    def get_chunks(self, ids: Iterable[int]) -> Dict[int, Dict]:
+        """المقاطع بمعرفاتها مع اسم مستندها وأرشيفه"""
+        ids = list(ids)
+        if not ids:
+            return {}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT c.id, d.archive, d.name, c.content FROM chunks c"
+                " JOIN documents d ON d.id = c.document_id"
+                f" WHERE c.id IN ({','.join('?' * len(ids))})",
+                ids,
+            ).fetchall()
+        return {
+            chunk_id: {"id": chunk_id, "archive": archive, "name": name, "content": content}
+            for chunk_id, archive, name, content in rows
+        }
+
+    def iter_chunks(self, after_id: int = 0, batch_size: int = 10000) -> Iterator[List[Tuple[int, str]]]:
+        """المقاطع ذات المعرف الأكبر من after_id على دفعات (id، المحتوى)"""
+        while True:
+            with self._lock:
+                batch = self._conn.execute(
+                    "SELECT id, content FROM chunks WHERE id > ? ORDER BY id LIMIT ?", (after_id, batch_size)
+                ).fetchall()
+            if not batch:
+                return
+            yield batch
+            after_id = batch[-1][0]
+
+    def last_chunk_id(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM chunks").fetchone()[0]
+
+    def chunk_count(self, up_to: Optional[int] = None) -> int:
+        """عدد المقاطع (أو عدد ما معرفه لا يتجاوز up_to)"""
+        with self._lock:
+            if up_to is None:
+                return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM chunks WHERE id <= ?", (up_to,)).fetchone()[0]
+
+    def document_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
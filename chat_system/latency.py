@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+قياس زمن الطلبات حسب المرحلة
+كل طلب يسجل قاموس {المرحلة: ثوانٍ}، ويُحتفظ بآخر N قيمة لكل مرحلة لحساب المئينات
+ومدرّج لوغاريتمي لعدد غير محدود من القياسات (يُدمج بين العمليات في التقييم دون اتصال)
+"""
+
+import math
+import threading
+from typing import Dict, List, Optional
+
+from .conversation_store import RingBuffer
+
+
+class LatencyStats:
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self.requests = 0
+        self._stages: Dict[str, RingBuffer] = {}
+        self._lock = threading.Lock()
+
+    def record(self, timings: Dict[str, float]):
+        """تسجيل أزمنة طلب واحد"""
+        with self._lock:
+            self.requests += 1
+            for stage, seconds in timings.items():
+                buffer = self._stages.get(stage)
+                if buffer is None:
+                    buffer = self._stages[stage] = RingBuffer(self.window)
+                buffer.append(seconds)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """المتوسط والمئينات p50/p95 والأقصى بالميلي ثانية لكل مرحلة"""
+        with self._lock:
+            samples = {stage: sorted(buffer) for stage, buffer in self._stages.items()}
+        return {
+            stage: {
+                "count": len(values),
+                "mean_ms": sum(values) / len(values) * 1000,
+                "p50_ms": values[len(values) // 2] * 1000,
+                "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))] * 1000,
+                "max_ms": values[-1] * 1000,
+            }
+            for stage, values in samples.items() if values
+        }
+
+
+class LatencyHistogram:
+    """
+    حاويات لوغاريتمية (BUCKETS_PER_DECADE لكل عشر) من 1µs إلى 100s: ذاكرة ثابتة مهما كثرت القياسات،
+    والدمج جمع عدادات؛ المئين يُقدَّر بمنتصف حاويته (خطأ نسبي أقل من 1.2%)
+    """
+
+    MIN_SECONDS = 1e-6
+    DECADES = 8
+    BUCKETS_PER_DECADE = 100
+
+    def __init__(self, counts: Optional[List[int]] = None, total_seconds: float = 0.0):
+        self.counts = list(counts) if counts else [0] * (self.DECADES * self.BUCKETS_PER_DECADE + 2)
+        self.total_seconds = total_seconds
+
+    def record(self, seconds: float):
+        if seconds <= self.MIN_SECONDS:
+            bucket = 0
+        else:
+            bucket = int(math.log10(seconds / self.MIN_SECONDS) * self.BUCKETS_PER_DECADE) + 1
+            bucket = min(bucket, len(self.counts) - 1)
+        self.counts[bucket] += 1
+        self.total_seconds += seconds
+
+    def merge(self, other: 'LatencyHistogram'):
+        for bucket, count in enumerate(other.counts):
+            self.counts[bucket] += count
+        self.total_seconds += other.total_seconds
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def percentile(self, q: float) -> float:
+        """المئين q (بين 0 و 100) بالثواني"""
+        rank = max(1, math.ceil(self.count * q / 100))
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                if bucket == 0:
+                    return self.MIN_SECONDS
+                return self.MIN_SECONDS * 10 ** ((bucket - 0.5) / self.BUCKETS_PER_DECADE)
+        return 0.0
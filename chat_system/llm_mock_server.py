@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+خادم محلي يحاكي مزودي النماذج اللغوية (OpenAI / Ollama / Gemini) لقياس الأداء دون اتصال
+زمن الرد ونسبة الأخطاء العابرة (503) قابلان للضبط، ويعدّ الاتصالات المفتوحة لإظهار إعادة استعمالها
+التشغيل: python -m chat_system.llm_mock_server
+(MOCK_LLM_PORT و MOCK_LLM_LATENCY بالثواني و MOCK_LLM_FAILURE_RATE بين 0 و 1)
+"""
+
+import asyncio
+import os
+import random
+from typing import Dict
+
+from aiohttp import web
+
+
+class MockLLMServer:
+    def __init__(self, latency: float = 0.05, failure_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.requests = 0
+        self.failures = 0
+        self._rng = random.Random(seed)
+        self._connections = set()
+        self._runner = None
+        self.port = None
+
+        self.app = web.Application()
+        self.app.router.add_post('/v1/chat/completions', self.openai)
+        self.app.router.add_post('/api/chat', self.ollama)
+        self.app.router.add_post('/v1beta/models/{model}:generateContent', self.gemini)
+        self.app.router.add_get('/stats', self.stats_handler)
+
+    @property
+    def connections(self) -> int:
+        """عدد الاتصالات المختلفة التي وصلت منها الطلبات"""
+        return len(self._connections)
+
+    async def _simulate(self, request: web.Request):
+        """None إذا نجح الطلب، وإلا رد خطأ عابر"""
+        self.requests += 1
+        self._connections.add(request.transport.get_extra_info('peername'))
+        await asyncio.sleep(self.latency)
+        if self._rng.random() < self.failure_rate:
+            self.failures += 1
+            return web.json_response({"error": "overloaded"}, status=503)
+        return None
+
+    @staticmethod
+    def _reply(text: str) -> str:
+        return f"رد تجريبي على: {text[:80]}"
+
+    async def openai(self, request: web.Request):
+        body = await request.json()
+        error = await self._simulate(request)
+        if error is not None:
+            return error
+        content = self._reply(body["messages"][-1]["content"])
+        return web.json_response({
+            "model": body["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        })
+
+    async def ollama(self, request: web.Request):
+        body = await request.json()
+        error = await self._simulate(request)
+        if error is not None:
+            return error
+        content = self._reply(body["messages"][-1]["content"])
+        return web.json_response({"model": body["model"], "message": {"role": "assistant", "content": content},
+                                  "done": True})
+
+    async def gemini(self, request: web.Request):
+        body = await request.json()
+        error = await self._simulate(request)
+        if error is not None:
+            return error
+        content = self._reply(body["contents"][-1]["parts"][0]["text"])
+        return web.json_response({"candidates": [{"content": {"role": "model", "parts": [{"text": content}]}}]})
+
+    def stats(self) -> Dict:
+        return {"requests": self.requests, "failures": self.failures, "connections": self.connections}
+
+    async def stats_handler(self, request: web.Request):
+        return web.json_response(self.stats())
+
+    def reset(self):
+        self.requests = self.failures = 0
+        self._connections.clear()
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """التشغيل داخل حلقة الأحداث الحالية؛ يُرجع الرابط الأساسي (المنفذ 0 = أي منفذ حر)"""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return f"http://{host}:{self.port}"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+if __name__ == "__main__":
+    server = MockLLMServer(
+        latency=float(os.getenv("MOCK_LLM_LATENCY", "0.05")),
+        failure_rate=float(os.getenv("MOCK_LLM_FAILURE_RATE", "0")),
+    )
+    port = int(os.getenv("MOCK_LLM_PORT", "8090"))
+    print(f"🧪 خادم المزود التجريبي: http://127.0.0.1:{port}")
+    print(f"   OpenAI: PROVIDER=openai OPENAI_BASE_URL=http://127.0.0.1:{port}/v1")
+    print(f"   Ollama: PROVIDER=ollama OLLAMA_HOST=http://127.0.0.1:{port}")
+    print(f"   Gemini: PROVIDER=gemini GEMINI_BASE_URL=http://127.0.0.1:{port}")
+    web.run_app(server.app, host='127.0.0.1', port=port, access_log=None)
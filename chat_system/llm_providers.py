@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+طبقة مزودي النماذج اللغوية (OpenAI / Ollama / Gemini)
+كل المزودين يستعملون جلسة aiohttp واحدة مشتركة (اتصالات keep-alive يعاد استعمالها)،
+ولكل مزود حد للطلبات المتزامنة ومهلة، وإعادة محاولة للأخطاء العابرة بتأخير أُسّي عشوائي
+الإعداد من متغيرات البيئة: PROVIDER و MODEL و OLLAMA_MODEL و GEMINI_API_KEY ...
+"""
+
+import asyncio
+import os
+import random
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+
+Message = Dict[str, str]
+
+# رموز HTTP التي تستحق إعادة المحاولة
+RETRY_STATUSES = frozenset({408, 409, 425, 429, 500, 502, 503, 504})
+
+
+class ProviderError(Exception):
+    """فشل طلب المزود بعد استنفاد المحاولات (أو خطأ لا تفيد فيه الإعادة)"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class ClientPool:
+    """
+    جلسة aiohttp واحدة لكل العملية تُنشأ عند أول طلب داخل حلقة الأحداث
+    limit: أقصى عدد اتصالات مفتوحة، limit_per_host: لكل مضيف
+    """
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 32, keepalive_timeout: float = 30.0):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit, limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout, ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+# الجلسة المشتركة الافتراضية
+shared_pool = ClientPool()
+
+
+class LLMProvider:
+    """
+    أساس المزودين: الفئات الفرعية تبني الطلب (_request) وتستخرج النص من الرد (_parse)
+    concurrency: أقصى طلبات متزامنة لهذا المزود، timeout: مهلة المحاولة الواحدة بالثواني،
+    retries: محاولات إضافية بعد الأولى، backoff: أساس التأخير الأُسّي (بحد max_backoff)
+    """
+
+    name = "base"
+
+    def __init__(self, model: str, base_url: str, api_key: Optional[str] = None,
+                 concurrency: int = 8, timeout: float = 30.0, retries: int = 2,
+                 backoff: float = 0.25, max_backoff: float = 4.0,
+                 pool: Optional[ClientPool] = None):
+        self.model = model
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.concurrency = concurrency
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.pool = pool or shared_pool
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.requests = 0
+        self.retried = 0
+        self.failures = 0
+        self.in_flight = 0
+
+    def _request(self, messages: List[Message], options: Dict) -> Tuple[str, Dict[str, str], Dict]:
+        """(الرابط، الترويسات، جسم JSON)"""
+        raise NotImplementedError
+
+    def _parse(self, data: Dict) -> str:
+        raise NotImplementedError
+
+    def _delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        """تأخير أُسّي بعشوائية كاملة كي لا تعيد الطلبات الفاشلة معاً في اللحظة نفسها"""
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    async def complete(self, messages: List[Message], **options) -> str:
+        """نص الرد على المحادثة (قائمة {role, content})"""
+        url, headers, payload = self._request(messages, options)
+        session = await self.pool.session()
+        self.requests += 1
+
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            # الحد يُحجز لكل محاولة فقط، فلا يشغل الانتظار بين المحاولات مكاناً
+            async with self._semaphore:
+                self.in_flight += 1
+                try:
+                    async with session.post(url, json=payload, headers=headers, timeout=self.timeout) as response:
+                        if response.status == 200:
+                            return self._parse(await response.json(content_type=None))
+                        body = await response.text()
+                        error = ProviderError(f"{self.name}: HTTP {response.status}: {body[:200]}", response.status)
+                        retry_after = _retry_after(response.headers.get('Retry-After'))
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = ProviderError(f"{self.name}: {type(e).__name__}: {e}")
+                except (KeyError, IndexError, TypeError, ValueError) as e:
+                    self.failures += 1
+                    raise ProviderError(f"{self.name}: رد غير متوقع: {e}") from e
+                finally:
+                    self.in_flight -= 1
+
+            if attempt == self.retries or (error.status is not None and error.status not in RETRY_STATUSES):
+                self.failures += 1
+                raise error
+            self.retried += 1
+            await asyncio.sleep(self._delay(attempt, retry_after))
+
+    def stats(self) -> Dict:
+        return {
+            "provider": self.name,
+            "model": self.model,
+            "concurrency": self.concurrency,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "retries": self.retried,
+            "failures": self.failures,
+        }
+
+
+class OpenAIProvider(LLMProvider):
+    """واجهة chat/completions (تصلح لأي خادم متوافق مع OpenAI)"""
+
+    name = "openai"
+
+    def _request(self, messages, options):
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        return f"{self.base_url}/chat/completions", headers, {"model": self.model, "messages": messages, **options}
+
+    def _parse(self, data):
+        return data["choices"][0]["message"]["content"]
+
+
+class OllamaProvider(LLMProvider):
+    name = "ollama"
+
+    def _request(self, messages, options):
+        payload = {"model": self.model, "messages": messages, "stream": False}
+        if options:
+            payload["options"] = options
+        return f"{self.base_url}/api/chat", {}, payload
+
+    def _parse(self, data):
+        return data["message"]["content"]
+
+
+class GeminiProvider(LLMProvider):
+    """generateContent؛ رسائل system تصبح systemInstruction ودور assistant يصبح model"""
+
+    name = "gemini"
+
+    def _request(self, messages, options):
+        system = [{"text": m["content"]} for m in messages if m["role"] == "system"]
+        payload = {
+            "contents": [
+                {"role": "model" if m["role"] == "assistant" else "user", "parts": [{"text": m["content"]}]}
+                for m in messages if m["role"] != "system"
+            ]
+        }
+        if system:
+            payload["systemInstruction"] = {"parts": system}
+        if options:
+            payload["generationConfig"] = options
+        headers = {"x-goog-api-key": self.api_key} if self.api_key else {}
+        return f"{self.base_url}/v1beta/models/{self.model}:generateContent", headers, payload
+
+    def _parse(self, data):
+        return "".join(part.get("text", "") for part in data["candidates"][0]["content"]["parts"])
+
+
+PROVIDERS = {
+    "openai": OpenAIProvider,
+    "ollama": OllamaProvider,
+    "gemini": GeminiProvider,
+}
+
+
+def create_provider(name: str, pool: Optional[ClientPool] = None, **settings) -> LLMProvider:
+    if name not in PROVIDERS:
+        raise ValueError(f"مزود غير معروف: {name} (المتاح: {', '.join(PROVIDERS)})")
+    return PROVIDERS[name](pool=pool, **settings)
+
+
+def provider_from_env(pool: Optional[ClientPool] = None) -> Optional[LLMProvider]:
+    """
+    المزود حسب PROVIDER (أو gemini إذا وُجد GEMINI_API_KEY وحده)؛ None إذا لم يُعدّ أي مزود
+    LLM_CONCURRENCY و LLM_TIMEOUT و LLM_RETRIES تضبط الحدود، و *_BASE_URL توجه الطلبات لخادم آخر
+    (مثل llm_mock_server محلياً)
+    """
+    name = os.getenv("PROVIDER") or ("gemini" if os.getenv("GEMINI_API_KEY") else None)
+    if not name:
+        return None
+    settings = {
+        "concurrency": int(os.getenv("LLM_CONCURRENCY", "8")),
+        "timeout": float(os.getenv("LLM_TIMEOUT", "30")),
+        "retries": int(os.getenv("LLM_RETRIES", "2")),
+    }
+    if name == "openai":
+        settings.update(model=os.getenv("MODEL", "gpt-4.1-mini"), api_key=os.getenv("OPENAI_API_KEY"),
+                        base_url=os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1"))
+    elif name == "ollama":
+        settings.update(model=os.getenv("OLLAMA_MODEL", "llama3.1"),
+                        base_url=os.getenv("OLLAMA_HOST", "http://localhost:11434"))
+    elif name == "gemini":
+        settings.update(model=os.getenv("GEMINI_MODEL", "gemini-1.5-flash"), api_key=os.getenv("GEMINI_API_KEY"),
+                        base_url=os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com"))
+    return create_provider(name, pool=pool, **settings)
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+ذاكرة مؤقتة للردود
+المفتاح هو الرسالة بعد التطبيع (حروف صغيرة، بلا ترقيم، تطبيع عربي، مسافات موحدة)،
+والإزاحة بالأقدم استخداماً (LRU) مع مدة صلاحية وحد أقصى للحجم بالبايت،
+وتُفرَّغ كلها عند تغيّر إصدار قاعدة المعرفة
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from .arabic import tokenize
+
+# كلفة تقريبية لكل مدخل فوق حجم النصين (القاموس والصف)
+ENTRY_OVERHEAD = 64
+
+
+def cache_key(message: str) -> str:
+    """كلمات الرسالة المطبَّعة (كما في preprocess_text) مفصولة بمسافة واحدة"""
+    return " ".join(tokenize(message))
+
+
+class ResponseCache:
+    def __init__(self, max_bytes: int = 4 * 1024 * 1024, ttl: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.version: Optional[Hashable] = None
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[str, Tuple[str, float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _sync_version(self, version: Optional[Hashable]):
+        """تفريغ المدخلات إذا تغيّر إصدار قاعدة المعرفة"""
+        if version != self.version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.bytes = 0
+            self.version = version
+
+    def get(self, message: str, version: Optional[Hashable] = None) -> Optional[str]:
+        key = cache_key(message)
+        with self._lock:
+            self._sync_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires, size = entry
+            if expires <= self.clock():
+                del self._entries[key]
+                self.bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, message: str, value: str, version: Optional[Hashable] = None):
+        key = cache_key(message)
+        size = len(key.encode('utf-8')) + len(value.encode('utf-8')) + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._sync_version(version)
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[2]
+            self._entries[key] = (value, self.clock() + self.ttl, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def get_or_compute(self, message: str, compute: Callable[[str], Tuple[str, bool]],
+                       version: Optional[Hashable] = None) -> Tuple[str, bool]:
+        """
+        الرد من الذاكرة أو من compute، ويُرجع (الرد، هل كان من الذاكرة)
+        compute تُرجع (الرد، قابل للتخزين)؛ الردود المعتمدة على نص الرسالة الحرفي أو الوقت لا تُخزَّن
+        """
+        cached = self.get(message, version)
+        if cached is not None:
+            return cached, True
+        response, cacheable = compute(message)
+        if cacheable:
+            self.put(message, response, version)
+        return response, False
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
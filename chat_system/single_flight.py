@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+دمج الطلبات المتطابقة المتزامنة (single-flight)
+أول طلب لمفتاح ما ينفذ الحساب، وكل طلب يصل بنفس المفتاح قبل انتهائه ينتظر النتيجة نفسها
+بدلاً من تكرار الحساب (أو استدعاء النموذج اللغوي)؛ بعد الانتهاء يُنسى المفتاح
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """النسخة المتزامنة للخيوط (SimpleAIModel وخوادم WSGI)"""
+
+    def __init__(self):
+        self.executions = 0
+        self.coalesced = 0
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """(النتيجة، هل شاركت حساباً جارياً)؛ خطأ الحساب يُرفع لكل المنتظرين"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"executions": self.executions, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+
+class AsyncSingleFlight:
+    """
+    النسخة غير المتزامنة (FastAPI)
+    الحساب يعمل كمهمة مستقلة ينتظرها الجميع عبر shield، فانقطاع الطلب الأول
+    لا يلغي النتيجة على بقية المنتظرين
+    """
+
+    def __init__(self):
+        self.executions = 0
+        self.coalesced = 0
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        task = self._tasks.get(key)
+        shared = task is not None
+        if shared:
+            self.coalesced += 1
+        else:
+            task = self._tasks[key] = asyncio.ensure_future(fn())
+            self.executions += 1
+            task.add_done_callback(lambda finished: self._forget(key, finished))
+        return await asyncio.shield(task), shared
+
+    def _forget(self, key: Hashable, task: asyncio.Future):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # قراءة الخطأ كي لا يُحذَّر منه إذا ألغى كل المنتظرين انتظارهم
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {"executions": self.executions, "coalesced": self.coalesced, "in_flight": len(self._tasks)}
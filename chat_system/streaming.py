@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+بث ردود المحادثة كأحداث Server-Sent Events
+الرد يُقسم إلى مقاطع (كلمة مع ما يليها من مسافات) تُرسل فور توفرها:
+start ثم token لكل مقطع ثم done (أو error)
+المولّد لا ينتج حدثاً إلا حين يسحبه الخادم للإرسال (ضغط عكسي)،
+وانقطاع العميل يُغلق مصدر المقاطع فيتوقف توليد الرد
+"""
+
+import asyncio
+import json
+import re
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, Optional
+
+_FRAGMENT_RE = re.compile(r'\s*\S+\s*')
+
+# عدد المقاطع بين كل فحصين لانقطاع العميل
+DISCONNECT_CHECK_EVERY = 8
+
+
+def sse_event(event: str, data) -> str:
+    """تنسيق حدث SSE؛ البيانات بصيغة JSON كي لا تكسر الأسطر الحدث"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def iter_fragments(text: str) -> Iterator[str]:
+    """تقسيم الرد إلى مقاطع يعيد ضمها النص الأصلي كما هو"""
+    for match in _FRAGMENT_RE.finditer(text):
+        yield match.group()
+
+
+async def aiter_fragments(text: str) -> AsyncIterator[str]:
+    """مقاطع رد جاهز كمولّد غير متزامن (يفسح المجال لحلقة الأحداث بين المقاطع)"""
+    for fragment in iter_fragments(text):
+        yield fragment
+        await asyncio.sleep(0)
+
+
+async def sse_chat_stream(fragments: AsyncIterable[str],
+                          on_complete: Callable[[str], Dict],
+                          is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+                          meta: Optional[Dict] = None) -> AsyncIterator[str]:
+    """
+    أحداث SSE لرد متدفق
+    on_complete(النص الكامل) تُستدعى بعد آخر مقطع وتُرجع بيانات حدث done (مثل رقم المحادثة)؛
+    لا تُستدعى إذا انقطع العميل
+    """
+    yield sse_event("start", meta or {})
+    parts = []
+    try:
+        async for fragment in fragments:
+            parts.append(fragment)
+            yield sse_event("token", fragment)
+            if is_disconnected and len(parts) % DISCONNECT_CHECK_EVERY == 0 and await is_disconnected():
+                return
+        yield sse_event("done", on_complete("".join(parts)))
+    except Exception as e:
+        yield sse_event("error", {"detail": str(e)})
+    finally:
+        # إغلاق المصدر يلغي ما قد يكون قيد التوليد (مثل طلب لمزود نموذج لغوي)
+        close = getattr(fragments, "aclose", None)
+        if close is not None:
+            await close()
+
+
+def sse_chat_stream_sync(fragments: Iterable[str], on_complete: Callable[[str], Dict],
+                         meta: Optional[Dict] = None) -> Iterator[str]:
+    """نسخة متزامنة لخوادم WSGI؛ انقطاع العميل يصل كـ GeneratorExit عند الكتابة التالية"""
+    yield sse_event("start", meta or {})
+    parts = []
+    try:
+        for fragment in fragments:
+            parts.append(fragment)
+            yield sse_event("token", fragment)
+        yield sse_event("done", on_complete("".join(parts)))
+    except Exception as e:
+        yield sse_event("error", {"detail": str(e)})
+    finally:
+        close = getattr(fragments, "close", None)
+        if close is not None:
+            close()
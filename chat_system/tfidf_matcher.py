@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+مطابقة TF-IDF مسبقة الحساب لمقاطع المعرفة (scikit-learn ومصفوفات SciPy المتفرقة)
+تُلاءم TfidfVectorizer مرة واحدة على كل المقاطع، وتُحفظ المصفوفة والمفردات على القرص
+فيُحمَّل الفهرس عند التشغيل دون إعادة حساب
+الاستعلام (أو دفعة استعلامات) يُقيَّم بجداء متفرق واحد مع مصفوفة (الكلمات × المقاطع):
+لا يُلمس إلا المقاطع التي تشارك الاستعلام كلمة واحدة على الأقل
+"""
+
+import json
+import os
+from collections import Counter
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from .arabic import NORMALIZATION_VERSION, normalize_text, stem_text, stem_tokens, tokenize
+
+# عدد الاستعلامات في كل جداء؛ يحد حجم مصفوفة الدرجات الوسيطة في الدفعات الكبيرة
+SCORE_BATCH = 1024
+
+
+class TfidfMatcher:
+    """
+    أوزان TF-IDF للمقاطع (صفوف طولها 1 فالجداء الداخلي تشابه جيب التمام)
+    stemming: نفس تجذيع مخزن المعرفة، sublinear_tf: وزن التكرار 1 + log(tf)
+    الكائن لا يتغير بعد بنائه؛ إعادة الملاءمة تبني كائناً جديداً يحل محله
+    """
+
+    def __init__(self, terms: Sequence[str], idf: np.ndarray, matrix: sparse.csr_matrix, ids: np.ndarray,
+                 stemming: bool = True, sublinear_tf: bool = True):
+        self.terms = list(terms)
+        self.idf = np.asarray(idf, dtype=np.float32)
+        self.matrix = matrix
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.stemming = stemming
+        self.sublinear_tf = sublinear_tf
+        self._lookup = {term: column for column, term in enumerate(self.terms)}
+        # المصفوفة مقلوبة (الكلمات × المقاطع) بصيغة CSR: صف كل كلمة قائمة مقاطعها
+        self._by_term = matrix.T.tocsr()
+
+    def _document_terms(self, text: str) -> List[str]:
+        """كلمات المقطع (النصوص الطويلة لا تُخزَّن في الذاكرة المؤقتة)"""
+        return (stem_text(text) if self.stemming else normalize_text(text)).split()
+
+    def _query_terms(self, text: str) -> Tuple[str, ...]:
+        return stem_tokens(text) if self.stemming else tokenize(text)
+
+    @classmethod
+    def fit(cls, documents: Iterable[Tuple[int, str]], stemming: bool = True, sublinear_tf: bool = True,
+            min_df: int = 1, max_df: float = 1.0) -> 'TfidfMatcher':
+        """ملاءمة على (المعرف، النص) في مرور واحد دون تحميل النصوص كلها في الذاكرة"""
+        ids: List[int] = []
+
+        def texts():
+            for chunk_id, text in documents:
+                ids.append(chunk_id)
+                yield text
+
+        matcher = cls([], np.empty(0), sparse.csr_matrix((0, 0), dtype=np.float32), np.empty(0),
+                      stemming, sublinear_tf)
+        vectorizer = TfidfVectorizer(analyzer=matcher._document_terms, sublinear_tf=sublinear_tf,
+                                     min_df=min_df, max_df=max_df, dtype=np.float32)
+        try:
+            matrix = vectorizer.fit_transform(texts())
+        except ValueError as e:
+            # لا مقاطع أو لا كلمات: فهرس فارغ يُرجع نتائج فارغة
+            if "empty vocabulary" not in str(e):
+                raise
+            return cls([], np.empty(0), sparse.csr_matrix((len(ids), 0), dtype=np.float32), ids,
+                       stemming, sublinear_tf)
+        return cls(vectorizer.get_feature_names_out(), vectorizer.idf_, matrix.tocsr(), ids,
+                   stemming, sublinear_tf)
+
+    def transform(self, texts: Iterable[str]) -> sparse.csr_matrix:
+        """
+        متجهات TF-IDF للاستعلامات بنفس أوزان الملاءمة (مكافئ لـ TfidfVectorizer.transform)
+        دون المرور بالمحلل الكامل لكل استعلام؛ الكلمات خارج المفردات تُهمل
+        """
+        indptr, indices, counts = [0], [], []
+        lookup = self._lookup
+        for text in texts:
+            row = Counter(lookup[term] for term in self._query_terms(text) if term in lookup)
+            indices.extend(row.keys())
+            counts.extend(row.values())
+            indptr.append(len(indices))
+        matrix = sparse.csr_matrix(
+            (np.asarray(counts, dtype=np.float32), np.asarray(indices, dtype=np.int32),
+             np.asarray(indptr, dtype=np.int64)),
+            shape=(len(indptr) - 1, len(self.terms)),
+        )
+        if self.sublinear_tf:
+            np.log(matrix.data, out=matrix.data)
+            matrix.data += 1
+        matrix.data *= self.idf[matrix.indices]
+        return normalize(matrix, copy=False)
+
+    def _top(self, scores: sparse.csr_matrix, k: int) -> List[List[Tuple[int, float]]]:
+        results = []
+        for row in range(scores.shape[0]):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            values = scores.data[start:end]
+            columns = scores.indices[start:end]
+            top = np.argpartition(values, -k)[-k:] if len(values) > k else np.arange(len(values))
+            top = top[np.argsort(-values[top], kind='stable')]
+            results.append([(int(self.ids[columns[i]]), float(values[i])) for i in top if values[i] > 0])
+        return results
+
+    def search_batch(self, texts: Sequence[str], k: int = 5) -> List[List[Tuple[int, float]]]:
+        """أفضل k مقطع (المعرف، الدرجة) لكل نص، بجداء متفرق واحد لكل SCORE_BATCH استعلام"""
+        results: List[List[Tuple[int, float]]] = []
+        if not len(self.ids) or not self.terms:
+            return [[] for _ in texts]
+        for start in range(0, len(texts), SCORE_BATCH):
+            queries = self.transform(texts[start:start + SCORE_BATCH])
+            results.extend(self._top((queries @ self._by_term).tocsr(), k))
+        return results
+
+    def search(self, text: str, k: int = 5) -> List[Tuple[int, float]]:
+        """أفضل k مقطع للنص مرتبة تنازلياً بتشابه جيب التمام"""
+        return self.search_batch([text], k)[0]
+
+    def last_id(self) -> int:
+        return int(self.ids[-1]) if len(self.ids) else 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ---------- الحفظ والتحميل ----------
+
+    def save(self, path: str):
+        """المصفوفة والأوزان والمعرفات في ملف .npz، والمفردات والإعدادات في path + '.json'"""
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            np.savez(f, data=self.matrix.data, indices=self.matrix.indices, indptr=self.matrix.indptr,
+                     shape=np.asarray(self.matrix.shape), idf=self.idf, ids=self.ids)
+        os.replace(temp_path, path)
+        with open(path + '.json.tmp', 'w', encoding='utf-8') as f:
+            json.dump({
+                "normalization": NORMALIZATION_VERSION, "stemming": self.stemming,
+                "sublinear_tf": self.sublinear_tf, "count": len(self.ids), "terms": self.terms,
+            }, f, ensure_ascii=False)
+        os.replace(path + '.json.tmp', path + '.json')
+
+    @classmethod
+    def load(cls, path: str) -> 'TfidfMatcher':
+        """تحميل فهرس محفوظ؛ ValueError إن بُني بقواعد تطبيع أخرى أو كان ناقصاً"""
+        with open(path + '.json', 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta["normalization"] != NORMALIZATION_VERSION:
+            raise ValueError(f"فهرس TF-IDF مبني بإصدار تطبيع {meta['normalization']}")
+        with np.load(path) as arrays:
+            matrix = sparse.csr_matrix((arrays["data"], arrays["indices"], arrays["indptr"]),
+                                       shape=tuple(arrays["shape"]))
+            idf, ids = arrays["idf"], arrays["ids"]
+        if len(ids) != meta["count"] or len(idf) != len(meta["terms"]):
+            raise ValueError("ملفا فهرس TF-IDF غير متطابقين")
+        return cls(meta["terms"], idf, matrix, ids, meta["stemming"], meta["sublinear_tf"])
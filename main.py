@@ -9,11 +9,29 @@ import sys
 import json
 from datetime import datetime
 from shell_system.shell_interface import SmartShell
+from chat_system.conversation_store import ConversationStore
+from chat_system.intents import IntentEngine
+
+# جدول النوايا: (الاسم، الكلمات المفتاحية، الرد) بترتيب الأولوية
+CHAT_INTENTS = [
+    ("greeting", ['مرحبا', 'اهلا', 'السلام'],
+     "مرحباً بك! أنا باسَم المساعد الذكي. كيف يمكنني مساعدتك اليوم؟"),
+    ("programming", ['برمجة', 'كود', 'سكريبت'],
+     "يمكنني مساعدتك في البرمجة! جرب وضع Shell لإنشاء الأكواد تلقائياً."),
+    ("networking", ['شبكة', 'خادم', 'سيرفر'],
+     "لإنشاء خوادم وشبكات، استخدم وضع Shell واختر القوالب الجاهزة."),
+    ("thanks", ['شكرا', 'ممتاز', 'رائع'],
+     "شكراً لك! 😊 أنا هنا دائماً لمساعدتك."),
+    ("name", ['اسمك'],
+     "أنا باسَم - مساعدك الذكي في البرمجة والتطوير!"),
+]
 
 class BassamChatAI:
-    def __init__(self):
+    intent_engine = IntentEngine(CHAT_INTENTS)
+
+    def __init__(self, history_size: int = 1000):
         self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.history = []
+        self.history = ConversationStore(capacity=history_size, max_users=1)
         
     def start_chat_mode(self):
         """بدء وضع المحادثة"""
@@ -35,34 +53,14 @@ class BassamChatAI:
             print(f"🤖 باسَم: {response}")
             
             # حفظ التاريخ
-            self.history.append({
-                'user': user_input,
-                'ai': response,
-                'timestamp': datetime.now().isoformat()
-            })
+            self.history.add(self.session_id, user_input, response)
     
     def process_chat_input(self, user_input):
         """معالجة مدخلات المحادثة"""
-        input_lower = user_input.lower()
-        
-        # ردود ذكية بناء على المحتوى
-        if any(word in input_lower for word in ['مرحبا', 'اهلا', 'السلام']):
-            return "مرحباً بك! أنا باسَم المساعد الذكي. كيف يمكنني مساعدتك اليوم؟"
-        
-        elif any(word in input_lower for word in ['برمجة', 'كود', 'سكريبت']):
-            return "يمكنني مساعدتك في البرمجة! جرب وضع Shell لإنشاء الأكواد تلقائياً."
-        
-        elif any(word in input_lower for word in ['شبكة', 'خادم', 'سيرفر']):
-            return "لإنشاء خوادم وشبكات، استخدم وضع Shell واختر القوالب الجاهزة."
-        
-        elif any(word in input_lower for word in ['شكرا', 'ممتاز', 'رائع']):
-            return "شكراً لك! 😊 أنا هنا دائماً لمساعدتك."
-        
-        elif 'اسمك' in input_lower:
-            return "أنا باسَم - مساعدك الذكي في البرمجة والتطوير!"
-        
-        else:
-            return "أفهم أنك تريد: " + user_input + "\nيمكنني مساعدتك بشكل أفضل في وضع Shell لإنشاء الأكواد والمشاريع!"
+        return self.intent_engine.respond(
+            user_input,
+            lambda text: "أفهم أنك تريد: " + text + "\nيمكنني مساعدتك بشكل أفضل في وضع Shell لإنشاء الأكواد والمشاريع!"
+        )
 
 def main():
     """الدالة الرئيسية للتشغيل"""
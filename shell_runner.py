@@ -12,6 +12,9 @@ import json
 from datetime import datetime
 from pathlib import Path
 
+from shell_system.project_build import build_project, load_manifest
+from shell_system.scaffold import scaffold
+
 class BassamShell:
     def __init__(self):
         self.current_path = os.getcwd()
@@ -145,20 +148,15 @@ class BassamShell:
             }
             
             project_path = os.path.join(self.current_path, project_name)
-            os.makedirs(project_path, exist_ok=True)
             
-            # إنشاء المجلدات
-            for directory in project_structure['directories']:
-                dir_path = os.path.join(project_path, directory)
-                os.makedirs(dir_path, exist_ok=True)
+            # إنشاء المجلدات مرة واحدة ثم كتابة الملفات بالتوازي
+            manifest = scaffold(project_path, project_structure['files'], project_structure['directories'])
+            
+            for directory in manifest['directories']:
                 print(f"{self.colors['blue']}📁 تم إنشاء: {directory}{self.colors['reset']}")
             
-            # إنشاء الملفات
-            for filepath, content in project_structure['files'].items():
-                full_path = os.path.join(project_path, filepath)
-                with open(full_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                print(f"{self.colors['green']}📄 تم إنشاء: {filepath}{self.colors['reset']}")
+            for item in manifest['files']:
+                print(f"{self.colors['green']}📄 تم إنشاء: {item['path']}{self.colors['reset']}")
             
             print(f"{self.colors['cyan']}🚀 تم إنشاء المشروع '{project_name}' بنجاح!{self.colors['reset']}")
             return True
@@ -167,6 +165,22 @@ class BassamShell:
             print(f"{self.colors['red']}❌ فشل إنشاء المشروع: {e}{self.colors['reset']}")
             return False
     
+    def build_manifest(self, manifest):
+        """بناء تزايدي من بيان: لا يُعاد كتابة إلا الملفات التي تغيّر محتواها"""
+        try:
+            result = build_project(manifest, self.current_path)
+        except Exception as e:
+            print(f"{self.colors['red']}❌ فشل البناء: {e}{self.colors['reset']}")
+            return False
+        
+        for path in result['created']:
+            print(f"{self.colors['green']}✅ تم إنشاء الملف: {path}{self.colors['reset']}")
+        for path in result['updated']:
+            print(f"{self.colors['yellow']}🔄 تم تحديث الملف: {path}{self.colors['reset']}")
+        print(f"{self.colors['cyan']}📦 {len(result['created'])} جديد، {len(result['updated'])} محدَّث، "
+              f"{len(result['skipped'])} دون تغيير ({result['seconds'] * 1000:.1f}ms){self.colors['reset']}")
+        return True
+    
     def build_flask_app(self):
         """بناء تطبيق Flask كامل"""
         flask_content = '''#!/usr/bin/env python3
@@ -214,10 +228,6 @@ if __name__ == '__main__':
     print("🚀 تم تشغيل تطبيق Flask على http://localhost:5000")
 '''
         
-        # إنشاء مجلد templates إذا لم يكن موجوداً
-        templates_dir = os.path.join(self.current_path, 'templates')
-        os.makedirs(templates_dir, exist_ok=True)
-        
         # إنشاء template أساسي
         index_html = '''<!DOCTYPE html>
 <html dir="rtl">
@@ -241,9 +251,16 @@ if __name__ == '__main__':
 </body>
 </html>'''
         
-        self.create_file('templates/index.html', index_html)
-        self.create_file('app.py', flask_content)
-        self.create_file('requirements.txt', 'flask==2.3.3\n')
+        manifest = {
+            "name": "flask",
+            "files": [
+                {"path": "templates/index.html", "content": index_html, "raw": True},
+                {"path": "app.py", "content": flask_content, "raw": True},
+                {"path": "requirements.txt", "content": "flask==2.3.3\n", "raw": True},
+            ],
+        }
+        if not self.build_manifest(manifest):
+            return
         
         print(f"{self.colors['cyan']}🚀 تم بناء تطبيق Flask كامل!{self.colors['reset']}")
         print(f"{self.colors['yellow']}💡 تشغيل: python app.py{self.colors['reset']}")
@@ -305,8 +322,15 @@ if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
 '''
         
-        self.create_file('main.py', fastapi_content)
-        self.create_file('requirements.txt', 'fastapi==0.104.1\nuvicorn==0.24.0\npydantic==2.5.0\n')
+        manifest = {
+            "name": "fastapi",
+            "files": [
+                {"path": "main.py", "content": fastapi_content, "raw": True},
+                {"path": "requirements.txt", "content": "fastapi==0.104.1\nuvicorn==0.24.0\npydantic==2.5.0\n", "raw": True},
+            ],
+        }
+        if not self.build_manifest(manifest):
+            return
         
         print(f"{self.colors['cyan']}⚡ تم بناء تطبيق FastAPI كامل!{self.colors['reset']}")
         print(f"{self.colors['yellow']}💡 تشغيل: python main.py{self.colors['reset']}")
@@ -476,11 +500,18 @@ if __name__ == "__main__":
             
             elif main_cmd == 'build':
                 if len(parts) < 2:
-                    print(f"{self.colors['red']}❌ الاستخدام: build <flask|fastapi|django|ai>{self.colors['reset']}")
+                    print(f"{self.colors['red']}❌ الاستخدام: build <flask|fastapi|django|ai|manifest.json>{self.colors['reset']}")
                 elif parts[1] == 'flask':
                     self.build_flask_app()
                 elif parts[1] == 'fastapi':
                     self.build_fastapi_app()
+                elif parts[1].endswith(('.json', '.yml', '.yaml')):
+                    try:
+                        manifest = load_manifest(os.path.join(self.current_path, parts[1]))
+                    except Exception as e:
+                        print(f"{self.colors['red']}❌ فشل قراءة البيان: {e}{self.colors['reset']}")
+                    else:
+                        self.build_manifest(manifest)
                 else:
                     print(f"{self.colors['red']}❌ نوع البناء غير معروف: {parts[1]}{self.colors['reset']}")
             
@@ -2,17 +2,14 @@ import os
 import json
 from typing import Dict, List
 
-class FileBuilder:
-    def __init__(self, base_path: str = "."):
-        self.base_path = base_path
-        self.templates = self.load_templates()
-    
-    def load_templates(self) -> Dict:
-        """تحميل قوالب الملفات الجاهزة"""
-        return {
-            "flask_app": {
-                "filename": "app.py",
-                "content": """
+from .scaffold import scaffold
+from .template_engine import render
+
+# القوالب المدمجة تُبنى مرة واحدة عند استيراد الوحدة وتتشاركها كل النسخ
+BUILTIN_TEMPLATES = {
+    "flask_app": {
+        "filename": "app.py",
+        "content": """
 from flask import Flask, render_template, request, jsonify
 
 app = Flask(__name__)
@@ -37,10 +34,10 @@ def chat_api():
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
 """
-            },
-            "fastapi_app": {
-                "filename": "main.py",
-                "content": """
+    },
+    "fastapi_app": {
+        "filename": "main.py",
+        "content": """
 from fastapi import FastAPI
 from pydantic import BaseModel
 
@@ -70,10 +67,10 @@ if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
 """
-            },
-            "requirements": {
-                "filename": "requirements.txt",
-                "content": """flask==2.3.3
+    },
+    "requirements": {
+        "filename": "requirements.txt",
+        "content": """flask==2.3.3
 fastapi==0.104.1
 uvicorn==0.24.0
 pydantic==2.5.0
@@ -82,10 +79,10 @@ torch==2.1.0
 numpy==1.24.3
 scikit-learn==1.3.0
 """
-            },
-            "config": {
-                "filename": "config.json",
-                "content": """{
+    },
+    "config": {
+        "filename": "config.json",
+        "content": """{
     "api": {
         "host": "0.0.0.0",
         "port": 5000,
@@ -100,41 +97,35 @@ scikit-learn==1.3.0
     }
 }
 """
-            }
-        }
+    }
+}
+
+class FileBuilder:
+    def __init__(self, base_path: str = "."):
+        self.base_path = base_path
+        self.templates = self.load_templates()
+    
+    def load_templates(self) -> Dict:
+        """قوالب الملفات الجاهزة (مشتركة بين كل النسخ)"""
+        return BUILTIN_TEMPLATES
     
-    def create_project_structure(self, project_name: str, structure: Dict) -> Dict:
-        """إنشاء هيكل مشروع كامل"""
+    def create_project_structure(self, project_name: str, structure: Dict, atomic: bool = False) -> Dict:
+        """إنشاء هيكل مشروع كامل (مجلدات فريدة مرة واحدة ثم كتابة متوازية للملفات)"""
         try:
             project_path = os.path.join(self.base_path, project_name)
-            os.makedirs(project_path, exist_ok=True)
+            directories = structure.get("directories", [])
+            files = [(f["name"], f.get("content", "")) for f in structure.get("files", [])]
             
-            results = []
+            manifest = scaffold(project_path, files, directories, atomic=atomic)
             
-            for item_type, items in structure.items():
-                if item_type == "directories":
-                    for directory in items:
-                        dir_path = os.path.join(project_path, directory)
-                        os.makedirs(dir_path, exist_ok=True)
-                        results.append(f"📁 تم إنشاء: {directory}")
-                
-                elif item_type == "files":
-                    for file_info in items:
-                        filename = file_info["name"]
-                        content = file_info.get("content", "")
-                        file_path = os.path.join(project_path, filename)
-                        
-                        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                        
-                        with open(file_path, 'w', encoding='utf-8') as f:
-                            f.write(content)
-                        
-                        results.append(f"📄 تم إنشاء: {filename}")
+            results = [f"📁 تم إنشاء: {directory}" for directory in directories]
+            results += [f"📄 تم إنشاء: {item['path']}" for item in manifest["files"]]
             
             return {
                 "status": "success",
                 "project_path": project_path,
-                "created_items": results
+                "created_items": results,
+                "manifest": manifest
             }
             
         except Exception as e:
@@ -148,11 +139,9 @@ scikit-learn==1.3.0
             
             template = self.templates[template_name]
             filename = template["filename"]
-            content = template["content"]
             
             # تطبيق المتغيرات على المحتوى
-            for key, value in kwargs.items():
-                content = content.replace(f"{{{key}}}", str(value))
+            content, missing = render(template["content"], kwargs)
             
             filepath = os.path.join(self.base_path, filename)
             
@@ -162,7 +151,8 @@ scikit-learn==1.3.0
             return {
                 "status": "success",
                 "message": f"تم إنشاء {filename} من القالب {template_name}",
-                "filepath": filepath
+                "filepath": filepath,
+                "missing_variables": missing
             }
             
         except Exception as e:
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+بيان المشروع والبناء التزايدي
+البيان (JSON أو YAML) يصف المجلدات والملفات؛ البناء يحفظ بصمة المصدر وبصمة المحتوى المُولَّد لكل ملف
+في ملف حالة، فلا يُعاد كتابة إلا ما يختلف محتواه فعلاً عما على القرص
+
+مثال:
+{
+  "name": "my_app",
+  "variables": {"port": 5000},
+  "directories": ["static"],
+  "files": [
+    {"path": "app.py", "template": "flask_app"},
+    {"path": "config.txt", "content": "port={port}"},
+    {"path": "static/app.js", "content": "...", "raw": true}
+  ]
+}
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+from .file_builder import BUILTIN_TEMPLATES
+from .scaffold import scaffold
+from .template_engine import render
+
+STATE_FILE = ".bassam_build.json"
+
+
+def load_manifest(path: str) -> Dict:
+    """قراءة بيان مشروع من ملف JSON أو YAML"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith(('.yml', '.yaml')):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("قراءة بيانات YAML تتطلب تثبيت PyYAML")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def _file_content(entry: Dict) -> str:
+    """المحتوى الخام لملف في البيان (نص مباشر أو قالب مدمج)"""
+    if "content" in entry:
+        return entry["content"]
+    template_name = entry.get("template")
+    if template_name not in BUILTIN_TEMPLATES:
+        raise ValueError(f"القالب {template_name} غير موجود")
+    return BUILTIN_TEMPLATES[template_name]["content"]
+
+
+def _load_state(state_path: str) -> Dict[str, Dict]:
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    # المدخلات بصيغة غير معروفة تُهمل فتُقارن ملفاتها بالقرص
+    return {
+        path: info for path, info in state.items()
+        if isinstance(info, dict) and {"source", "content", "size", "mtime_ns"} <= info.keys()
+    }
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _disk_digest(path: str) -> Optional[str]:
+    try:
+        with open(path, 'rb') as f:
+            return _digest(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def _save_state(state_path: str, state: Dict[str, Dict]):
+    temp_path = state_path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, sort_keys=True)
+    os.replace(temp_path, state_path)
+
+
+def build_project(manifest: Dict, base_path: str = ".", state_file: str = STATE_FILE,
+                  atomic: bool = True) -> Dict:
+    """
+    بناء المشروع من البيان وكتابة الملفات المتغيرة فقط
+    القرار ببصمة المحتوى المُولَّد: يُتخطى الملف إذا طابقت بصمتُه ما على القرص؛ وإذا طابقت بصمةُ المصدر
+    والمتغيرات والحجمُ ووقتُ التعديل ما في ملف الحالة يُتخطى دون تعويض القالب ولا قراءة الملف
+    مدخلات الحالة لملفات لم تعد في البيان تُحذف
+    """
+    start = time.perf_counter()
+    root = os.path.abspath(base_path)
+    state_path = os.path.join(root, state_file)
+    state = _load_state(state_path)
+    variables = manifest.get("variables", {})
+
+    created: List[str] = []
+    updated: List[str] = []
+    skipped: List[str] = []
+    changed = []
+    digests = {}
+    state_changed = False
+    paths = {entry["path"] for entry in manifest.get("files", [])}
+    for path in list(state):
+        if path not in paths:
+            del state[path]
+            state_changed = True
+
+    for entry in manifest.get("files", []):
+        path = entry["path"]
+        full_path = os.path.join(root, path)
+        source = _file_content(entry)
+        entry_variables = {} if entry.get("raw") else {**variables, **entry.get("variables", {})}
+        # بصمة المدخلات (المصدر + المتغيرات) تسمح بالتخطي دون تعويض القالب أصلاً
+        source_digest = hashlib.sha256(
+            (source + "\0" + json.dumps(entry_variables, sort_keys=True, default=str)).encode('utf-8')
+        ).hexdigest()
+
+        try:
+            st = os.stat(full_path)
+        except FileNotFoundError:
+            st = None
+
+        previous = state.get(path)
+        unchanged_on_disk = (st is not None and previous is not None
+                             and previous["size"] == st.st_size and previous["mtime_ns"] == st.st_mtime_ns)
+        if unchanged_on_disk and previous["source"] == source_digest:
+            skipped.append(path)
+            continue
+
+        content = source
+        if not entry.get("raw"):
+            # raw: محتوى حرفي لا يمر بمحرك القوالب (مثل قوالب Jinja أو f-strings)
+            content, _ = render(source, entry_variables)
+        content_digest = _digest(content.encode('utf-8'))
+
+        if st is not None:
+            # الملف على القرص: بصمته من الحالة إن لم يتغير، وإلا من قراءته
+            disk_digest = previous["content"] if unchanged_on_disk else _disk_digest(full_path)
+            if disk_digest == content_digest:
+                skipped.append(path)
+                state[path] = {"source": source_digest, "content": content_digest,
+                               "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+                state_changed = True
+                continue
+
+        (created if st is None else updated).append(path)
+        changed.append((path, content))
+        digests[path] = (source_digest, content_digest)
+
+    directories = manifest.get("directories", [])
+    missing_dirs = [d for d in directories if not os.path.isdir(os.path.join(root, d))]
+
+    if changed or missing_dirs or not os.path.isdir(root):
+        scaffold(root, changed, directories, atomic=atomic)
+        for path, _ in changed:
+            st = os.stat(os.path.join(root, path))
+            source_digest, content_digest = digests[path]
+            state[path] = {"source": source_digest, "content": content_digest,
+                           "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        state_changed = state_changed or bool(changed)
+    if state_changed and os.path.isdir(root):
+        _save_state(state_path, state)
+
+    return {
+        "status": "success",
+        "message": f"تم البناء: {len(created)} جديد، {len(updated)} محدَّث، {len(skipped)} دون تغيير",
+        "project_path": root,
+        "created": created,
+        "updated": updated,
+        "skipped": skipped,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def template_manifest(template_name: str, variables: Optional[Dict] = None) -> Dict:
+    """بيان لملف واحد من القوالب المدمجة في FileBuilder"""
+    template = BUILTIN_TEMPLATES[template_name]
+    return {
+        "name": template_name,
+        "variables": variables or {},
+        "files": [{"path": template["filename"], "template": template_name}],
+    }
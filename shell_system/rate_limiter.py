@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+محدد معدل الطلبات بخوارزمية دلو الرموز (Token Bucket)
+لكل مفتاح دلو بسعة burst يُعاد ملؤه بمعدل rate رمز/ثانية،
+مع حذف دوري للمفاتيح الخاملة وخلفيات تخزين قابلة للاستبدال
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+
+def _refill(tokens: float, updated: float, now: float, rate: float, burst: float) -> float:
+    """عدد الرموز المتاحة بعد إعادة الملء حتى اللحظة now"""
+    return min(burst, tokens + max(0.0, now - updated) * rate)
+
+
+class MemoryBackend:
+    """تخزين الدلاء داخل العملية (الافتراضي)"""
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, now: float, rate: float, burst: float, cost: float = 1.0) -> Tuple[bool, float]:
+        """محاولة سحب cost رمز؛ يُرجع (مسموح، ثوانٍ حتى إعادة المحاولة)"""
+        with self._lock:
+            state = self._buckets.get(key)
+            tokens = burst if state is None else _refill(state[0], state[1], now, rate, burst)
+            if tokens >= cost:
+                self._buckets[key] = (tokens - cost, now)
+                return True, 0.0
+            self._buckets[key] = (tokens, now)
+            return False, (cost - tokens) / rate
+
+    def evict_idle(self, idle_since: float) -> int:
+        """حذف الدلاء التي لم تُستخدم منذ idle_since"""
+        with self._lock:
+            idle = [key for key, (_, updated) in self._buckets.items() if updated < idle_since]
+            for key in idle:
+                del self._buckets[key]
+            return len(idle)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class SQLiteBackend:
+    """تخزين الدلاء في SQLite كي تتشارك عدة عمليات uvicorn نفس الحدود"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets ("
+            " key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS rate_buckets_updated ON rate_buckets(updated)")
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, now: float, rate: float, burst: float, cost: float = 1.0) -> Tuple[bool, float]:
+        """محاولة سحب cost رمز داخل معاملة حصرية بين العمليات"""
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT tokens, updated FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+                tokens = burst if row is None else _refill(row[0], row[1], now, rate, burst)
+                allowed = tokens >= cost
+                if allowed:
+                    tokens -= cost
+                conn.execute(
+                    "INSERT INTO rate_buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                    (key, tokens, now),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return (True, 0.0) if allowed else (False, (cost - tokens) / rate)
+
+    def evict_idle(self, idle_since: float) -> int:
+        """حذف الدلاء التي لم تُستخدم منذ idle_since"""
+        with self._lock:
+            return self._conn.execute("DELETE FROM rate_buckets WHERE updated < ?", (idle_since,)).rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM rate_buckets").fetchone()[0]
+
+
+class TokenBucketLimiter:
+    def __init__(self, rate: float = 1.0, burst: float = 1.0, backend=None,
+                 sweep_interval: float = 60.0, clock: Callable[[], float] = time.time):
+        """
+        rate: عدد الرموز المضافة في الثانية
+        burst: سعة الدلو (أقصى عدد طلبات متتالية)
+        sweep_interval: الفترة بين عمليات حذف المفاتيح الخاملة
+        clock: ساعة الجدار افتراضياً كي تتوافق العمليات المتعددة
+        """
+        if rate <= 0 or burst <= 0:
+            raise ValueError("rate and burst must be positive")
+        self.rate = rate
+        self.burst = burst
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        # الدلو الخامل لهذه المدة يكون ممتلئاً، فحذفه لا يغيّر أي قرار لاحق
+        self.idle_after = burst / rate
+        self._next_sweep = clock() + sweep_interval
+
+    def hit(self, key: str, cost: float = 1.0) -> Tuple[bool, float]:
+        """تسجيل طلب للمفتاح؛ يُرجع (مسموح، ثوانٍ حتى إعادة المحاولة)"""
+        now = self.clock()
+        if now >= self._next_sweep:
+            self.sweep(now)
+        return self.backend.consume(key, now, self.rate, self.burst, cost)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """حذف المفاتيح الخاملة وإرجاع عددها"""
+        now = self.clock() if now is None else now
+        self._next_sweep = now + self.sweep_interval
+        return self.backend.evict_idle(now - self.idle_after)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+محرك إنشاء هياكل المشاريع
+يجمع المجلدات الفريدة وينشئها مرة واحدة، ثم يكتب الملفات عبر مجموعة خيوط،
+مع كتابة ذرّية اختيارية (ملف مؤقت ثم إعادة تسمية) وبيان بزمن كل ملف
+"""
+
+import os
+import stat
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+Files = Union[Dict[str, str], Iterable[Tuple[str, str]]]
+
+
+def _read_umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# تُقرأ مرة عند التحميل: os.umask تغيّرها مؤقتاً فلا تُستدعى من خيوط الكتابة
+_UMASK = _read_umask()
+
+
+def _target_mode(path: str) -> int:
+    """صلاحيات الملف الموجود (مع بت التنفيذ)، أو صلاحيات ملف جديد حسب umask"""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def _resolve(root: str, relative_path: str) -> str:
+    """المسار الكامل داخل جذر المشروع (يرفض الخروج منه)"""
+    full_path = os.path.normpath(os.path.join(root, relative_path))
+    if full_path != root and not full_path.startswith(root + os.sep):
+        raise ValueError(f"المسار خارج المشروع: {relative_path}")
+    return full_path
+
+
+def _leaf_directories(directories: Iterable[str]) -> List[str]:
+    """المجلدات التي ليست أباً لمجلد آخر في المجموعة؛ makedirs ينشئ الآباء معها"""
+    directories = set(directories)
+    parents = set()
+    for directory in directories:
+        parent = os.path.dirname(directory)
+        while parent and parent not in parents:
+            parents.add(parent)
+            parent = os.path.dirname(parent)
+    return sorted(directories - parents)
+
+
+def write_file(path: str, content: str, atomic: bool = False) -> int:
+    """كتابة ملف وإرجاع عدد البايتات؛ الكتابة الذرّية تمر بملف مؤقت في نفس المجلد"""
+    data = content.encode('utf-8')
+    if not atomic:
+        with open(path, 'wb') as f:
+            f.write(data)
+        return len(data)
+
+    directory, name = os.path.split(path)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        # mkstemp ينشئ بـ 0600، وإعادة التسمية تنقلها إلى الملف النهائي
+        os.chmod(temp_path, _target_mode(path))
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    return len(data)
+
+
+def scaffold(root: str, files: Files, directories: Iterable[str] = (),
+             atomic: bool = False, max_workers: Optional[int] = None) -> Dict:
+    """
+    إنشاء مجلدات وملفات مشروع تحت root
+    files: قاموس أو أزواج (المسار النسبي، المحتوى)
+    يُرجع بياناً: المجلدات المطلوبة، والملفات مع حجمها وزمن كتابتها
+    """
+    start = time.perf_counter()
+    root = os.path.abspath(root)
+    items = list(files.items() if isinstance(files, dict) else files)
+    directories = list(directories)
+
+    resolved = [(relative, _resolve(root, relative), content) for relative, content in items]
+    wanted = {root}
+    wanted.update(_resolve(root, directory) for directory in directories)
+    wanted.update(os.path.dirname(full_path) for _, full_path, _ in resolved)
+
+    for directory in _leaf_directories(wanted):
+        os.makedirs(directory, exist_ok=True)
+    dirs_time = time.perf_counter() - start
+
+    def write_batch(batch):
+        written = []
+        for relative, full_path, content in batch:
+            file_start = time.perf_counter()
+            size = write_file(full_path, content, atomic)
+            written.append({"path": relative, "bytes": size, "seconds": time.perf_counter() - file_start})
+        return written
+
+    # دفعة واحدة لكل خيط بدل مهمة لكل ملف، كي لا تطغى كلفة التنسيق على الكتابة
+    workers = max_workers or min(8, (os.cpu_count() or 1) * 2)
+    workers = max(1, min(workers, len(resolved)))
+    if workers == 1:
+        written = write_batch(resolved)
+    else:
+        batches = [resolved[i::workers] for i in range(workers)]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            by_batch = list(pool.map(write_batch, batches))
+        # إعادة ترتيب البيان حسب ترتيب الإدخال
+        written = [None] * len(resolved)
+        for i, batch in enumerate(by_batch):
+            written[i::workers] = batch
+
+    return {
+        "status": "success",
+        "project_path": root,
+        "directories": directories,
+        "files": written,
+        "directories_seconds": dirs_time,
+        "total_seconds": time.perf_counter() - start,
+    }
@@ -10,6 +10,8 @@ import re
 from typing import Dict, List, Any
 from datetime import datetime
 
+from .template_registry import get_registry
+
 class ScriptGenerator:
     def __init__(self, templates_dir: str = "templates"):
         self.templates_dir = templates_dir
@@ -27,7 +29,6 @@ class ScriptGenerator:
         templates = {
             "web_scraper.py": """
 #!/usr/bin/env python3
-"""
 import requests
 from bs4 import BeautifulSoup
 import csv
@@ -91,7 +92,6 @@ if __name__ == "__main__":
             
             "data_analyzer.py": """
 #!/usr/bin/env python3
-"""
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -181,7 +181,6 @@ if __name__ == "__main__":
             
             "api_server.py": """
 #!/usr/bin/env python3
-"""
 from flask import Flask, request, jsonify
 from datetime import datetime
 import sqlite3
@@ -290,13 +289,8 @@ if __name__ == '__main__':
                 f.write(content)
     
     def load_templates(self):
-        """تحميل القوالب من الملفات"""
-        self.templates = {}
-        if os.path.exists(self.templates_dir):
-            for filename in os.listdir(self.templates_dir):
-                if filename.endswith('.py'):
-                    with open(os.path.join(self.templates_dir, filename), 'r', encoding='utf-8') as f:
-                        self.templates[filename] = f.read()
+        """ربط السجل المشترك للقوالب (يُقرأ محتوى القالب عند أول استخدام فقط)"""
+        self.templates = get_registry(self.templates_dir)
     
     def detect_script_type(self, description: str) -> str:
         """كشف نوع السكربت المطلوب من الوصف"""
@@ -394,11 +388,8 @@ if __name__ == "__main__":
                     'message': f'القالب {template_name} غير موجود'
                 }
             
-            script_content = self.templates[template_file]
-            
-            # تطبيق المتغيرات على القالب
-            for key, value in kwargs.items():
-                script_content = script_content.replace(f'{{{key}}}', str(value))
+            # تطبيق المتغيرات على القالب (تحليل واحد مخزّن وتعويض بعملية واحدة)
+            script_content, missing = self.templates.compiled(template_file).render(kwargs)
             
             if not output_file:
                 output_file = f"{template_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.py"
@@ -410,7 +401,8 @@ if __name__ == "__main__":
                 'status': 'success',
                 'message': f'تم إنشاء السكربت من القالب: {output_file}',
                 'file_path': output_file,
-                'template_used': template_name
+                'template_used': template_name,
+                'missing_variables': missing
             }
             
         except Exception as e:
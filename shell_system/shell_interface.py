@@ -4,6 +4,7 @@ import readline
 from typing import List, Dict
 from .command_executor import CommandExecutor
 from .file_builder import FileBuilder
+from .project_build import build_project, load_manifest, template_manifest
 
 class SmartShell:
     def __init__(self, base_path: str = "."):
@@ -15,7 +16,7 @@ class SmartShell:
         # أوامر مساعدة
         self.help_commands = {
             "create": "إنشاء ملف أو مجلد - الاستخدام: create <type> <name> [content]",
-            "build": "بناء مشروع من قالب - الاستخدام: build <template>",
+            "build": "بناء مشروع من قالب أو بيان - الاستخدام: build <template|manifest.json>",
             "run": "تشغيل سكربت - الاستخدام: run <script_path>",
             "install": "تثبيت حزمة - الاستخدام: install <package>",
             "list": "عرض الملفات - الاستخدام: list [path]",
@@ -104,22 +105,28 @@ class SmartShell:
             return {"status": "error", "message": "نوع الإنشاء غير معروف"}
     
     def handle_build(self, args: List[str]) -> Dict:
-        """معالجة أوامر البناء من القوالب"""
+        """معالجة أوامر البناء من القوالب أو من ملف بيان (بناء تزايدي)"""
         if not args:
-            return {"status": "error", "message": "الاستخدام: build <template> [params...]"}
+            return {"status": "error", "message": "الاستخدام: build <template|manifest.json> [params...]"}
         
-        template_name = args[0].lower()
+        target = args[0]
+        templates = {
+            "flask": "flask_app",
+            "fastapi": "fastapi_app",
+            "requirements": "requirements",
+            "config": "config",
+        }
         
-        if template_name == "flask":
-            return self.builder.create_from_template("flask_app")
-        elif template_name == "fastapi":
-            return self.builder.create_from_template("fastapi_app")
-        elif template_name == "requirements":
-            return self.builder.create_from_template("requirements")
-        elif template_name == "config":
-            return self.builder.create_from_template("config")
-        else:
-            return {"status": "error", "message": f"القالب {template_name} غير معروف"}
+        try:
+            if target.endswith(('.json', '.yml', '.yaml')):
+                manifest = load_manifest(os.path.join(self.base_path, target))
+            elif target.lower() in templates:
+                manifest = template_manifest(templates[target.lower()])
+            else:
+                return {"status": "error", "message": f"القالب {target} غير معروف"}
+            return build_project(manifest, self.base_path)
+        except Exception as e:
+            return {"status": "error", "message": f"فشل البناء: {str(e)}"}
     
     def show_help(self) -> Dict:
         """عرض المساعدة"""
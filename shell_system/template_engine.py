@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+محرك القوالب
+يُحلَّل القالب مرة واحدة إلى مقاطع نصية ومتغيرات، ويتم التعويض بعملية join واحدة
+
+الصيغة:
+  {name}          متغير
+  {name|default}  متغير بقيمة افتراضية تُطبق إن لم تُمرر قيمته
+  \\{name}         نص حرفي "{name}" بدون تعويض (للأسماء المعلنة في declared أو الممررة)
+ما عدا ذلك يبقى حرفياً كما هو: أقواس Jinja المزدوجة {{ }}، والشرطة المائلة قبل اسم
+غير معلن (C:\\{dir})
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+COMPILED_CACHE_SIZE = 64
+
+# القوس الملاصق لقوس آخر جزء من {{ }} فلا يُعد متغيراً
+_PLACEHOLDER_RE = re.compile(r'(\\)?(?<!\{)\{([A-Za-z_]\w*)(?:\|([^{}\n]*))?\}(?!\})')
+
+
+class MissingVariablesError(ValueError):
+    def __init__(self, missing: List[str]):
+        super().__init__("متغيرات مفقودة: " + ", ".join(missing))
+        self.missing = missing
+
+
+class CompiledTemplate:
+    __slots__ = ('parts', 'slots', 'variables')
+
+    def __init__(self, text: str):
+        # parts: مقاطع النص، وخانات المتغيرات فيها تُملأ عند التعويض
+        # slots: (موضع الخانة، الاسم، القيمة الافتراضية، النص الأصلي، مُهرَّب)
+        self.parts: List[str] = []
+        self.slots: List[Tuple[int, str, Optional[str], str, bool]] = []
+
+        position = 0
+        for found in _PLACEHOLDER_RE.finditer(text):
+            escaped, name, default = found.groups()
+            self.parts.append(text[position:found.start()])
+            self.slots.append((len(self.parts), name, default, found.group(0), bool(escaped)))
+            self.parts.append('')
+            position = found.end()
+        self.parts.append(text[position:])
+
+        self.variables = sorted({name for _, name, _, _, escaped in self.slots if not escaped})
+
+    def render(self, variables: Dict[str, Any], strict: bool = False,
+               declared: Iterable[str] = ()) -> Tuple[str, List[str]]:
+        """
+        تعويض المتغيرات وإرجاع (النص، المتغيرات المفقودة)
+        القيمة الافتراضية ({name|default}) تُطبق متى لم تُمرر قيمة المتغير
+        declared: أسماء متغيرات القالب التي يُطبق تهريبها (\\{name}) وإن لم تُمرر قيمها
+        المتغير المفقود بلا قيمة افتراضية يبقى كما هو، أو يرفع خطأ في الوضع الصارم
+        """
+        parts = self.parts.copy()
+        missing = []
+        declared = set(declared)
+        for index, name, default, raw, escaped in self.slots:
+            if escaped:
+                parts[index] = raw[1:] if name in variables or name in declared else raw
+            elif name in variables:
+                parts[index] = str(variables[name])
+            elif default is not None:
+                parts[index] = default
+            else:
+                parts[index] = raw
+                if name not in missing:
+                    missing.append(name)
+
+        if strict and missing:
+            raise MissingVariablesError(missing)
+        return ''.join(parts), missing
+
+
+@lru_cache(maxsize=COMPILED_CACHE_SIZE)
+def compile_template(text: str) -> CompiledTemplate:
+    """تحليل القالب (مع ذاكرة مؤقتة حسب النص)"""
+    return CompiledTemplate(text)
+
+
+def render(text: str, variables: Dict[str, Any], strict: bool = False,
+           declared: Iterable[str] = ()) -> Tuple[str, List[str]]:
+    """تحليل القالب (من الذاكرة المؤقتة) ثم تعويض المتغيرات"""
+    return compile_template(text).render(variables, strict, declared)
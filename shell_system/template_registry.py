@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+سجل القوالب المشترك
+يفهرس البيانات الوصفية فقط عند البدء، ويقرأ محتوى القالب عند أول طلب،
+ويحفظه في ذاكرة LRU مفتاحها (المسار، وقت التعديل) فيُعاد تحميل القالب المعدّل تلقائياً
+"""
+
+import os
+import threading
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .template_engine import CompiledTemplate
+
+TEMPLATE_CACHE_SIZE = 128
+
+
+class TemplateInfo:
+    __slots__ = ('name', 'path', 'size', 'mtime_ns')
+
+    def __init__(self, name: str, path: str, size: int, mtime_ns: int):
+        self.name = name
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _read_template(path: str, mtime_ns: int) -> str:
+    """قراءة محتوى القالب؛ وقت التعديل جزء من مفتاح الذاكرة المؤقتة"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _compile_template(path: str, mtime_ns: int) -> CompiledTemplate:
+    """تحليل القالب مرة واحدة لكل نسخة منه على القرص"""
+    return CompiledTemplate(_read_template(path, mtime_ns))
+
+
+class TemplateRegistry(Mapping):
+    """اسم الملف -> محتوى القالب، مع تحميل كسول"""
+
+    def __init__(self, templates_dir: str, suffix: str = '.py'):
+        self.templates_dir = templates_dir
+        self.suffix = suffix
+        self._index: Dict[str, TemplateInfo] = {}
+        self._dir_mtime_ns: Optional[int] = None
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self):
+        """إعادة فهرسة البيانات الوصفية للقوالب (بدون قراءة المحتوى)"""
+        with self._lock:
+            index = {}
+            try:
+                self._dir_mtime_ns = os.stat(self.templates_dir).st_mtime_ns
+                with os.scandir(self.templates_dir) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(self.suffix) and entry.is_file():
+                            st = entry.stat()
+                            index[entry.name] = TemplateInfo(entry.name, entry.path, st.st_size, st.st_mtime_ns)
+            except FileNotFoundError:
+                self._dir_mtime_ns = None
+            self._index = index
+
+    def _current_index(self) -> Dict[str, TemplateInfo]:
+        """إعادة الفهرسة فقط إذا أُضيفت أو حُذفت ملفات من المجلد"""
+        try:
+            dir_mtime_ns = os.stat(self.templates_dir).st_mtime_ns
+        except FileNotFoundError:
+            dir_mtime_ns = None
+        if dir_mtime_ns != self._dir_mtime_ns:
+            self.refresh()
+        return self._index
+
+    def info(self, name: str) -> TemplateInfo:
+        """البيانات الوصفية لقالب"""
+        return self._current_index()[name]
+
+    def _fresh_info(self, name: str) -> TemplateInfo:
+        """البيانات الوصفية بعد التحقق من وقت التعديل الحالي للملف"""
+        info = self.info(name)
+        try:
+            info.mtime_ns = os.stat(info.path).st_mtime_ns
+        except FileNotFoundError:
+            self.refresh()
+            raise KeyError(name)
+        return info
+
+    def __getitem__(self, name: str) -> str:
+        info = self._fresh_info(name)
+        return _read_template(info.path, info.mtime_ns)
+
+    def compiled(self, name: str) -> CompiledTemplate:
+        """القالب محللاً وجاهزاً للتعويض"""
+        info = self._fresh_info(name)
+        return _compile_template(info.path, info.mtime_ns)
+
+    def __contains__(self, name) -> bool:
+        return name in self._current_index()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._current_index()))
+
+    def __len__(self) -> int:
+        return len(self._current_index())
+
+    def names(self) -> List[str]:
+        """أسماء القوالب المتاحة"""
+        return list(self)
+
+
+_registries: Dict[Tuple[str, str], TemplateRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(templates_dir: str, suffix: str = '.py') -> TemplateRegistry:
+    """السجل المشترك لمجلد قوالب (نسخة واحدة لكل مجلد في العملية)"""
+    key = (os.path.abspath(templates_dir), suffix)
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = _registries[key] = TemplateRegistry(templates_dir, suffix)
+        return registry
@@ -1,21 +1,92 @@
 #!/usr/bin/env python3
 """
 نموذج الذكاء الاصطناعي البسيط
-نسخة حقيقية - لا تتطلب مكتبات خارجية
+نسخة حقيقية تعمل محلياً دون اتصال؛ الاسترجاع يتطلب numpy وscipy وscikit-learn
+(فهرس المتجهات ومطابقة TF-IDF) إضافة إلى SQLite لمخزن المعرفة
 """
 
-import json
-import re
-from datetime import datetime
+import os
+import sys
+import time
+from itertools import chain
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chat_system.arabic import tokenize
+from chat_system.conversation_store import ConversationStore
+from chat_system.embedding_index import EmbeddingIndex, HashingEmbedder
+from chat_system.hybrid_retriever import HybridRetriever
+from chat_system.intents import IntentEngine
+from chat_system.ivf_index import IVFIndex
+from chat_system.knowledge_store import KnowledgeStore
+from chat_system.latency import LatencyStats
+from chat_system.response_cache import ResponseCache
+from chat_system.single_flight import SingleFlight
+from chat_system.tfidf_matcher import TfidfMatcher
+
+# نوايا احتياطية عند غياب تطابق في قاعدة المعرفة (كلمات كاملة)
+FALLBACK_INTENTS = [
+    ("programming", ['كود', 'برمجة', 'سكريبت'],
+     "يمكنني مساعدتك في البرمجة! ما نوع الكود الذي تريده؟"),
+    ("networking", ['شبكة', 'خادم', 'اتصال'],
+     "أفهم أنك مهتم بالشبكات. أي بروتوكول تريد التعلم عنه؟"),
+    ("ai", ['ذكاء', 'تعلم', 'نموذج'],
+     "الذكاء الاصطناعي مجال رائع! أي تقنية تريد معرفة المزيد عنها؟"),
+]
+
+def create_vector_index(kind, dim, path=None):
+    """
+    فهرس المتجهات حسب النوع: exact (مسح كامل، يُحفظ في path) أو ivf / ivf-sq8 / ivf-pq
+    (تقريبي للمجموعات الكبيرة، في الذاكرة ويُعاد بناؤه من مخزن المعرفة عند التشغيل)
+    """
+    if kind in (None, 'exact'):
+        return EmbeddingIndex(dim, path)
+    quantizers = {'ivf': None, 'ivf-sq8': 'sq8', 'ivf-pq': 'pq'}
+    if kind not in quantizers:
+        raise ValueError(f"نوع فهرس المتجهات غير معروف: {kind}")
+    return IVFIndex(dim, quantizer=quantizers[kind])
 
 class SimpleAIModel:
-    def __init__(self):
+    intent_engine = IntentEngine(FALLBACK_INTENTS, whole_words=True)
+
+    def __init__(self, context_size=10, knowledge_db=None, top_k=3, vector_index=None, min_similarity=0.3,
+                 index_type=None, tfidf_index=None):
+        # مقاطع المعرفة المدمجة والمتعلمة من ملفات ZIP (في الذاكرة ما لم يُحدد ملف)
+        self.store = KnowledgeStore(knowledge_db or os.environ.get("KNOWLEDGE_DB", ":memory:"))
+        self.top_k = top_k
+        # فهرس المتجهات: مصدر استرجاع ثانٍ يلتقط الصيغ القريبة التي لا يطابقها البحث النصي
+        self.embedder = HashingEmbedder()
+        self.vectors = create_vector_index(
+            index_type or os.environ.get("VECTOR_INDEX_TYPE", "exact"),
+            self.embedder.dim,
+            vector_index or os.environ.get("VECTOR_INDEX"),
+        )
+        self.min_similarity = min_similarity
         self.knowledge_base = self.load_knowledge()
-        self.conversation_context = []
+        self.sync_vectors()
+        # مطابقة TF-IDF مسبقة الحساب (تُحمَّل من TFIDF_INDEX إن كان محفوظاً ومطابقاً للمخزن)
+        self.tfidf_path = tfidf_index or os.environ.get("TFIDF_INDEX")
+        self.tfidf = None
+        self.sync_tfidf()
+        # وضع Auto: المصادر معاً بالتوازي، مدموجة بـ RRF
+        self.retriever = HybridRetriever(
+            {"lexical": self.find_best_match, "tfidf": self.tfidf_search, "vector": self.vector_search},
+            batch_sources={"tfidf": self.match_batch, "vector": self.vector_search_batch},
+        )
+        self.latency = LatencyStats()
+        self.last_timings = {}
+        self.last_batch_timings = {}
+        self.cache = ResponseCache(
+            max_bytes=int(os.environ.get("RESPONSE_CACHE_BYTES", 4 * 1024 * 1024)),
+            ttl=float(os.environ.get("RESPONSE_CACHE_TTL", 300)),
+        )
+        # الرسائل المتطابقة المتزامنة (من عدة خيوط) تشترك في حساب واحد
+        self.flight = SingleFlight()
+        self.conversation_context = ConversationStore(capacity=context_size, max_users=1)
         
     def load_knowledge(self):
-        """تحميل قاعدة المعرفة"""
-        return {
+        """تحميل قاعدة المعرفة وفهرستها في مخزن البحث (مرة واحدة لكل قاعدة بيانات)"""
+        knowledge = {
             "البرمجة": {
                 "python": "لغة Python ممتازة للذكاء الاصطناعي وتحليل البيانات",
                 "javascript": "JavaScript أساسية لتطوير الويب والتطبيقات التفاعلية",
@@ -32,65 +103,228 @@ class SimpleAIModel:
                 "nlp": "معالجة اللغة الطبيعية تفهم وتولد النص البشري"
             }
         }
+        if not self.store.has_archive('builtin'):
+            self.store.add_documents('builtin', (
+                (f"{category}/{topic}", content, f"{category} {topic}")
+                for category, topics in knowledge.items()
+                for topic, content in topics.items()
+            ))
+        return knowledge
+    
+    def sync_vectors(self):
+        """
+        تضمين المقاطع التي لم تدخل فهرس المتجهات بعد
+        الفهرس المحفوظ (VECTOR_INDEX) يُبنى من جديد إن لم تكن مقاطعه بداية مقاطع المخزن الحالي
+        (مخزن في الذاكرة أو قاعدة أُعيد إنشاؤها)، كما يُعاد بناء TF-IDF في sync_tfidf
+        """
+        if len(self.vectors) and not self._vectors_match_store():
+            print("⚠️ فهرس المتجهات المحفوظ لا يطابق مخزن المعرفة، سيُعاد بناؤه")
+            self.vectors.reset()
+        for batch in self.store.iter_chunks(self.vectors.last_id()):
+            self.vectors.add([chunk_id for chunk_id, _ in batch],
+                             self.embedder.embed(content for _, content in batch))
+    
+    def _vectors_match_store(self):
+        """معرفات الفهرس متصاعدة وفريدة: يطابق المخزن إن كان فيه بالضبط نفس العدد حتى آخر معرف مفهرس"""
+        last_id = self.vectors.last_id()
+        return (last_id <= self.store.last_chunk_id()
+                and self.store.chunk_count(up_to=last_id) == len(self.vectors))
+    
+    def sync_tfidf(self):
+        """
+        ملاءمة TF-IDF على كل المقاطع عند تغيرها (أوزان IDF تتغير مع كل إضافة فلا تُضاف المقاطع تدريجياً)،
+        أو تحميلها من الملف المحفوظ إن كان مبنياً على نفس المقاطع
+        """
+        last_id = self.store.last_chunk_id()
+        if self.tfidf is None and self.tfidf_path and os.path.exists(self.tfidf_path):
+            try:
+                saved = TfidfMatcher.load(self.tfidf_path)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ تعذر تحميل فهرس TF-IDF، ستُعاد ملاءمته: {e}")
+            else:
+                if saved.last_id() == last_id and saved.stemming == self.store.stemming:
+                    self.tfidf = saved
+        if self.tfidf is not None and self.tfidf.last_id() == last_id:
+            return
+        matcher = TfidfMatcher.fit(chain.from_iterable(self.store.iter_chunks()), stemming=self.store.stemming)
+        if self.tfidf_path:
+            matcher.save(self.tfidf_path)
+        self.tfidf = matcher
+    
+    def learn_from_zip(self, source):
+        """التعلم من أرشيف ZIP: تُقرأ ملفاته النصية وتُخزن مقاطعها دون فك على القرص"""
+        result = self.store.ingest_zip(source)
+        self.sync_vectors()
+        self.sync_tfidf()
+        return result
     
     def preprocess_text(self, text):
-        """معالجة النص المدخل"""
-        # إزالة علامات الترقيم وتحويل للحروف الصغيرة
-        text = re.sub(r'[^\w\s]', '', text.lower())
-        return text
-    
-    def find_best_match(self, processed_text):
-        """إيجاد أفضل تطابق في قاعدة المعرفة"""
-        best_category = None
-        best_topic = None
-        max_matches = 0
+        """معالجة النص المدخل: كلمات مطبَّعة (بلا ترقيم ولا تشكيل ولا تطويل، حروف موحدة)"""
+        return " ".join(tokenize(text))
+    
+    def find_best_match(self, processed_text, k=None):
+        """أفضل المقاطع المطابقة من مخزن المعرفة (FTS5 بترتيب BM25)"""
+        return self.store.search(processed_text, k or self.top_k)
+    
+    def tfidf_search(self, text, k=None):
+        """أفضل المقاطع بتشابه جيب التمام بين متجهات TF-IDF"""
+        return self.match_batch([text], k)[0]
+    
+    def match_batch(self, texts, k=None):
+        """
+        أفضل المقاطع لكل نص في دفعة (للتقييم دون اتصال): جداء متفرق واحد للدفعة
+        واستعلام واحد لجلب المقاطع من المخزن
+        """
+        ranked = self.tfidf.search_batch(list(texts), k or self.top_k)
+        chunks = self.store.get_chunks({chunk_id for results in ranked for chunk_id, _ in results})
+        return [
+            [{**chunks[chunk_id], "score": score} for chunk_id, score in results if chunk_id in chunks]
+            for results in ranked
+        ]
+    
+    def vector_search(self, text, k=None):
+        """أقرب المقاطع للنص بتشابه جيب التمام بين المتجهات"""
+        return self.vector_search_batch([text], k)[0]
+    
+    def vector_search_batch(self, texts, k=None):
+        """أقرب المقاطع لكل نص: تضمين الدفعة وجداء مصفوفات واحد ثم استعلام واحد للمقاطع"""
+        ids, scores = self.vectors.search(self.embedder.embed(texts), k or self.top_k)
+        chunks = self.store.get_chunks(set(ids.ravel().tolist()))
+        return [
+            [
+                {**chunks[chunk_id], "score": float(score)}
+                for chunk_id, score in zip(row_ids.tolist(), row_scores)
+                if chunk_id in chunks and score >= self.min_similarity
+            ]
+            for row_ids, row_scores in zip(ids, scores)
+        ]
+    
+    def _compute_response(self, user_input, timings):
+        """الرد من قاعدة المعرفة أو النوايا؛ يُرجع (الرد، قابل للتخزين المؤقت)"""
+        return self._answer(user_input, timings)[:2]
+    
+    def _answer(self, user_input, timings):
+        """(الرد، قابل للتخزين المؤقت، التصنيف: اسم المقطع المطابق أو اسم النية أو None للرد الافتراضي)"""
+        start = time.perf_counter()
+        processed_input = self.preprocess_text(user_input)
+        timings["preprocess"] = time.perf_counter() - start
+        
+        # البحث في قاعدة المعرفة: نصي ومتجهي معاً
+        matches, retrieval_timings = self.retriever.retrieve(processed_input, self.top_k)
+        timings.update(retrieval_timings)
         
-        for category, topics in self.knowledge_base.items():
-            for topic, content in topics.items():
-                # البحث عن كلمات مفتاحية
-                matches = sum(1 for word in processed_text.split() 
-                            if word in content.lower() or word in topic.lower())
-                
-                if matches > max_matches:
-                    max_matches = matches
-                    best_category = category
-                    best_topic = topic
+        if matches:
+            return matches[0]["content"], True, matches[0]["name"]
         
-        return best_category, best_topic
+        # رد افتراضي مع تحليل بسيط (الافتراضي يكرر نص المستخدم فلا يُخزَّن)
+        intent_start = time.perf_counter()
+        label, response, cacheable = self._resolve_intent(user_input, processed_input)
+        timings["intent"] = time.perf_counter() - intent_start
+        return response, cacheable, label
+    
+    def _resolve_intent(self, user_input, processed_input):
+        """(اسم النية أو None، الرد، قابل للتخزين المؤقت)"""
+        return self.intent_engine.classify(
+            processed_input,
+            lambda text: "أفهم أنك تقول: " + user_input + ". يمكنني مساعدتك في البرمجة والشبكات والذكاء الاصطناعي."
+        )
     
     def generate_response(self, user_input):
-        """توليد رد ذكي"""
-        processed_input = self.preprocess_text(user_input)
+        """توليد رد ذكي (أزمنة المراحل في last_timings وتراكمياً في latency)"""
+        start = time.perf_counter()
+        timings = {}
         
-        # البحث في قاعدة المعرفة
-        category, topic = self.find_best_match(processed_input)
+        # الرسائل المتكررة (تحيات وأسئلة شائعة) تُخدم من الذاكرة المؤقتة دون استرجاع،
+        # والمتطابقة حرفياً الجارية في اللحظة نفسها تنتظر حساباً واحداً (لا بالمفتاح المطبَّع:
+        # الرد الافتراضي يكرر نص الرسالة فلا يُشارك بين صيغتين مختلفتين)
+        response, _ = self.flight.do(
+            user_input,
+            lambda: self.cache.get_or_compute(
+                user_input,
+                lambda message: self._compute_response(message, timings),
+                version=self.store.version,
+            )[0],
+        )
         
-        if category and topic:
-            response = self.knowledge_base[category][topic]
-        else:
-            # رد افتراضي مع تحليل بسيط
-            words = processed_input.split()
-            if any(word in words for word in ['كود', 'برمجة', 'سكريبت']):
-                response = "يمكنني مساعدتك في البرمجة! ما نوع الكود الذي تريده؟"
-            elif any(word in words for word in ['شبكة', 'خادم', 'اتصال']):
-                response = "أفهم أنك مهتم بالشبكات. أي بروتوكول تريد التعلم عنه؟"
-            elif any(word in words for word in ['ذكاء', 'تعلم', 'نموذج']):
-                response = "الذكاء الاصطناعي مجال رائع! أي تقنية تريد معرفة المزيد عنها؟"
-            else:
-                response = "أفهم أنك تقول: " + user_input + ". يمكنني مساعدتك في البرمجة والشبكات والذكاء الاصطناعي."
+        # حفظ السياق (الحلقة تزيح الأقدم تلقائياً)
+        self.conversation_context.add('local', user_input, response)
         
-        # حفظ السياق
-        self.conversation_context.append({
-            'user': user_input,
-            'ai': response,
-            'time': datetime.now().isoformat()
-        })
+        timings["total"] = time.perf_counter() - start
+        self.last_timings = timings
+        self.latency.record(timings)
+        return response
+    
+    def classify(self, user_input):
+        """
+        (التصنيف، الرد) دون ذاكرة مؤقتة ولا سياق، للتقييم على بيانات معلَّمة:
+        التصنيف اسم المقطع المطابق ("الشبكات/dns" أو مسار الملف في الأرشيف) أو اسم النية أو None
+        """
+        response, _, label = self._answer(user_input, {})
+        return label, response
+    
+    def generate_responses(self, messages):
+        """
+        ردود دفعة رسائل بترتيب المدخلات (لإعادة تشغيل الرسائل التاريخية في التحليلات):
+        {"status": "success", "response": ...} أو {"status": "error", "message": ...} لكل رسالة
+        المكرر يُحسب مرة، والمخزَّن يُخدم من الذاكرة المؤقتة، والباقي يُسترجع له دفعة واحدة
+        (جداء متفرق واحد لـ TF-IDF وجداء مصفوفات واحد للمتجهات)؛ الدفعة لا تدخل سياق المحادثة
+        """
+        version = self.store.version
+        results = [None] * len(messages)
+        pending = {}
+        for i, message in enumerate(messages):
+            if not isinstance(message, str) or not message.strip():
+                results[i] = {"status": "error", "message": "الرسالة يجب أن تكون نصاً غير فارغ"}
+                continue
+            cached = self.cache.get(message, version)
+            if cached is not None:
+                results[i] = {"status": "success", "response": cached}
+            else:
+                pending.setdefault(message, []).append(i)
         
-        # الحفاظ على حجم معقول للسياق
-        if len(self.conversation_context) > 10:
-            self.conversation_context.pop(0)
+        if pending:
+            for (message, indices), result in zip(pending.items(), self._compute_responses(list(pending), version)):
+                for i in indices:
+                    results[i] = result
+        return results
+    
+    def _compute_responses(self, messages, version):
+        """نتيجة كل رسالة من الاسترجاع المجمَّع؛ عند فشله تُحسب كل رسالة وحدها فيقتصر الخطأ على صاحبها"""
+        start = time.perf_counter()
+        try:
+            processed = [self.preprocess_text(message) for message in messages]
+            timings = {"preprocess": time.perf_counter() - start}
+            matches, retrieval_timings = self.retriever.retrieve_batch(processed, self.top_k)
+            timings.update(retrieval_timings)
+        except Exception:
+            return [self._compute_one(message, version) for message in messages]
         
-        return response
+        results = []
+        intent_start = time.perf_counter()
+        for message, processed_input, found in zip(messages, processed, matches):
+            try:
+                if found:
+                    response, cacheable = found[0]["content"], True
+                else:
+                    _, response, cacheable = self._resolve_intent(message, processed_input)
+                if cacheable:
+                    self.cache.put(message, response, version)
+                results.append({"status": "success", "response": response})
+            except Exception as e:
+                results.append({"status": "error", "message": str(e)})
+        timings["intent"] = time.perf_counter() - intent_start
+        timings["total"] = time.perf_counter() - start
+        self.last_batch_timings = timings
+        return results
+    
+    def _compute_one(self, message, version):
+        try:
+            response, _ = self.cache.get_or_compute(
+                message, lambda text: self._compute_response(text, {}), version=version
+            )
+            return {"status": "success", "response": response}
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
     
     def get_conversation_summary(self):
         """الحصول على ملخص المحادثة"""
@@ -98,12 +332,12 @@ class SimpleAIModel:
             return "لا توجد محادثات سابقة"
         
         topics = []
-        for conv in self.conversation_context[-5:]:  # آخر 5 محادثات
-            if 'برمجة' in conv['user']:
+        for conv in self.conversation_context.last('local', 5):  # آخر 5 محادثات
+            if 'برمجة' in conv.user:
                 topics.append('البرمجة')
-            elif 'شبكة' in conv['user']:
+            elif 'شبكة' in conv.user:
                 topics.append('الشبكات')
-            elif 'ذكاء' in conv['user']:
+            elif 'ذكاء' in conv.user:
                 topics.append('الذكاء الاصطناعي')
         
         unique_topics = list(set(topics))
@@ -8,6 +8,10 @@ import os
 import subprocess
 import sys
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shell_system.project_build import build_project
+
 class DjangoProjectCreator:
     def __init__(self, project_name: str):
         self.project_name = project_name
@@ -205,3 +209,21 @@ ALLOWED_HOSTS=localhost,127.0.0.1
 pip install -r requirements/base.txt
 python manage.py migrate
 python manage.py runserver
+```
+"""
+
+    def manifest(self):
+        """بيان المشروع للبناء التزايدي (المحتوى مولَّد مسبقاً فلا يمر بمحرك القوالب)"""
+        structure = self.create_project_structure()
+        return {
+            'name': self.project_name,
+            'directories': structure['directories'],
+            'files': [
+                {'path': path, 'content': content, 'raw': True}
+                for path, content in structure['files'].items()
+            ]
+        }
+    
+    def build(self, base_path: str = "."):
+        """بناء المشروع أو تحديثه: تُكتب الملفات الجديدة أو المتغيرة فقط"""
+        return build_project(self.manifest(), base_path)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+تقييم SimpleAIModel دون اتصال على ملف JSONL معلَّم، سطر لكل رسالة:
+{"message": "...", "expected": "الشبكات/dns"}   (أو المفتاح "intent" أو "topic" بدل "expected")
+التصنيف المتوقع اسم نية ("greeting")، أو اسم مقطع ("الشبكات/dns")، أو فئة ("الشبكات") تطابق كل مقاطعها،
+أو "default" للرد الافتراضي
+
+الملف يُقسَّم إلى نطاقات بايتات تقرؤها العمليات مباشرة (السطر لمن يبدأ في نطاقه)، فلا يُحمَّل في الذاكرة
+ولا تمر الأسطر بالعملية الرئيسية؛ كل عملية تحمّل النموذج مرة في initializer، وعدد النطاقات الجارية محدود،
+والنتائج عدادات ومدرّج زمني تُدمج بالجمع
+
+التشغيل: python templates/evaluate_model.py data.jsonl [العمليات] [حجم النطاق MB] [تقرير.json]
+"""
+
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from chat_system.latency import LatencyHistogram
+
+DEFAULT_LABEL = "default"
+LABEL_KEYS = ("expected", "intent", "topic")
+
+# نموذج كل عملية (يُنشأ في initializer)
+_model = None
+
+
+def _init_worker(model_options: Dict):
+    global _model
+    from ai_model import SimpleAIModel
+    _model = SimpleAIModel(**model_options)
+
+
+def _matches(expected: str, predicted: str) -> bool:
+    """التصنيف المتوقع يطابق نفسه، أو يكون فئة تحوي المقطع المتنبأ به"""
+    return predicted == expected or predicted.startswith(expected + "/")
+
+
+def _evaluate_range(path: str, start: int, end: int) -> Dict:
+    """تقييم الأسطر التي تبدأ في [start, end)"""
+    correct = invalid = errors = 0
+    confusion: Counter = Counter()
+    latency = LatencyHistogram()
+    with open(path, 'rb') as f:
+        if start:
+            # إكمال السطر السابق: يخص النطاق الذي بدأ فيه
+            f.seek(start - 1)
+            position = start - 1 + len(f.readline())
+        else:
+            position = 0
+        while position < end:
+            line = f.readline()
+            if not line:
+                break
+            position += len(line)
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                message = record["message"]
+                expected = next(str(record[key]) for key in LABEL_KEYS if record.get(key) is not None)
+            except (ValueError, KeyError, TypeError, StopIteration):
+                invalid += 1
+                continue
+
+            started = time.perf_counter()
+            try:
+                label, _ = _model.classify(message)
+                predicted = label or DEFAULT_LABEL
+            except Exception:
+                errors += 1
+                predicted = "error"
+            latency.record(time.perf_counter() - started)
+
+            if _matches(expected, predicted):
+                correct += 1
+                predicted = expected
+            confusion[expected, predicted] += 1
+
+    return {"correct": correct, "invalid": invalid, "errors": errors, "confusion": confusion,
+            "latency": latency.counts, "latency_seconds": latency.total_seconds}
+
+
+def byte_ranges(path: str, shard_bytes: int) -> Iterator[Tuple[int, int]]:
+    size = os.path.getsize(path)
+    for start in range(0, size, shard_bytes):
+        yield start, min(start + shard_bytes, size)
+
+
+def evaluate(path: str, workers: Optional[int] = None, shard_bytes: int = 4 * 1024 * 1024,
+             max_in_flight: Optional[int] = None, model_options: Optional[Dict] = None) -> Dict:
+    """
+    تقرير التقييم: الدقة، ومصفوفة الالتباس {المتوقع: {المتنبأ به: العدد}}، ومئينات الزمن لكل رسالة
+    max_in_flight: أقصى عدد نطاقات مُرسلة لم تُجمع نتائجها بعد (افتراضياً ضعف عدد العمليات)
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 2
+    correct = invalid = errors = 0
+    confusion: Counter = Counter()
+    latency = LatencyHistogram()
+
+    def collect(futures):
+        nonlocal correct, invalid, errors
+        for future in futures:
+            part = future.result()
+            correct += part["correct"]
+            invalid += part["invalid"]
+            errors += part["errors"]
+            confusion.update(part["confusion"])
+            latency.merge(LatencyHistogram(part["latency"], part["latency_seconds"]))
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(model_options or {},)) as pool:
+        pending = set()
+        for shard_start, shard_end in byte_ranges(path, shard_bytes):
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending.add(pool.submit(_evaluate_range, path, shard_start, shard_end))
+        collect(wait(pending).done)
+    elapsed = time.perf_counter() - start
+
+    total = latency.count
+    matrix: Dict[str, Dict[str, int]] = {}
+    for (expected, predicted), count in confusion.items():
+        matrix.setdefault(expected, {})[predicted] = count
+    return {
+        "messages": total,
+        "correct": correct,
+        "accuracy": correct / total if total else 0.0,
+        "invalid_lines": invalid,
+        "errors": errors,
+        "workers": workers,
+        "seconds": elapsed,
+        "messages_per_second": total / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "mean": latency.total_seconds / total * 1000 if total else 0.0,
+            **{f"p{q}": latency.percentile(q) * 1000 if total else 0.0 for q in (50, 95, 99)},
+        },
+        "confusion": matrix,
+    }
+
+
+def print_report(report: Dict, top: int = 3):
+    print(f"📊 {report['messages']:,} رسالة، {report['workers']} عملية، {report['seconds']:.1f}s "
+          f"({report['messages_per_second']:,.0f} رسالة/ث)")
+    print(f"  الدقة: {report['accuracy']:.2%} ({report['correct']:,})، "
+          f"أسطر غير صالحة {report['invalid_lines']:,}، أخطاء {report['errors']:,}")
+    latency = report["latency_ms"]
+    print(f"  الزمن لكل رسالة: p50={latency['p50']:.3f}ms p95={latency['p95']:.3f}ms "
+          f"p99={latency['p99']:.3f}ms المتوسط={latency['mean']:.3f}ms")
+    print("  حسب التصنيف المتوقع (الدقة، وأكثر ما التبس به):")
+    for expected, row in sorted(report["confusion"].items(), key=lambda item: -sum(item[1].values())):
+        support = sum(row.values())
+        confused = sorted(((count, label) for label, count in row.items() if label != expected), reverse=True)
+        details = "، ".join(f"{label} {count:,}" for count, label in confused[:top])
+        print(f"    {expected:<24} {row.get(expected, 0) / support:7.1%} من {support:>9,}  {details}")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("الاستخدام: python templates/evaluate_model.py data.jsonl [العمليات] [حجم النطاق MB] [تقرير.json]")
+        sys.exit(1)
+    path = sys.argv[1]
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    shard_bytes = int(float(sys.argv[3]) * 1024 * 1024) if len(sys.argv) > 3 else 4 * 1024 * 1024
+
+    report = evaluate(path, workers, shard_bytes)
+    print_report(report)
+    if len(sys.argv) > 4:
+        with open(sys.argv[4], 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
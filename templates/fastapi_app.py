@@ -4,22 +4,57 @@
 نسخة حقيقية وجاهزة للتشغيل
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
+import asyncio
+import os
+import sys
 import uvicorn
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chat_system.conversation_db import ConversationLog
+from chat_system.intents import IntentEngine
+from chat_system.knowledge_store import KnowledgeStore
+from chat_system.llm_providers import ProviderError, provider_from_env, shared_pool
+from chat_system.response_cache import ResponseCache
+from chat_system.single_flight import AsyncSingleFlight
+from chat_system.streaming import aiter_fragments, sse_chat_stream
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global conversations
+    # قاعدة المحادثات تُنشأ عند التشغيل لا عند الاستيراد
+    conversations = await asyncio.to_thread(
+        ConversationLog,
+        os.getenv("CONVERSATIONS_DB", "sqlite:///conversations.db"),
+        batch_size=int(os.getenv("CONVERSATIONS_BATCH", "500")),
+        flush_interval=float(os.getenv("CONVERSATIONS_FLUSH_INTERVAL", "0.5"))
+    )
+    conversations.start()
+    yield
+    # كتابة المحادثات المعلَّقة قبل الإغلاق
+    await conversations.stop()
+    # إغلاق جلسة المزودين المشتركة واتصالاتها المفتوحة
+    await shared_pool.close()
 
 app = FastAPI(
     title="Bassam FastAPI",
     description="تطبيق FastAPI ذكي للمحادثة والبيانات",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # نماذج البيانات
 class ChatRequest(BaseModel):
     message: str
-    user_id: Optional[int] = 1
+    # عمود user_id في سجل المحادثات إلزامي: null يُرفض بـ 422 بدل أن يُفشل كتابة الدفعة
+    user_id: int = 1
 
 class ChatResponse(BaseModel):
     status: str
@@ -27,6 +62,14 @@ class ChatResponse(BaseModel):
     conversation_id: int
     timestamp: str
 
+class ChatBatchRequest(BaseModel):
+    messages: List[str]
+
+class ChatBatchResponse(BaseModel):
+    status: str
+    count: int
+    results: List[Dict[str, str]]
+
 class User(BaseModel):
     id: int
     name: str
@@ -39,8 +82,138 @@ class SystemInfo(BaseModel):
     server_time: str
     total_requests: int
 
-# بيانات التطبيق
-conversations = []
+# جدول النوايا: (الاسم، الكلمات المفتاحية، الرد) بترتيب الأولوية
+CHAT_INTENTS = [
+    ("greeting", ['مرحبا', 'اهلا', 'السلام'],
+     "مرحباً! أنا مساعد FastAPI الذكي. كيف يمكنني مساعدتك؟"),
+    ("programming", ['برمجة', 'كود', 'تطوير'],
+     "رائع! البرمجة شغف رائع. أي لغة تفضل؟"),
+    ("api", ['شبكة', 'خادم', 'api'],
+     "FastAPI ممتاز لبناء APIs سريعة! هل تريد إنشاء نقطة نهاية جديدة؟"),
+    ("time", ['وقت', 'تاريخ', 'الآن'],
+     lambda message: f"الوقت الحالي: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"),
+]
+intent_engine = IntentEngine(CHAT_INTENTS)
+
+# سجل المحادثات الدائم: يُكتب على دفعات من مهمة خلفية (يُنشأ في lifespan)
+conversations: Optional[ConversationLog] = None
+# مخزن المعرفة المغذّى من ملفات ZIP
+knowledge = KnowledgeStore(os.environ.get("KNOWLEDGE_DB", "knowledge.db"))
+# عدد المقاطع المسترجعة لكل رسالة (سياقاً للنموذج اللغوي)
+KNOWLEDGE_TOP_K = int(os.getenv("KNOWLEDGE_TOP_K", "3"))
+
+# ذاكرة مؤقتة للردود الثابتة (تُفرَّغ عند تغيّر إصدار مخزن المعرفة)
+response_cache = ResponseCache(
+    max_bytes=int(os.getenv("RESPONSE_CACHE_BYTES", str(4 * 1024 * 1024))),
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+)
+
+def knowledge_prompt(message: str, chunks: List[Dict]) -> List[Dict[str, str]]:
+    """رسائل النموذج اللغوي: المقاطع المسترجعة من المعرفة في رسالة system ثم رسالة المستخدم"""
+    messages = []
+    if chunks:
+        context = "\n\n".join(f"[{chunk['name']}]\n{chunk['content']}" for chunk in chunks)
+        messages.append({"role": "system", "content": "أجب مستعيناً بمقاطع المعرفة التالية:\n\n" + context})
+    messages.append({"role": "user", "content": message})
+    return messages
+
+def compute_response(message: str):
+    """(الرد، قابل للتخزين المؤقت)"""
+    return intent_engine.resolve(
+        message,
+        lambda message: f"لقد قلت: '{message}'. هذا مثير للاهتمام!"
+    )
+
+# مزود النموذج اللغوي للرسائل التي لا تطابق نية (PROVIDER)؛ None = ردود القواعد فقط
+llm = provider_from_env()
+
+# الرسائل المتطابقة حرفياً والمتزامنة تشترك في حساب واحد؛ لا يُستخدم المفتاح المطبَّع
+# لأن الردود غير القابلة للتخزين تكرر نص الرسالة كما كتبه صاحبها
+reply_flight = AsyncSingleFlight()
+
+async def generate_reply(message: str) -> str:
+    """رد الرسالة؛ الطلبات المتطابقة الجارية معاً تنتظر نفس الحساب"""
+    response, _ = await reply_flight.do(message, lambda: _generate_reply(message))
+    return response
+
+async def _generate_reply(message: str) -> str:
+    """
+    رد النية المطابقة، وإلا رد النموذج اللغوي بسياق من مخزن المعرفة إن أُعدّ،
+    وإلا أفضل مقطع معرفة مطابق، وإلا الرد الافتراضي
+    """
+    version = knowledge.version
+    cached = response_cache.get(message, version)
+    if cached is not None:
+        return cached
+    
+    chunks = None
+    if intent_engine.match(message) is None:
+        chunks = await asyncio.to_thread(knowledge.search, message, KNOWLEDGE_TOP_K)
+    return await _reply_from(message, chunks, version)
+
+async def _reply_from(message: str, chunks: Optional[List[Dict]], version) -> str:
+    """الرد من المقاطع المسترجعة (None للرسائل المطابقة لنية)، وتخزينه مؤقتاً إن كان ثابتاً"""
+    response, cacheable = None, False
+    if chunks is not None:
+        if llm is not None:
+            try:
+                response, cacheable = await llm.complete(knowledge_prompt(message, chunks)), True
+            except ProviderError:
+                # تعذر المزود: الرجوع للمعرفة وردود القواعد بدلاً من إفشال المحادثة
+                response = None
+        if response is None and chunks:
+            response, cacheable = chunks[0]["content"], True
+    if response is None:
+        response, cacheable = compute_response(message)
+    
+    if cacheable:
+        response_cache.put(message, response, version)
+    return response
+
+async def generate_replies(messages: List[str]) -> List[Dict[str, str]]:
+    """
+    ردود دفعة بترتيب المدخلات مع خطأ مستقل لكل رسالة؛ المكرر يُحسب مرة،
+    ثم تُطابق النوايا وتُسترجع المعرفة للدفعة كلها في خيط واحد (جلب واحد للمقاطع)،
+    وطلبات المزود متزامنة ضمن حد تزامنه
+    """
+    version = knowledge.version
+    unique = [message for message in dict.fromkeys(messages) if message.strip()]
+    replies = {}
+    for message in unique:
+        cached = response_cache.get(message, version)
+        if cached is not None:
+            replies[message] = cached
+    
+    pending = [message for message in unique if message not in replies]
+    to_search = [message for message in pending if intent_engine.match(message) is None]
+    try:
+        found = await asyncio.to_thread(knowledge.search_batch, to_search, KNOWLEDGE_TOP_K)
+    except Exception:
+        # تعذر الاسترجاع المجمَّع: كل رسالة على حدة كي يبقى الخطأ في عنصرها
+        replies.update(zip(pending, await asyncio.gather(
+            *(generate_reply(message) for message in pending), return_exceptions=True
+        )))
+    else:
+        chunks = dict(zip(to_search, found))
+        replies.update(zip(pending, await asyncio.gather(
+            *(_reply_from(message, chunks.get(message), version) for message in pending),
+            return_exceptions=True
+        )))
+    
+    results = []
+    for message in messages:
+        reply = replies.get(message)
+        if reply is None:
+            results.append({"status": "error", "message": "الرسالة فارغة"})
+        elif isinstance(reply, Exception):
+            results.append({"status": "error", "message": str(reply)})
+        else:
+            results.append({"status": "success", "response": reply})
+    return results
+
+# أقصى عدد رسائل في طلب الدفعة الواحد
+CHAT_BATCH_MAX = int(os.getenv("CHAT_BATCH_MAX", "1000"))
+
 request_count = 0
 
 users_db = [
@@ -59,7 +232,10 @@ async def root():
         "endpoints": {
             "/docs": "التوثيق التفاعلي",
             "/api/chat": "المحادثة الذكية",
+            "/api/chat/stream": "المحادثة الذكية ببث الرد (SSE)",
+            "/api/chat/batch": "ردود دفعة رسائل (لإعادة التشغيل التحليلية)",
             "/api/users": "قائمة المستخدمين",
+            "/api/knowledge/upload": "التغذية بالمعرفة من ملف ZIP",
             "/api/info": "معلومات النظام"
         },
         "timestamp": datetime.now().isoformat()
@@ -68,43 +244,58 @@ async def root():
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat_endpoint(request: ChatRequest):
     """نقطة نهاية المحادثة"""
-    global request_count, conversations
+    global request_count
     request_count += 1
     
     try:
-        # محاكاة ذكاء اصطناعي بسيط
-        user_message = request.message.lower()
-        
-        if any(word in user_message for word in ['مرحبا', 'اهلا', 'السلام']):
-            ai_response = "مرحباً! أنا مساعد FastAPI الذكي. كيف يمكنني مساعدتك؟"
-        elif any(word in user_message for word in ['برمجة', 'كود', 'تطوير']):
-            ai_response = "رائع! البرمجة شغف رائع. أي لغة تفضل؟"
-        elif any(word in user_message for word in ['شبكة', 'خادم', 'api']):
-            ai_response = "FastAPI ممتاز لبناء APIs سريعة! هل تريد إنشاء نقطة نهاية جديدة؟"
-        elif any(word in user_message for word in ['وقت', 'تاريخ', 'الآن']):
-            ai_response = f"الوقت الحالي: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-        else:
-            ai_response = f"لقد قلت: '{request.message}'. هذا مثير للاهتمام!"
+        ai_response = await generate_reply(request.message)
         
         # حفظ المحادثة
-        conversation_entry = {
-            "user_id": request.user_id,
-            "user_message": request.message,
-            "ai_response": ai_response,
-            "timestamp": datetime.now().isoformat()
-        }
-        conversations.append(conversation_entry)
+        record = conversations.add(request.user_id, request.message, ai_response)
         
         return ChatResponse(
             status="success",
             response=ai_response,
-            conversation_id=len(conversations),
-            timestamp=conversation_entry["timestamp"]
+            conversation_id=record.id,
+            timestamp=record.timestamp
         )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest, http_request: Request):
+    """المحادثة مع بث الرد مقطعاً مقطعاً كأحداث SSE"""
+    global request_count
+    request_count += 1
+    
+    async def fragments():
+        ai_response = await generate_reply(request.message)
+        async for fragment in aiter_fragments(ai_response):
+            yield fragment
+    
+    def save(ai_response: str):
+        # لا يُحفظ إلا الرد الذي وصل كاملاً
+        record = conversations.add(request.user_id, request.message, ai_response)
+        return {"status": "success", "conversation_id": record.id, "timestamp": record.timestamp}
+    
+    return StreamingResponse(
+        sse_chat_stream(fragments(), save, is_disconnected=http_request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/chat/batch", response_model=ChatBatchResponse)
+async def chat_batch_endpoint(request: ChatBatchRequest):
+    """ردود دفعة رسائل بترتيب الإدخال (لا تُحفظ في سجل المحادثات)"""
+    global request_count
+    request_count += 1
+    
+    if len(request.messages) > CHAT_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"الحد الأقصى {CHAT_BATCH_MAX} رسالة في الدفعة")
+    results = await generate_replies(request.messages)
+    return ChatBatchResponse(status="success", count=len(results), results=results)
+
 @app.get("/api/users", response_model=List[User])
 async def get_users():
     """جلب قائمة المستخدمين"""
@@ -113,18 +304,64 @@ async def get_users():
     return users_db
 
 @app.get("/api/conversations")
-async def get_conversations(limit: int = 10):
-    """جلب آخر المحادثات"""
+async def get_conversations(limit: int = Query(50, ge=1, le=500), user_id: Optional[int] = None):
+    """جلب آخر المحادثات (لكل المستخدمين أو لمستخدم واحد) بالترتيب الزمني"""
     global request_count
     request_count += 1
     
-    recent_conv = conversations[-limit:] if conversations else []
+    records = await asyncio.to_thread(conversations.recent, limit, user_id)
+    recent_conv = [
+        {
+            "id": record.id,
+            "user_id": record.user_id,
+            "user_message": record.user,
+            "ai_response": record.ai,
+            "timestamp": record.timestamp
+        }
+        for record in reversed(records)
+    ]
     return {
         "status": "success",
         "count": len(recent_conv),
         "conversations": recent_conv
     }
 
+@app.post("/api/knowledge/upload")
+async def upload_knowledge(file: UploadFile = File(...)):
+    """تغذية قاعدة المعرفة من ملف ZIP دون فكه على القرص"""
+    global request_count
+    request_count += 1
+    
+    try:
+        # الإدراج عمل متزامن طويل، فيُنفذ في خيط كي لا يحجب حلقة الأحداث
+        result = await asyncio.to_thread(knowledge.ingest_zip, file.file, file.filename)
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail="الملف ليس أرشيف ZIP صالحاً")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {
+        "status": "success",
+        "archive": file.filename,
+        "files": result["files"],
+        "chunks": result["chunks"],
+        "bytes": result["bytes"],
+        "skipped": result["skipped"],
+        "seconds": round(result["seconds"], 3)
+    }
+
+@app.get("/api/cache")
+async def cache_stats():
+    """إحصاءات الذاكرة المؤقتة للردود"""
+    return {"status": "success", **response_cache.stats(), "single_flight": reply_flight.stats()}
+
+@app.get("/api/llm")
+async def llm_stats():
+    """حالة مزود النموذج اللغوي"""
+    if llm is None:
+        return {"status": "success", "provider": None}
+    return {"status": "success", **llm.stats()}
+
 @app.get("/api/info", response_model=SystemInfo)
 async def system_info():
     """معلومات النظام"""
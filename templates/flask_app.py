@@ -4,10 +4,19 @@
 نسخة حقيقية 100%
 """
 
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, Response, render_template, request, jsonify, session, stream_with_context
 from datetime import datetime
 import json
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chat_system.conversation_store import ConversationStore
+from chat_system.intents import IntentEngine
+from chat_system.response_cache import ResponseCache
+from chat_system.single_flight import SingleFlight
+from chat_system.streaming import iter_fragments, sse_chat_stream_sync
 
 app = Flask(__name__)
 app.secret_key = 'bassam-ai-secret-key-2024'
@@ -18,19 +27,65 @@ users_data = [
     {"id": 2, "name": "مستخدم", "role": "مطور"}
 ]
 
+# جدول النوايا: (الاسم، الكلمات المفتاحية، الرد) بترتيب الأولوية
+CHAT_INTENTS = [
+    ("greeting", ['مرحبا'], "مرحباً بك! كيف يمكنني مساعدتك اليوم؟"),
+    ("programming", ['برمجة'], "يمكنني مساعدتك في مواضيع البرمجة والتطوير!"),
+    ("networking", ['شبكة'], "أفهم أنك مهتم بالشبكات والخوادم."),
+]
+intent_engine = IntentEngine(CHAT_INTENTS)
+
+# ذاكرة مؤقتة للردود الثابتة
+response_cache = ResponseCache(
+    max_bytes=int(os.getenv("RESPONSE_CACHE_BYTES", str(4 * 1024 * 1024))),
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+)
+
+def compute_response(message):
+    """(الرد، قابل للتخزين المؤقت)"""
+    return intent_engine.resolve(
+        message,
+        lambda message: f"لقد قلت: {message}. هذا مثير للاهتمام!"
+    )
+
+# الرسائل المتطابقة حرفياً والمتزامنة تشترك في حساب واحد؛ لا يُستخدم المفتاح المطبَّع
+# لأن الردود غير القابلة للتخزين تكرر نص الرسالة كما كتبه صاحبها
+reply_flight = SingleFlight()
+
+def generate_reply(message):
+    """الرد من الذاكرة المؤقتة أو بحساب واحد مشترك بين الطلبات المتطابقة الجارية"""
+    response, _ = reply_flight.do(
+        message,
+        lambda: response_cache.get_or_compute(message, compute_response)[0]
+    )
+    return response
+
+def generate_replies(messages):
+    """ردود دفعة بترتيب المدخلات مع خطأ مستقل لكل رسالة؛ المكرر يُحسب مرة"""
+    replies = {}
+    results = []
+    for message in messages:
+        if not isinstance(message, str) or not message.strip():
+            results.append({'status': 'error', 'message': 'الرسالة يجب أن تكون نصاً غير فارغ'})
+            continue
+        if message not in replies:
+            try:
+                replies[message] = {'status': 'success', 'response': generate_reply(message)}
+            except Exception as e:
+                replies[message] = {'status': 'error', 'message': str(e)}
+        results.append(replies[message])
+    return results
+
+# أقصى عدد رسائل في طلب الدفعة الواحد
+CHAT_BATCH_MAX = int(os.getenv("CHAT_BATCH_MAX", "1000"))
+
 class ChatManager:
-    def __init__(self):
-        self.conversations = []
+    def __init__(self, capacity=int(os.getenv("CONVERSATION_CAPACITY", "1000"))):
+        self.conversations = ConversationStore(capacity=capacity)
     
-    def add_message(self, user_message, ai_response):
+    def add_message(self, user_message, ai_response, user_id='web'):
         """إضافة رسالة للمحادثة"""
-        message = {
-            'user': user_message,
-            'ai': ai_response,
-            'timestamp': datetime.now().isoformat()
-        }
-        self.conversations.append(message)
-        return message
+        return self.conversations.add(user_id, user_message, ai_response)
 
 chat_manager = ChatManager()
 
@@ -50,14 +105,7 @@ def chat_api():
         user_message = data.get('message', '')
         
         # رد ذكي بسيط
-        if 'مرحبا' in user_message:
-            ai_response = "مرحباً بك! كيف يمكنني مساعدتك اليوم؟"
-        elif 'برمجة' in user_message:
-            ai_response = "يمكنني مساعدتك في مواضيع البرمجة والتطوير!"
-        elif 'شبكة' in user_message:
-            ai_response = "أفهم أنك مهتم بالشبكات والخوادم."
-        else:
-            ai_response = f"لقد قلت: {user_message}. هذا مثير للاهتمام!"
+        ai_response = generate_reply(user_message)
         
         # حفظ المحادثة
         message = chat_manager.add_message(user_message, ai_response)
@@ -65,8 +113,8 @@ def chat_api():
         return jsonify({
             'status': 'success',
             'response': ai_response,
-            'conversation_id': len(chat_manager.conversations),
-            'timestamp': message['timestamp']
+            'conversation_id': message.id,
+            'timestamp': message.timestamp
         })
         
     except Exception as e:
@@ -75,6 +123,39 @@ def chat_api():
             'message': str(e)
         }), 500
 
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream_api():
+    """محادثة مع بث الرد مقطعاً مقطعاً كأحداث SSE"""
+    data = request.get_json() or {}
+    user_message = data.get('message', '')
+    
+    def fragments():
+        ai_response = generate_reply(user_message)
+        yield from iter_fragments(ai_response)
+    
+    def save(ai_response):
+        # لا يُحفظ إلا الرد الذي وصل كاملاً
+        message = chat_manager.add_message(user_message, ai_response)
+        return {'status': 'success', 'conversation_id': message.id, 'timestamp': message.timestamp}
+    
+    return Response(
+        stream_with_context(sse_chat_stream_sync(fragments(), save)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/chat/batch', methods=['POST'])
+def chat_batch_api():
+    """ردود دفعة رسائل بترتيب الإدخال (لا تُحفظ في سجل المحادثات)"""
+    data = request.get_json(silent=True) or {}
+    messages = data.get('messages')
+    if not isinstance(messages, list):
+        return jsonify({'status': 'error', 'message': 'messages يجب أن تكون قائمة'}), 400
+    if len(messages) > CHAT_BATCH_MAX:
+        return jsonify({'status': 'error', 'message': f'الحد الأقصى {CHAT_BATCH_MAX} رسالة في الدفعة'}), 413
+    results = generate_replies(messages)
+    return jsonify({'status': 'success', 'count': len(results), 'results': results})
+
 @app.route('/api/users')
 def get_users():
     """جلب بيانات المستخدمين"""
@@ -90,9 +171,14 @@ def get_conversations():
     return jsonify({
         'status': 'success',
         'count': len(chat_manager.conversations),
-        'conversations': chat_manager.conversations[-10:]  # آخر 10 محادثات
+        'conversations': [m.to_dict() for m in chat_manager.conversations.recent(10)]  # آخر 10 محادثات
     })
 
+@app.route('/api/cache')
+def cache_stats():
+    """إحصاءات الذاكرة المؤقتة للردود"""
+    return jsonify({'status': 'success', **response_cache.stats(), 'single_flight': reply_flight.stats()})
+
 @app.route('/api/system-info')
 def system_info():
     """معلومات النظام"""
@@ -101,7 +187,7 @@ def system_info():
         'app_name': 'Bassam Flask App',
         'version': '1.0.0',
         'server_time': datetime.now().isoformat(),
-        'total_conversations': len(chat_manager.conversations)
+        'total_conversations': chat_manager.conversations.total
     })
 
 @app.route('/health')
@@ -154,6 +240,8 @@ if __name__ == '__main__':
             <h2>واجهات API المتاحة:</h2>
             <ul>
                 <li><code>/api/chat</code> - المحادثة</li>
+                <li><code>/api/chat/stream</code> - المحادثة ببث الرد (SSE)</li>
+                <li><code>/api/chat/batch</code> - ردود دفعة رسائل</li>
                 <li><code>/api/users</code> - المستخدمون</li>
                 <li><code>/api/conversations</code> - المحادثات</li>
                 <li><code>/api/system-info</code> - معلومات النظام</li>
@@ -0,0 +1,42 @@
+import os
+
+from ai_model import SimpleAIModel
+from chat_system.knowledge_store import KnowledgeStore
+
+
+def test_saved_vector_index_is_rebuilt_for_another_store(tmp_path, capsys):
+    index_path = str(tmp_path / "vectors.npy")
+    model = SimpleAIModel(knowledge_db=str(tmp_path / "big.db"), vector_index=index_path)
+    model.store.add_documents("extra", [(f"doc_{i}", f"مقطع إضافي رقم {i}", "") for i in range(20)])
+    model.sync_vectors()
+    assert len(model.vectors) == model.store.chunk_count() > 20
+
+    # مخزن في الذاكرة بمقاطع أقل: المتجهات المحفوظة تشير إلى معرفات أخرى
+    fresh = SimpleAIModel(knowledge_db=":memory:", vector_index=index_path)
+    assert len(fresh.vectors) == fresh.store.chunk_count()
+    assert fresh.vectors.last_id() == fresh.store.last_chunk_id()
+    assert "سيُعاد بناؤه" in capsys.readouterr().out
+
+    # نفس المخزن: يُستخدم المحفوظ دون إعادة بناء
+    again = SimpleAIModel(knowledge_db=":memory:", vector_index=index_path)
+    assert len(again.vectors) == again.store.chunk_count()
+    assert "سيُعاد بناؤه" not in capsys.readouterr().out
+    assert os.path.exists(index_path)
+
+
+def test_ivf_index_is_rebuilt_for_another_store(capsys):
+    model = SimpleAIModel(knowledge_db=":memory:", index_type="ivf")
+    model.vectors.train_size = 20
+    model.store.add_documents("extra", [(f"doc_{i}", f"مقطع إضافي رقم {i}", "") for i in range(40)])
+    model.sync_vectors()
+    assert model.vectors.trained
+
+    # مخزن آخر بمقاطع أقل: الفهرس يُفرغ ويُلغى تدريبه ثم يُبنى منه
+    model.store = KnowledgeStore(":memory:")
+    model.sync_vectors()
+    assert "سيُعاد بناؤه" in capsys.readouterr().out
+    assert not model.vectors.trained
+    assert len(model.vectors) == model.store.chunk_count()
+    assert model.vectors.last_id() == model.store.last_chunk_id()
+    ids, _ = model.vectors.search(model.embedder.embed(["ما هو بروتوكول dns"]), 3)
+    assert set(ids[0]) <= set(range(1, model.store.last_chunk_id() + 1))
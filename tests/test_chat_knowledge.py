@@ -0,0 +1,67 @@
+import io
+import zipfile
+
+import pytest
+
+ANSWER = "بروتوكول زيفيرون ينقل الحزم عبر قنوات مشفرة"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("CONVERSATIONS_DB", "sqlite://")
+    monkeypatch.setenv("KNOWLEDGE_DB", ":memory:")
+    from fastapi.testclient import TestClient
+
+    import fastapi_app
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as zf:
+        zf.writestr("zephyron.txt", ANSWER)
+    with TestClient(fastapi_app.app) as client:
+        response = client.post("/api/knowledge/upload",
+                               files={"file": ("zephyron.zip", archive.getvalue(), "application/zip")})
+        assert response.json()["chunks"] == 1
+        yield client, fastapi_app
+
+
+def test_uploaded_knowledge_answers_chat(client):
+    client, _ = client
+    assert client.post("/api/chat", json={"message": "ما هو زيفيرون"}).json()["response"] == ANSWER
+
+
+def test_uploaded_knowledge_is_passed_to_the_llm(client, monkeypatch):
+    client, fastapi_app = client
+    prompts = []
+
+    class Provider:
+        async def complete(self, messages):
+            prompts.append(messages)
+            return "رد النموذج"
+
+    monkeypatch.setattr(fastapi_app, "llm", Provider())
+    assert client.post("/api/chat", json={"message": "اشرح قنوات زيفيرون"}).json()["response"] == "رد النموذج"
+    system, user = prompts[0]
+    assert system["role"] == "system" and ANSWER in system["content"]
+    assert user == {"role": "user", "content": "اشرح قنوات زيفيرون"}
+
+
+def test_batch_retrieves_knowledge_in_one_call(client, monkeypatch):
+    client, fastapi_app = client
+    calls = []
+    search_batch = fastapi_app.knowledge.search_batch
+    monkeypatch.setattr(fastapi_app.knowledge, "search_batch",
+                        lambda texts, k: calls.append(list(texts)) or search_batch(texts, k))
+    fastapi_app.response_cache.clear()
+    messages = ["ما هو زيفيرون", "مرحبا", "", "رسالة عادية", "ما هو زيفيرون"]
+
+    results = client.post("/api/chat/batch", json={"messages": messages}).json()["results"]
+
+    # المكرر يُحسب مرة، والرسائل المطابقة لنية لا تُسترجع لها معرفة
+    assert calls == [["ما هو زيفيرون", "رسالة عادية"]]
+    assert results[0] == results[4] == {"status": "success", "response": ANSWER}
+    assert results[2]["status"] == "error"
+    fastapi_app.response_cache.clear()
+    assert [result.get("response") for result in results] == [
+        client.post("/api/chat", json={"message": message}).json().get("response") if message else None
+        for message in messages
+    ]
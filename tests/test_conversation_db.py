@@ -0,0 +1,89 @@
+import asyncio
+
+from chat_system.conversation_db import ConversationLog
+
+
+def test_bad_row_is_dropped_without_blocking_the_batch():
+    log = ConversationLog("sqlite://")
+    log.add(1, "أهلاً", "مرحباً")
+    log.add(None, "صف معيب", "لا يُحفظ")
+    log.add(2, "سؤال", "جواب")
+
+    assert log.flush() == 2
+    assert log.stats()["pending"] == 0
+    assert log.stats()["dropped"] == 1
+
+    # الكتابة تستمر بعد الصف المعيب
+    log.add(3, "بعد", "الخطأ")
+    assert [record.user for record in log.recent(10)] == ["بعد", "سؤال", "أهلاً"]
+
+
+def test_ids_come_from_the_reserved_block_without_a_write():
+    log = ConversationLog("sqlite://", id_block=3)
+    calls = []
+    reserve = log._reserve_block
+    log._reserve_block = lambda: calls.append(1) or reserve()
+
+    ids = [log.add(1, "رسالة", "رد").id for _ in range(3)]
+
+    assert ids == [1, 2, 3]
+    assert calls == []
+
+
+def test_background_writer_reserves_the_next_block_ahead():
+    async def run():
+        log = ConversationLog("sqlite://", id_block=2, flush_interval=0.01)
+        log.start()
+        ids = []
+        for _ in range(6):
+            ids.append(log.add(1, "رسالة", "رد").id)
+            await asyncio.sleep(0.05)
+            # الكاتب حجز الكتلة التالية قبل أن تُطلب
+            assert log._spare is not None
+        await log.stop()
+        return ids, log.stats()
+
+    ids, stats = asyncio.run(run())
+    assert len(set(ids)) == 6
+    assert stats["written"] == 6
+
+
+def test_recent_is_newest_first_across_processes(tmp_path):
+    url = f"sqlite:///{tmp_path / 'conversations.db'}"
+    # عمليتان على نفس الملف: لكل منهما كتلة معرفات مختلفة
+    first = ConversationLog(url, id_block=1000)
+    second = ConversationLog(url, id_block=1000)
+    first.add(1, "a-first", "رد")
+    second.add(1, "b-second", "رد")
+    first.add(1, "a-third (newest)", "رد")
+    second.flush()
+
+    assert [record.user for record in first.recent(2)] == ["a-third (newest)", "b-second"]
+    assert [record.user for record in second.recent(3, user_id=1)] == [
+        "a-third (newest)", "b-second", "a-first"]
+
+
+def test_chat_api_rejects_null_user_id(monkeypatch):
+    monkeypatch.setenv("CONVERSATIONS_DB", "sqlite://")
+    monkeypatch.setenv("KNOWLEDGE_DB", ":memory:")
+    from fastapi.testclient import TestClient
+
+    import fastapi_app
+
+    with TestClient(fastapi_app.app) as client:
+        assert client.post("/api/chat", json={"message": "مرحبا", "user_id": None}).status_code == 422
+        assert client.post("/api/chat", json={"message": "مرحبا"}).status_code == 200
+        assert client.get("/api/conversations").status_code == 200
+
+
+def test_conversations_limit_is_bounded(monkeypatch):
+    monkeypatch.setenv("CONVERSATIONS_DB", "sqlite://")
+    monkeypatch.setenv("KNOWLEDGE_DB", ":memory:")
+    from fastapi.testclient import TestClient
+
+    import fastapi_app
+
+    with TestClient(fastapi_app.app) as client:
+        for limit in (-1, 0, 501):
+            assert client.get("/api/conversations", params={"limit": limit}).status_code == 422
+        assert client.get("/api/conversations", params={"limit": 500}).status_code == 200
@@ -0,0 +1,49 @@
+import io
+import multiprocessing
+import zipfile
+
+from chat_system.knowledge_store import KnowledgeStore
+
+
+def archive(prefix, files=20):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as zf:
+        for i in range(files):
+            zf.writestr(f"{prefix}_{i}.txt", f"ملف {prefix} رقم {i} " * 200)
+    buffer.seek(0)
+    return buffer
+
+
+def ingest(path, prefix, rounds):
+    store = KnowledgeStore(path)
+    for round_ in range(rounds):
+        assert store.ingest_zip(archive(f"{prefix}{round_}"), batch_size=7)["status"] == "success"
+        store.add_documents(f"{prefix}{round_}", [(f"doc_{i}", f"نص {i}", "") for i in range(5)])
+    store.close()
+
+
+def test_concurrent_processes_get_distinct_ids(tmp_path):
+    path = str(tmp_path / "knowledge.db")
+    KnowledgeStore(path).close()
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=ingest, args=(path, name, 5)) for name in "ab"]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert [worker.exitcode for worker in workers] == [0, 0]
+
+    store = KnowledgeStore(path)
+    assert store.document_count() == 2 * 5 * (20 + 5)
+    chunks = [row for batch in store.iter_chunks() for row in batch]
+    assert len(chunks) == store.chunk_count()
+    assert store.search("ملف", 1)
+
+
+def test_search_batch_matches_search():
+    store = KnowledgeStore(':memory:')
+    store.add_documents("docs", [(f"doc_{i}", f"مقطع عن الشبكات رقم {i} والبروتوكول {i % 3}", "")
+                                 for i in range(30)])
+    queries = ["الشبكات", "البروتوكول 2", "", "كلمة غير موجودة", "الشبكات"]
+
+    assert store.search_batch(queries, 4) == [store.search(query, 4) for query in queries]
@@ -0,0 +1,43 @@
+import json
+import os
+
+from shell_system.project_build import STATE_FILE, build_project
+
+
+def manifest(*paths):
+    return {"variables": {"port": 5000},
+            "files": [{"path": path, "content": "port={port}"} for path in paths]}
+
+
+def state(root):
+    with open(os.path.join(root, STATE_FILE), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_identical_files_are_skipped_without_a_state_file(tmp_path):
+    root = str(tmp_path)
+    assert build_project(manifest("a.txt", "b.txt"), root)["created"] == ["a.txt", "b.txt"]
+    os.remove(os.path.join(root, STATE_FILE))
+
+    result = build_project(manifest("a.txt", "b.txt"), root)
+    assert result["updated"] == []
+    assert result["skipped"] == ["a.txt", "b.txt"]
+    assert set(state(root)) == {"a.txt", "b.txt"}
+
+
+def test_changed_file_on_disk_is_rewritten(tmp_path):
+    root = str(tmp_path)
+    build_project(manifest("a.txt"), root)
+    with open(os.path.join(root, "a.txt"), 'w') as f:
+        f.write("edited")
+
+    assert build_project(manifest("a.txt"), root)["updated"] == ["a.txt"]
+    with open(os.path.join(root, "a.txt")) as f:
+        assert f.read() == "port=5000"
+
+
+def test_removed_files_are_pruned_from_state(tmp_path):
+    root = str(tmp_path)
+    build_project(manifest("a.txt", "b.txt"), root)
+    build_project(manifest("a.txt"), root)
+    assert set(state(root)) == {"a.txt"}
@@ -0,0 +1,29 @@
+import os
+import stat
+
+import pytest
+
+from shell_system import scaffold
+from shell_system.scaffold import write_file
+
+
+def mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+@pytest.mark.skipif(os.name != "posix", reason="صلاحيات POSIX")
+def test_atomic_write_uses_umask_for_new_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(scaffold, "_UMASK", 0o022)
+    path = tmp_path / "app.py"
+    write_file(str(path), "print(1)\n", atomic=True)
+    assert mode(path) == 0o644
+
+
+@pytest.mark.skipif(os.name != "posix", reason="صلاحيات POSIX")
+def test_atomic_write_keeps_existing_mode(tmp_path):
+    path = tmp_path / "run.sh"
+    path.write_text("#!/bin/sh\n")
+    os.chmod(path, 0o755)
+    write_file(str(path), "#!/bin/sh\necho hi\n", atomic=True)
+    assert mode(path) == 0o755
+    assert path.read_text() == "#!/bin/sh\necho hi\n"
@@ -0,0 +1,31 @@
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def fastapi_app(monkeypatch):
+    monkeypatch.setenv("CONVERSATIONS_DB", "sqlite://")
+    monkeypatch.setenv("KNOWLEDGE_DB", ":memory:")
+    import fastapi_app
+    return fastapi_app
+
+
+def test_concurrent_variants_do_not_share_echo_replies(fastapi_app, monkeypatch):
+    runs = []
+
+    async def echo(message):
+        runs.append(message)
+        await asyncio.sleep(0.01)
+        return f"لقد قلت: '{message}'"
+
+    monkeypatch.setattr(fastapi_app, "_generate_reply", echo)
+    coalesced = fastapi_app.reply_flight.stats()["coalesced"]
+
+    async def run():
+        return await asyncio.gather(*(fastapi_app.generate_reply(m) for m in ("hello", "Hello!", "hello", "hello")))
+
+    # الرسائل المتطابقة تُحسب مرة واحدة، والصيغ المختلفة (وإن تطابق تطبيعها) لا تتشارك الرد
+    assert asyncio.run(run()) == ["لقد قلت: 'hello'", "لقد قلت: 'Hello!'", "لقد قلت: 'hello'", "لقد قلت: 'hello'"]
+    assert sorted(runs) == ["Hello!", "hello"]
+    assert fastapi_app.reply_flight.stats()["coalesced"] == coalesced + 2
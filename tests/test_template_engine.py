@@ -0,0 +1,56 @@
+import pytest
+
+from shell_system.file_builder import FileBuilder
+from shell_system.script_generator import ScriptGenerator
+from shell_system.template_engine import MissingVariablesError, render
+
+
+def test_jinja_braces_are_left_alone():
+    text = '{{ name|upper }} {{name|upper}}'
+    assert render(text, {}) == (text, [])
+    assert render(text, {'name': 'x'})[0] == text
+
+
+def test_windows_path_keeps_its_backslash():
+    assert render('C:\\{dir}', {})[0] == 'C:\\{dir}'
+    assert render('C:\\{dir} {other}', {'other': 1})[0] == 'C:\\{dir} 1'
+
+
+def test_escape_for_known_names():
+    assert render('\\{dir} {dir}', {'dir': 'src'})[0] == '{dir} src'
+    assert render('\\{dir}', {}, declared=['dir'])[0] == '{dir}'
+
+
+def test_default_applies_when_the_value_is_missing():
+    assert render('port={port|5000}', {}) == ('port=5000', [])
+    assert render('port={port|5000}', {'port': 8000})[0] == 'port=8000'
+
+
+def test_script_generator_applies_defaults(tmp_path):
+    templates_dir = tmp_path / "templates"
+    templates_dir.mkdir()
+    (templates_dir / "server.py").write_text("HOST = '{host|0.0.0.0}'\nPORT = {port|5000}\n", encoding='utf-8')
+    output = tmp_path / "server_out.py"
+
+    result = ScriptGenerator(str(templates_dir)).generate_from_template("server", str(output), port=8000)
+
+    assert result['status'] == 'success'
+    assert output.read_text(encoding='utf-8') == "HOST = '0.0.0.0'\nPORT = 8000\n"
+
+
+def test_file_builder_applies_defaults(tmp_path, monkeypatch):
+    builder = FileBuilder(str(tmp_path))
+    monkeypatch.setitem(builder.templates, "config", {"filename": "config.ini",
+                                                      "content": "debug={debug|false}\nname={name}\n"})
+
+    result = builder.create_from_template("config", name="bassam")
+
+    assert result["status"] == "success"
+    assert result["missing_variables"] == []
+    assert (tmp_path / "config.ini").read_text(encoding='utf-8') == "debug=false\nname=bassam\n"
+
+
+def test_strict_reports_missing_variables():
+    with pytest.raises(MissingVariablesError) as error:
+        render('{a} {b}', {'a': 1}, strict=True)
+    assert error.value.missing == ['b']